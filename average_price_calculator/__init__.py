@@ -1,25 +1,102 @@
 # mypy: disable-error-code="attr-defined"
 """A tool for calculating weighted average prices after additional purchases"""
 
-from importlib import metadata as importlib_metadata
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from .calculator import calculate_average_price, calculate_average_price_safe
-from .models import CalculationResult, PriceData
+from .calculator import (
+    Calculator,
+    Position,
+    calculate_average_price,
+    calculate_average_price_safe,
+    get_backend,
+    running_average,
+    set_backend,
+)
+from .ledger import LotLedger
+from .rolling import RollingAverage, rolling_average
+
+# Attributes whose modules pull in numpy or pydantic; imported on first access
+_LAZY_ATTRIBUTES = {
+    "TradeFields": ".aggregate",
+    "group_by_average": ".aggregate",
+    "group_columnar_average": ".aggregate",
+    "merge_groups": ".aggregate",
+    "BatchOptions": ".batch",
+    "BatchResult": ".batch",
+    "calculate_average_price_batch": ".batch",
+    "ColumnarFile": ".columnar",
+    "write_columnar": ".columnar",
+    "SplitTable": ".corporate_actions",
+    "FxRateTable": ".fx",
+    "CalculationResult": ".models",
+    "PriceData": ".models",
+    "ResultRecord": ".models",
+    "TradeBuffer": ".models",
+}
+
+if TYPE_CHECKING:
+    from .aggregate import TradeFields, group_by_average, group_columnar_average, merge_groups
+    from .batch import BatchOptions, BatchResult, calculate_average_price_batch
+    from .columnar import ColumnarFile, write_columnar
+    from .corporate_actions import SplitTable
+    from .fx import FxRateTable
+    from .models import CalculationResult, PriceData, ResultRecord, TradeBuffer
+
+    __version__: str
 
 
 def get_version() -> str:
+    from importlib import metadata as importlib_metadata
+
     try:
         return importlib_metadata.version(__name__)
     except importlib_metadata.PackageNotFoundError:  # pragma: no cover
         return "unknown"
 
 
-__version__: str = get_version()
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value: Any = get_version()
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
 
 __all__ = [
+    "BatchOptions",
+    "BatchResult",
     "CalculationResult",
+    "Calculator",
+    "ColumnarFile",
+    "FxRateTable",
+    "LotLedger",
+    "Position",
     "PriceData",
+    "ResultRecord",
+    "RollingAverage",
+    "SplitTable",
+    "TradeBuffer",
+    "TradeFields",
     "__version__",
     "calculate_average_price",
+    "calculate_average_price_batch",
     "calculate_average_price_safe",
+    "get_backend",
+    "group_by_average",
+    "group_columnar_average",
+    "merge_groups",
+    "rolling_average",
+    "running_average",
+    "set_backend",
+    "write_columnar",
 ]
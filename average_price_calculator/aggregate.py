@@ -0,0 +1,283 @@
+"""Group-by aggregation of trades into mergeable positions."""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .calculator import Position
+
+if TYPE_CHECKING:
+    import os
+
+    from .columnar import ColumnarFile
+    from .corporate_actions import SplitFactors, SplitTable
+    from .fx import FxRateTable
+
+GroupKey = tuple[Any, ...]
+
+_ONE = Decimal(1)
+
+
+class TradeFields(NamedTuple):
+    """Names of the fields (or columns) each trade is read from."""
+
+    quantity: str = "quantity"
+    price: str = "price"
+    symbol: str = "symbol"
+    currency: str = "currency"
+    timestamp: str = "timestamp"
+
+
+DEFAULT_FIELDS = TradeFields()
+
+# Most decimal places tried when reading a float column as scaled integers
+_MAX_COLUMN_SCALE = 15
+# Integer sums up to 2**53 are exact in float64; half of it leaves room for
+# the rounding of the estimate that is checked against it
+_EXACT_SUM_LIMIT = 2.0**52
+
+
+def group_by_average(
+    trades: Iterable[Mapping[str, Any]],
+    keys: Sequence[str] = ("symbol",),
+    *,
+    fields: TradeFields = DEFAULT_FIELDS,
+    splits: "SplitTable | None" = None,
+    fx: "FxRateTable | None" = None,
+) -> dict[GroupKey, Position]:
+    """
+    Fold trades into one Position per distinct combination of `keys`.
+
+    The returned positions hold exact partial sums, so results for different
+    files, processes or days can be combined with `merge_groups`. With
+    `splits`, each trade is adjusted to the latest share basis of its symbol
+    as it is added. With `fx`, prices are converted to the table's base
+    currency at the rate as of the trade; trades without a rate are collected
+    and reported together in one MissingRateError after the input is read.
+    `fields` names the quantity, price, symbol, currency and timestamp fields.
+    """
+    groups: dict[GroupKey, Position] = {}
+    missing: set[tuple[str, Any]] = set()
+    for trade in trades:
+        price = trade[fields.price]
+        if fx is not None:
+            currency, timestamp = trade[fields.currency], trade[fields.timestamp]
+            rate = fx.rate(currency, timestamp)
+            if rate is None:
+                missing.add((currency, timestamp))
+                continue
+            price = Decimal(str(price)) * rate
+
+        key = tuple(trade[k] for k in keys)
+        position = groups.get(key)
+        if position is None:
+            position = groups[key] = Position()
+        factor = (
+            None if splits is None else splits.factor(trade[fields.symbol], trade[fields.timestamp])
+        )
+        position.add(trade[fields.quantity], price, factor)
+
+    if missing:
+        from .fx import MissingRateError
+
+        raise MissingRateError(sorted(missing))
+    return groups
+
+
+def merge_groups(*partials: Mapping[GroupKey, Position]) -> dict[GroupKey, Position]:
+    """Reduce partial group-by results into one. The inputs are left untouched."""
+    merged: dict[GroupKey, Position] = {}
+    for partial in partials:
+        for key, position in partial.items():
+            current = merged.get(key)
+            merged[key] = position.copy() if current is None else current.merge(position)
+    return merged
+
+
+def _scaled_column(values: Any) -> tuple[Any, int] | None:
+    """
+    `values * 10**scale` as integral float64 at the smallest scale where each
+    integer is the value's shortest repr, i.e. what Decimal(str(value)) reads.
+    None if no scale up to _MAX_COLUMN_SCALE works.
+    """
+    import numpy as np
+
+    largest = float(values.max()) if len(values) else 0.0
+    for scale in range(_MAX_COLUMN_SCALE + 1):
+        factor = 10.0**scale
+        # Beyond this the decimal grid is finer than the float spacing, so an
+        # integer that rounds back to the value need not be its repr
+        if largest * factor >= _EXACT_SUM_LIMIT:
+            return None
+        scaled = np.rint(values * factor)
+        if np.array_equal(scaled / factor, values):
+            return scaled, scale
+    return None
+
+
+def _exact_group_sums(
+    inverse: Any, groups: int, quantity: Any, price: Any
+) -> tuple[list[Decimal], list[Decimal]]:
+    """
+    Per-group sums of quantity and quantity * price, exactly as Position.add
+    accumulates them.
+
+    When both columns have few decimal places, the sums are taken over scaled
+    integers with np.bincount, which is exact while they stay below 2**53.
+    Otherwise the chunk falls back to Decimal row by row.
+    """
+    import numpy as np
+
+    scaled_quantity = _scaled_column(quantity)
+    scaled_price = _scaled_column(price)
+    if scaled_quantity is not None and scaled_price is not None:
+        (quantity_units, quantity_scale), (price_units, price_scale) = (
+            scaled_quantity,
+            scaled_price,
+        )
+        investment_units = quantity_units * price_units
+        if (
+            float(quantity_units.sum()) < _EXACT_SUM_LIMIT
+            and float(investment_units.sum()) < _EXACT_SUM_LIMIT
+        ):
+            quantities = np.bincount(inverse, weights=quantity_units, minlength=groups)
+            investments = np.bincount(inverse, weights=investment_units, minlength=groups)
+            return (
+                [Decimal(int(total)).scaleb(-quantity_scale) for total in quantities.tolist()],
+                [
+                    Decimal(int(total)).scaleb(-quantity_scale - price_scale)
+                    for total in investments.tolist()
+                ],
+            )
+
+    quantity_sums = [Decimal(0)] * groups
+    investment_sums = [Decimal(0)] * groups
+    for code, row_quantity, row_price in zip(
+        inverse.tolist(), quantity.tolist(), price.tolist(), strict=True
+    ):
+        decimal_quantity = Decimal(repr(row_quantity))
+        quantity_sums[code] += decimal_quantity
+        investment_sums[code] += decimal_quantity * Decimal(repr(row_price))
+    return quantity_sums, investment_sums
+
+
+def _chunk_positions(
+    key_columns: list[Any],
+    quantity: Any,
+    price: Any,
+    factors: "SplitFactors | None",
+    rates: Any,
+) -> Iterator[tuple[GroupKey, Position]]:
+    """
+    One exact Position per distinct row of `key_columns` in a chunk, split
+    further by split factor and FX rate if given, which scale the group's
+    quantity and investment sums.
+    """
+    import numpy as np
+
+    group_columns = list(key_columns)
+    if factors is not None:
+        group_columns.append(factors.codes)
+    if rates is not None:
+        group_columns.append(rates)
+    unique, inverse = np.unique(np.rec.fromarrays(group_columns), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    quantities, investments = _exact_group_sums(inverse, len(unique), quantity, price)
+    counts = np.bincount(inverse, minlength=len(unique))
+
+    key_count = len(key_columns)
+    for group, quantity_sum, investment_sum, count in zip(
+        unique.tolist(), quantities, investments, counts.tolist(), strict=True
+    ):
+        multipliers = iter(group[key_count:])
+        factor = _ONE if factors is None else factors.values[next(multipliers)]
+        rate = _ONE if rates is None else Decimal(repr(next(multipliers)))
+        yield tuple(group[:key_count]), Position.from_sums(
+            quantity_sum * factor, investment_sum * rate, count
+        )
+
+
+def _check_positive(quantity: Any, price: Any, offset: int) -> None:
+    import numpy as np
+
+    invalid = ~(np.isfinite(quantity) & (quantity > 0) & np.isfinite(price) & (price > 0))
+    if invalid.any():
+        msg = f"Row {offset + int(np.argmax(invalid))}: All values must be positive"
+        raise ValueError(msg)
+
+
+def _decoded(column: Any) -> Any:
+    import numpy as np
+
+    return np.char.decode(column, "utf-8") if column.dtype.kind == "S" else column
+
+
+def group_columnar_average(
+    source: "ColumnarFile | str | os.PathLike[str]",
+    keys: Sequence[str] = ("symbol",),
+    *,
+    fields: TradeFields = DEFAULT_FIELDS,
+    splits: "SplitTable | None" = None,
+    fx: "FxRateTable | None" = None,
+) -> dict[GroupKey, Position]:
+    """
+    group_by_average over a columnar file, one memory-mapped chunk of the
+    file's `chunk_size` rows at a time.
+
+    Within a chunk, fills are grouped by key and, with `splits` or `fx`, by
+    split factor and FX rate, each looked up in one vectorized pass. The sums
+    of each group are exact (see _exact_group_sums), so without `splits` and
+    `fx` the result equals group_by_average. The Decimal factor and rate
+    scale each group's sums once rather than each fill, so with them the sums
+    can differ from group_by_average's in the last of the 28 significant
+    digits. Bytes keys are decoded to str. Fills without a rate are reported
+    together in one MissingRateError after the whole file is read.
+    """
+    from .columnar import ColumnarFile
+    from .fx import MissingRateError
+
+    if not isinstance(source, ColumnarFile):
+        source = ColumnarFile(source)
+
+    names = [*keys, fields.quantity, fields.price]
+    if splits is not None:
+        names += [fields.symbol, fields.timestamp]
+    if fx is not None:
+        names += [fields.currency, fields.timestamp]
+
+    groups: dict[GroupKey, Position] = {}
+    missing: set[tuple[str, Any]] = set()
+    offset = 0
+    for chunk in source.chunks(names=dict.fromkeys(names)):
+        quantity = chunk[fields.quantity]
+        price = chunk[fields.price]
+        _check_positive(quantity, price, offset)
+        offset += len(quantity)
+
+        key_columns = [_decoded(chunk[k]) for k in keys]
+        factors = (
+            None
+            if splits is None
+            else splits.factors(_decoded(chunk[fields.symbol]), chunk[fields.timestamp])
+        )
+        rates = None
+        if fx is not None:
+            currencies = _decoded(chunk[fields.currency])
+            conversion = fx.lookup(currencies, chunk[fields.timestamp])
+            rates = conversion.rates
+            if conversion.missing.any():
+                # Keep going so every missing rate of the file is reported at once
+                missing.update(fx.missing(currencies, chunk[fields.timestamp]))
+                found = ~conversion.missing
+                key_columns = [column[found] for column in key_columns]
+                quantity, price, rates = quantity[found], price[found], rates[found]
+                if factors is not None:
+                    factors = factors._replace(codes=factors.codes[found])
+
+        for key, partial in _chunk_positions(key_columns, quantity, price, factors, rates):
+            current = groups.get(key)
+            groups[key] = partial if current is None else current.merge(partial)
+
+    if missing:
+        raise MissingRateError(sorted(missing))
+    return groups
@@ -0,0 +1,261 @@
+"""Vectorized calculator over NumPy arrays."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+import os
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from . import metrics
+from .calculator import calculate_average_price
+from .models import ResultRecord
+
+# Relative distance from a rounding tie below which float rounding may disagree with Decimal
+TIE_TOLERANCE = 1e-12
+# Scaled magnitude above which float64 can no longer resolve half a unit
+_MAX_RESOLVED_SCALED = 2.0**52
+# Rows per chunk of a streamed batch run
+DEFAULT_CHUNK_SIZE = 10_000
+# Rows per worker task in parallel mode
+DEFAULT_SHARD_SIZE = 500_000
+# Below this many rows process startup costs more than it saves
+MIN_PARALLEL_ROWS = 1_000_000
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    """
+    How a batch run is calculated and divided into work.
+
+    `chunk_size` rows are read, calculated and written at a time, and are
+    the unit handed to a worker process. Runs use up to `workers` processes,
+    but only once they reach `min_parallel_rows` rows.
+    """
+
+    precision: int = 6
+    exact: bool = False
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    workers: int = 1
+    min_parallel_rows: int = MIN_PARALLEL_ROWS
+
+    def __post_init__(self) -> None:
+        if self.precision < 0:
+            raise ValueError("Precision must be non-negative")
+        if self.chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        if self.workers < 1:
+            raise ValueError("Workers must be positive")
+
+
+class BatchResult(NamedTuple):
+    """Result columns of a batch calculation. Invalid rows hold NaN."""
+
+    average_price: npt.NDArray[np.float64]
+    total_quantity: npt.NDArray[np.float64]
+    total_investment: npt.NDArray[np.float64]
+    invalid: npt.NDArray[np.bool_]
+
+    def records(self) -> list[ResultRecord | None]:
+        """Per-row result records; None for invalid rows."""
+        return [
+            None if invalid else ResultRecord(avg, qty, inv)
+            for avg, qty, inv, invalid in zip(
+                self.average_price.tolist(),
+                self.total_quantity.tolist(),
+                self.total_investment.tolist(),
+                self.invalid.tolist(),
+                strict=True,
+            )
+        ]
+
+
+def round_half_up(values: npt.NDArray[np.float64], precision: int) -> npt.NDArray[np.float64]:
+    """Round positive values half-up to `precision` decimal places."""
+    scale = 10.0**precision
+    # Values too large to scale stay infinite or NaN, as the exact fallback expects
+    with np.errstate(over="ignore", invalid="ignore"):
+        return np.floor(values * scale + 0.5) / scale
+
+
+def near_rounding_tie(values: npt.NDArray[np.float64], precision: int) -> npt.NDArray[np.bool_]:
+    """Mask of values whose float rounding could differ from Decimal rounding."""
+    with np.errstate(over="ignore", invalid="ignore"):
+        scaled = values * 10.0**precision
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        return (distance <= TIE_TOLERANCE * np.maximum(scaled, 1.0)) | (
+            scaled >= _MAX_RESOLVED_SCALED
+        )
+
+
+def calculate_average_price_batch(  # noqa: PLR0913 - the four input columns, then the options
+    initial_quantity: npt.ArrayLike,
+    initial_price: npt.ArrayLike,
+    new_quantity: npt.ArrayLike,
+    new_price: npt.ArrayLike,
+    *,
+    precision: int = 6,
+    exact: bool = False,
+) -> BatchResult:
+    """
+    Weighted average prices for whole columns at once.
+
+    Inputs are broadcast against each other. Rows with a non-positive or non-finite
+    value, or whose results overflow float64, are flagged in `invalid` instead of
+    raising. With `exact=True`, rows close to a rounding tie are recomputed with
+    `calculate_average_price` so the output matches the Decimal path; rows that
+    path rejects (results too long for its context) are flagged as well.
+    """
+    if precision < 0:
+        raise ValueError("Precision must be non-negative")
+
+    started = metrics.now_ns() if metrics.enabled else 0
+    iq, ip, nq, np_ = np.broadcast_arrays(
+        *(
+            np.atleast_1d(np.asarray(x, dtype=np.float64))
+            for x in (initial_quantity, initial_price, new_quantity, new_price)
+        )
+    )
+
+    invalid = np.zeros(iq.shape, dtype=bool)
+    for column in (iq, ip, nq, np_):
+        invalid |= ~(np.isfinite(column) & (column > 0))
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        total_investment = iq * ip + nq * np_
+        total_quantity = iq + nq
+        average_price = total_investment / total_quantity
+    invalid |= ~(
+        np.isfinite(average_price) & np.isfinite(total_quantity) & np.isfinite(total_investment)
+    )
+
+    average_price[invalid] = np.nan
+    total_quantity[invalid] = np.nan
+    total_investment[invalid] = np.nan
+
+    if exact:
+        ambiguous = ~invalid & (
+            near_rounding_tie(average_price, precision)
+            | near_rounding_tie(total_quantity, precision)
+            | near_rounding_tie(total_investment, precision)
+        )
+    else:
+        ambiguous = np.zeros(iq.shape, dtype=bool)
+
+    average_price = round_half_up(average_price, precision)
+    total_quantity = round_half_up(total_quantity, precision)
+    total_investment = round_half_up(total_investment, precision)
+
+    # Exact mode: fall back to Decimal semantics for the few rows near a tie
+    for index in zip(*np.nonzero(ambiguous), strict=True):
+        try:
+            row = calculate_average_price(
+                float(iq[index]), float(ip[index]), float(nq[index]), float(np_[index]), precision
+            )
+        except ArithmeticError:
+            invalid[index] = True
+            row = (np.nan, np.nan, np.nan)
+        average_price[index], total_quantity[index], total_investment[index] = row
+
+    if started:
+        metrics.record("batch.calculate", metrics.now_ns() - started)
+    return BatchResult(average_price, total_quantity, total_investment, invalid)
+
+
+def _calculate_shard(
+    columns: tuple[npt.NDArray[np.float64], ...], options: BatchOptions
+) -> BatchResult:
+    initial_quantity, initial_price, new_quantity, new_price = columns
+    return calculate_average_price_batch(
+        initial_quantity,
+        initial_price,
+        new_quantity,
+        new_price,
+        precision=options.precision,
+        exact=options.exact,
+    )
+
+
+def calculate_average_price_parallel(
+    initial_quantity: npt.ArrayLike,
+    initial_price: npt.ArrayLike,
+    new_quantity: npt.ArrayLike,
+    new_price: npt.ArrayLike,
+    options: BatchOptions | None = None,
+) -> BatchResult:
+    """
+    calculate_average_price_batch split into row-range shards over a process pool.
+
+    Shards of `options.chunk_size` rows are computed by up to `options.workers`
+    processes and merged back in input order. Inputs shorter than
+    `options.min_parallel_rows`, or that fit in one shard, are computed
+    serially in the calling process. Without `options`, shards of
+    DEFAULT_SHARD_SIZE rows go to one process per CPU.
+    """
+    if options is None:
+        options = BatchOptions(chunk_size=DEFAULT_SHARD_SIZE, workers=os.cpu_count() or 1)
+
+    columns = np.broadcast_arrays(
+        *(
+            np.atleast_1d(np.asarray(x, dtype=np.float64))
+            for x in (initial_quantity, initial_price, new_quantity, new_price)
+        )
+    )
+    shape = columns[0].shape
+    rows = columns[0].size
+    shard_size = options.chunk_size
+
+    if options.workers == 1 or rows < options.min_parallel_rows or rows <= shard_size:
+        return _calculate_shard(tuple(columns), options)
+
+    flat = [column.reshape(-1) for column in columns]
+    shards = (
+        tuple(column[start : start + shard_size] for column in flat)
+        for start in range(0, rows, shard_size)
+    )
+    compute = partial(_calculate_shard, options=options)
+
+    with ProcessPoolExecutor(max_workers=min(options.workers, -(-rows // shard_size))) as pool:
+        parts = list(pool.map(compute, shards))
+
+    return BatchResult(
+        *(np.concatenate(column).reshape(shape) for column in zip(*parts, strict=True))
+    )
+
+
+def running_average_batch(
+    quantity: npt.ArrayLike, price: npt.ArrayLike, precision: int = 6
+) -> BatchResult:
+    """
+    Vectorized running_average: the position after each fill, from cumulative sums.
+
+    Invalid fills (non-positive or non-finite) are flagged and skipped; their
+    rows hold NaN. The sums are float64, so very long series can differ from
+    running_average in the last digits.
+    """
+    if precision < 0:
+        raise ValueError("Precision must be non-negative")
+
+    quantities, prices = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (quantity, price))
+    )
+    invalid = ~(np.isfinite(quantities) & (quantities > 0) & np.isfinite(prices) & (prices > 0))
+    with np.errstate(invalid="ignore", over="ignore"):
+        total_quantity = np.cumsum(np.where(invalid, 0.0, quantities))
+        total_investment = np.cumsum(np.where(invalid, 0.0, quantities * prices))
+        average_price = total_investment / total_quantity
+    invalid |= ~(
+        np.isfinite(average_price) & np.isfinite(total_quantity) & np.isfinite(total_investment)
+    )
+
+    average_price[invalid] = np.nan
+    total_quantity[invalid] = np.nan
+    total_investment[invalid] = np.nan
+    return BatchResult(
+        round_half_up(average_price, precision),
+        round_half_up(total_quantity, precision),
+        round_half_up(total_investment, precision),
+        invalid,
+    )
@@ -0,0 +1,202 @@
+"""Bounded, thread-safe memoization in front of the calculator."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .calculator import calculate_average_price
+
+if TYPE_CHECKING:
+    from .models import CalculationResult, PriceData
+
+CacheKey = tuple[float, float, float, float, int]
+Result = tuple[float, float, float]
+
+DEFAULT_MAXSIZE = 4096
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of a CalculationCache; `rejected` counts rows warm skipped as invalid."""
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    rejected: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CalculationCache:
+    """
+    LRU cache of calculate_average_price results, with an optional TTL.
+
+    Keys are the inputs normalized to float plus the precision, so 100 and
+    100.0 share an entry. Invalid inputs raise as usual and are not cached.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[Result, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+
+    @staticmethod
+    def key(
+        initial_quantity: float,
+        initial_price: float,
+        new_quantity: float,
+        new_price: float,
+        precision: int = 6,
+    ) -> CacheKey:
+        return (
+            float(initial_quantity),
+            float(initial_price),
+            float(new_quantity),
+            float(new_price),
+            int(precision),
+        )
+
+    def _lookup(self, key: CacheKey) -> Result | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires_at = entry
+                if self.ttl is None or self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return result
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    def _store(self, key: CacheKey, result: Result) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def calculate(
+        self,
+        initial_quantity: float,
+        initial_price: float,
+        new_quantity: float,
+        new_price: float,
+        precision: int = 6,
+    ) -> Result:
+        """Cached calculate_average_price."""
+        key = self.key(initial_quantity, initial_price, new_quantity, new_price, precision)
+        result = self._lookup(key)
+        if result is None:
+            # Computed outside the lock; concurrent misses on one key may both compute
+            result = calculate_average_price(*key[:4], precision)
+            self._store(key, result)
+        return result
+
+    def calculate_safe(self, data: "PriceData", precision: int = 6) -> "CalculationResult":
+        """Cached calculate_average_price_safe."""
+        from .models import CalculationResult
+
+        avg_price, total_qty, total_inv = self.calculate(
+            data.initial_quantity, data.initial_price, data.new_quantity, data.new_price, precision
+        )
+        return CalculationResult(
+            average_price=avg_price, total_quantity=total_qty, total_investment=total_inv
+        )
+
+    def warm(self, rows: Iterable[Sequence[float]], precision: int = 6) -> int:
+        """
+        Precompute results for many input rows in one vectorized call.
+
+        Rows already cached are skipped. Invalid rows (malformed, non-positive
+        or beyond the Decimal context) are skipped too and counted in
+        stats().rejected. Returns the number of entries added.
+        """
+        from .batch import calculate_average_price_batch
+
+        candidates = [self._row_key(row, precision) for row in rows]
+        rejected = candidates.count(None)
+        with self._lock:
+            keys = list(
+                dict.fromkeys(
+                    key for key in candidates if key is not None and key not in self._entries
+                )
+            )
+
+        added = 0
+        if keys:
+            initial_quantity, initial_price, new_quantity, new_price, _ = zip(*keys, strict=True)
+            result = calculate_average_price_batch(
+                initial_quantity,
+                initial_price,
+                new_quantity,
+                new_price,
+                precision=precision,
+                exact=True,
+            )
+            for key, record in zip(keys, result.records(), strict=True):
+                if record is None:
+                    rejected += 1
+                else:
+                    self._store(key, tuple(record))  # type: ignore[arg-type]
+                    added += 1
+        with self._lock:
+            self._rejected += rejected
+        return added
+
+    def _row_key(self, row: Sequence[float], precision: int) -> CacheKey | None:
+        """Key of an (initial_quantity, initial_price, new_quantity, new_price) row, if valid."""
+        try:
+            initial_quantity, initial_price, new_quantity, new_price = row
+            return self.key(initial_quantity, initial_price, new_quantity, new_price, precision)
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                rejected=self._rejected,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._expirations = 0
+            self._rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
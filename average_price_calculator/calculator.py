@@ -1,8 +1,89 @@
 """Main calculator logic."""
 
-from decimal import ROUND_HALF_UP, Decimal
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from decimal import (
+    ROUND_05UP,
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    ROUND_UP,
+    Context,
+    Decimal,
+    DivisionByZero,
+    InvalidOperation,
+    Overflow,
+    localcontext,
+)
+from functools import lru_cache, partial
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any
 
-from .models import CalculationResult, PriceData
+from . import metrics
+from .fixedpoint import calculate_average_price_fixed
+
+if TYPE_CHECKING:
+    from .models import CalculationResult, PriceData
+
+BACKENDS = ("decimal", "fixed")
+_default_backend = "decimal"
+
+ROUNDING_MODES = (
+    ROUND_HALF_UP,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_DOWN,
+    ROUND_UP,
+    ROUND_DOWN,
+    ROUND_CEILING,
+    ROUND_FLOOR,
+    ROUND_05UP,
+)
+# Context of Calculator arithmetic unless one is given: decimal's own defaults,
+# spelled out so changes to decimal.DefaultContext do not leak in
+DEFAULT_CONTEXT = Context(
+    prec=28, rounding=ROUND_HALF_EVEN, traps=[InvalidOperation, DivisionByZero, Overflow]
+)
+# Rows per thread-pool task in Calculator.calculate_many
+DEFAULT_THREAD_CHUNK = 1024
+
+
+def set_backend(name: str) -> None:
+    """
+    Select the arithmetic backend of calculate_average_price and
+    calculate_average_price_safe calls that do not pass one.
+    """
+    global _default_backend  # noqa: PLW0603
+    if name not in BACKENDS:
+        msg = f"Unknown backend: {name}"
+        raise ValueError(msg)
+    _default_backend = name
+
+
+def get_backend() -> str:
+    """Name of the global arithmetic backend."""
+    return _default_backend
+
+
+def _use_fixed(backend: str | None) -> bool:
+    name = backend or _default_backend
+    if name not in BACKENDS:
+        msg = f"Unknown backend: {name}"
+        raise ValueError(msg)
+    return name == "fixed"
+
+
+@lru_cache(maxsize=32)
+def _quantum(precision: int) -> Decimal:
+    """Quantize exponent for the given number of decimal places."""
+    return Decimal(f"0.{'0' * precision}")
+
+
+def round_decimal(value: Decimal, precision: int) -> float:
+    """Round half-up to `precision` places and convert to float."""
+    return float(value.quantize(_quantum(precision), rounding=ROUND_HALF_UP))
 
 
 def calculate_average_price(
@@ -13,10 +94,17 @@ def calculate_average_price(
     precision: int = 6,
 ) -> tuple[float, float, float]:
     """Weighted average price after an additional purchase. Returns (avg, total_qty, total_inv)."""
+    if _default_backend == "fixed":
+        return calculate_average_price_fixed(
+            initial_quantity, initial_price, new_quantity, new_price, precision
+        )
+
     # Validate inputs
     if any(x <= 0 for x in [initial_quantity, initial_price, new_quantity, new_price]):
         raise ValueError("All values must be positive")
 
+    started = metrics.now_ns() if metrics.enabled else 0
+
     # Calculate using Decimal for better precision
     total_investment = Decimal(str(initial_quantity)) * Decimal(str(initial_price)) + Decimal(
         str(new_quantity)
@@ -29,31 +117,288 @@ def calculate_average_price(
 
     average_price = total_investment / total_quantity
 
+    if started:
+        converted = metrics.now_ns()
+        metrics.record("calculator.convert", converted - started)
+        started = converted
+
     # Round with specified precision
-    rounding_format = f"0.{'0' * precision}"
+    avg_price_rounded = round_decimal(average_price, precision)
+    total_qty_rounded = round_decimal(total_quantity, precision)
+    total_inv_rounded = round_decimal(total_investment, precision)
 
-    avg_price_rounded = float(
-        average_price.quantize(Decimal(rounding_format), rounding=ROUND_HALF_UP)
-    )
-    total_qty_rounded = float(
-        total_quantity.quantize(Decimal(rounding_format), rounding=ROUND_HALF_UP)
-    )
-    total_inv_rounded = float(
-        total_investment.quantize(Decimal(rounding_format), rounding=ROUND_HALF_UP)
-    )
+    if started:
+        metrics.record("calculator.quantize", metrics.now_ns() - started)
 
     return avg_price_rounded, total_qty_rounded, total_inv_rounded
 
 
-def calculate_average_price_safe(data: PriceData, precision: int = 6) -> CalculationResult:
+class Position:
+    """
+    Accumulates any number of purchases with exact running sums.
+
+    Each fill is added in O(1); rounding happens only when a result is read,
+    so folding many fills does not accumulate rounding drift. Positions built
+    from different parts of the input can be combined with `merge`.
+    """
+
+    __slots__ = ("count", "total_investment", "total_quantity")
+
+    def __init__(self) -> None:
+        self.total_quantity = Decimal(0)
+        self.total_investment = Decimal(0)
+        self.count = 0
+
+    @classmethod
+    def from_sums(
+        cls, total_quantity: Decimal | str, total_investment: Decimal | str, count: int
+    ) -> "Position":
+        """Rebuild a position from previously computed partial sums."""
+        position = cls()
+        position.total_quantity = Decimal(total_quantity)
+        position.total_investment = Decimal(total_investment)
+        position.count = count
+        return position
+
+    def add(self, quantity: float, price: float, factor: Decimal | None = None) -> "Position":
+        """
+        Add a purchase of `quantity` units at `price`. Returns self for chaining.
+
+        With `factor` (e.g. a split adjustment), the quantity counts `factor`
+        times over at 1/`factor` of the price; the investment is unchanged.
+        """
+        if quantity <= 0 or price <= 0:
+            raise ValueError("All values must be positive")
+
+        started = metrics.now_ns() if metrics.enabled else 0
+        decimal_quantity = Decimal(str(quantity))
+        self.total_investment += decimal_quantity * Decimal(str(price))
+        self.total_quantity += decimal_quantity if factor is None else decimal_quantity * factor
+        self.count += 1
+        if started:
+            metrics.record("calculator.convert", metrics.now_ns() - started)
+        return self
+
+    def merge(self, other: "Position") -> "Position":
+        """New position holding the fills of both. Associative and commutative."""
+        return Position.from_sums(
+            self.total_quantity + other.total_quantity,
+            self.total_investment + other.total_investment,
+            self.count + other.count,
+        )
+
+    __add__ = merge
+
+    def copy(self) -> "Position":
+        """Independent position with the same sums."""
+        return Position.from_sums(self.total_quantity, self.total_investment, self.count)
+
+    def to_dict(self) -> dict[str, str | int]:
+        """JSON-friendly partial sums; Decimals are kept exact as strings."""
+        return {
+            "total_quantity": str(self.total_quantity),
+            "total_investment": str(self.total_investment),
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Position":
+        """Inverse of to_dict."""
+        return cls.from_sums(data["total_quantity"], data["total_investment"], data["count"])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.total_quantity, self.total_investment, self.count) == (
+            other.total_quantity,
+            other.total_investment,
+            other.count,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def average_price(self) -> Decimal:
+        """Unrounded weighted average price."""
+        if self.total_quantity == 0:
+            raise ZeroDivisionError("Total quantity cannot be zero")
+        return self.total_investment / self.total_quantity
+
+    def result(self, precision: int = 6) -> tuple[float, float, float]:
+        """Rounded (avg, total_qty, total_inv), as returned by calculate_average_price."""
+        started = metrics.now_ns() if metrics.enabled else 0
+        result = (
+            round_decimal(self.average_price, precision),
+            round_decimal(self.total_quantity, precision),
+            round_decimal(self.total_investment, precision),
+        )
+        if started:
+            metrics.record("calculator.quantize", metrics.now_ns() - started)
+        return result
+
+    def __repr__(self) -> str:
+        return (
+            f"Position(total_quantity={self.total_quantity}, "
+            f"total_investment={self.total_investment}, count={self.count})"
+        )
+
+
+def running_average(
+    fills: Iterable[tuple[float, float]], precision: int = 6
+) -> Iterator[tuple[float, float, float]]:
+    """Yield (avg, total_qty, total_inv) after each (quantity, price) fill."""
+    position = Position()
+    for quantity, price in fills:
+        yield position.add(quantity, price).result(precision)
+
+
+class Calculator:
+    """
+    calculate_average_price with its own Decimal context and rounding mode.
+
+    Arithmetic runs in a copy of `context` entered once per call (once per
+    chunk in calculate_many), never in the caller's thread context, so results
+    do not depend on decimal.getcontext() and one instance can be shared by
+    any number of threads. `rounding` applies to the final quantize to
+    `precision` places; the quantize exponent is built once, not per call.
+    """
+
+    __slots__ = ("_quantum", "context", "precision", "rounding")
+
+    def __init__(
+        self,
+        precision: int = 6,
+        rounding: str = ROUND_HALF_UP,
+        context: Context | None = None,
+    ) -> None:
+        if precision < 0:
+            raise ValueError("Precision must be non-negative")
+        if rounding not in ROUNDING_MODES:
+            msg = f"Unknown rounding mode: {rounding}"
+            raise ValueError(msg)
+        self.precision = precision
+        self.rounding = rounding
+        self.context = (context or DEFAULT_CONTEXT).copy()
+        self._quantum = _quantum(precision)
+
+    def __repr__(self) -> str:
+        return (
+            f"Calculator(precision={self.precision}, rounding={self.rounding}, "
+            f"context_precision={self.context.prec})"
+        )
+
+    def _quantum_for(self, precision: int | None) -> Decimal:
+        if precision is None or precision == self.precision:
+            return self._quantum
+        if precision < 0:
+            raise ValueError("Precision must be non-negative")
+        return _quantum(precision)
+
+    def _calculate(
+        self,
+        initial_quantity: float,
+        initial_price: float,
+        new_quantity: float,
+        new_price: float,
+        quantum: Decimal,
+    ) -> tuple[float, float, float]:
+        """Body of calculate; runs in whatever context is current."""
+        # Negated comparisons so that NaN is rejected too
+        if not (initial_quantity > 0 and initial_price > 0 and new_quantity > 0 and new_price > 0):
+            raise ValueError("All values must be positive")
+
+        decimal_initial = Decimal(str(initial_quantity))
+        decimal_new = Decimal(str(new_quantity))
+        total_investment = decimal_initial * Decimal(str(initial_price)) + decimal_new * Decimal(
+            str(new_price)
+        )
+        total_quantity = decimal_initial + decimal_new
+        rounding = self.rounding
+        return (
+            float((total_investment / total_quantity).quantize(quantum, rounding)),
+            float(total_quantity.quantize(quantum, rounding)),
+            float(total_investment.quantize(quantum, rounding)),
+        )
+
+    def calculate(
+        self,
+        initial_quantity: float,
+        initial_price: float,
+        new_quantity: float,
+        new_price: float,
+        precision: int | None = None,
+    ) -> tuple[float, float, float]:
+        """calculate_average_price in this calculator's context and rounding mode."""
+        quantum = self._quantum_for(precision)
+        with localcontext(self.context):
+            return self._calculate(
+                initial_quantity, initial_price, new_quantity, new_price, quantum
+            )
+
+    def _calculate_row(
+        self, row: Sequence[float], quantum: Decimal
+    ) -> tuple[float, float, float] | None:
+        """_calculate for one row, or None if it cannot be calculated (including its shape)."""
+        try:
+            initial_quantity, initial_price, new_quantity, new_price = row
+            return self._calculate(
+                initial_quantity, initial_price, new_quantity, new_price, quantum
+            )
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+
+    def _calculate_chunk(
+        self, rows: Sequence[Sequence[float]], quantum: Decimal
+    ) -> list[tuple[float, float, float] | None]:
+        with localcontext(self.context):
+            return [self._calculate_row(row, quantum) for row in rows]
+
+    def calculate_many(
+        self,
+        rows: Iterable[Sequence[float]],
+        precision: int | None = None,
+        *,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_THREAD_CHUNK,
+    ) -> list[tuple[float, float, float] | None]:
+        """
+        calculate for many (initial_quantity, initial_price, new_quantity, new_price)
+        rows; rows that cannot be calculated come back as None.
+
+        With `workers` > 1, chunks of `chunk_size` rows run on a thread pool,
+        each in its own copy of the context, and results keep the input order,
+        so the output is identical to a serial run. Decimal arithmetic holds
+        the GIL, so threads add throughput only on free-threaded builds; on
+        others they let a threaded service share one configured calculator.
+        """
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("Workers and chunk size must be positive")
+
+        quantum = self._quantum_for(precision)
+        iterator = iter(rows)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+        compute = partial(self._calculate_chunk, quantum=quantum)
+        if workers == 1:
+            return list(chain.from_iterable(map(compute, chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(chain.from_iterable(pool.map(compute, chunks)))
+
+
+def calculate_average_price_safe(
+    data: "PriceData", precision: int = 6, backend: str | None = None
+) -> "CalculationResult":
     """Average price from validated PriceData; returns CalculationResult."""
-    avg_price, total_qty, total_inv = calculate_average_price(
-        data.initial_quantity,
-        data.initial_price,
-        data.new_quantity,
-        data.new_price,
-        precision,
-    )
+    from .models import CalculationResult
+
+    if _use_fixed(backend):
+        avg_price, total_qty, total_inv = calculate_average_price_fixed(
+            data.initial_quantity, data.initial_price, data.new_quantity, data.new_price, precision
+        )
+    else:
+        position = Position()
+        position.add(data.initial_quantity, data.initial_price)
+        position.add(data.new_quantity, data.new_price)
+        avg_price, total_qty, total_inv = position.result(precision)
 
     return CalculationResult(
         average_price=avg_price,
@@ -0,0 +1,229 @@
+"""
+Incremental group-by over append-only trade logs.
+
+A checkpoint stores the exact per-key partial sums together with the byte
+offset reached in the log and a fingerprint of the bytes before it. A later
+run verifies the fingerprint and only reads what was appended since; since
+the sums are exact, the result equals a full recomputation. A missing,
+corrupted or mismatched checkpoint (the log was truncated, rewritten or read
+with different options) falls back to a full rebuild.
+"""
+
+from collections.abc import Iterator, Sequence
+import csv
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from .aggregate import DEFAULT_FIELDS, GroupKey, TradeFields
+from .calculator import Position
+from .streaming import FORMATS, infer_format
+
+if TYPE_CHECKING:
+    from decimal import Decimal
+
+    from .corporate_actions import SplitTable
+
+CHECKPOINT_VERSION = 1
+# Bytes hashed at the start of the log and just before the checkpoint offset
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 4 * 1024
+
+
+@dataclass
+class Checkpoint:
+    """Partial sums of a log up to `offset`, plus what is needed to resume."""
+
+    offset: int
+    fingerprint: str
+    options: dict[str, Any]
+    groups: dict[GroupKey, Position] = field(default_factory=dict)
+    fieldnames: list[str] | None = None
+    rejected: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "offset": self.offset,
+            "fingerprint": self.fingerprint,
+            "options": self.options,
+            "fieldnames": self.fieldnames,
+            "rejected": self.rejected,
+            "groups": [
+                {"key": list(key), **position.to_dict()} for key, position in self.groups.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Checkpoint":
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported checkpoint version")
+        return cls(
+            offset=int(data["offset"]),
+            fingerprint=str(data["fingerprint"]),
+            options=dict(data["options"]),
+            fieldnames=data["fieldnames"],
+            rejected=int(data["rejected"]),
+            groups={tuple(group["key"]): Position.from_dict(group) for group in data["groups"]},
+        )
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Write atomically, so an interrupted save leaves the previous checkpoint."""
+        path = Path(path)
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(json.dumps(self.to_dict()))
+        temporary.replace(path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> "Checkpoint | None":
+        """The saved checkpoint, or None if it is missing or unreadable."""
+        try:
+            return cls.from_dict(json.loads(Path(path).read_text()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+@dataclass
+class IncrementalResult:
+    """Outcome of update_groups."""
+
+    groups: dict[GroupKey, Position]
+    rows: int
+    rejected: int
+    offset: int
+    rebuilt: bool
+
+
+def fingerprint(stream: IO[bytes], offset: int) -> str:
+    """Hash of the log's first bytes and of the bytes just before `offset`."""
+    digest = hashlib.sha256(str(offset).encode())
+    stream.seek(0)
+    digest.update(stream.read(min(offset, HEAD_BYTES)))
+    tail_start = max(offset - TAIL_BYTES, 0)
+    stream.seek(tail_start)
+    digest.update(stream.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def _complete_lines(stream: IO[bytes], offset: int) -> Iterator[tuple[int, str]]:
+    """Yield (end offset, line) for each newline-terminated line after `offset`."""
+    stream.seek(offset)
+    for line in stream:
+        if not line.endswith(b"\n"):
+            # A writer may still be appending this line; it is read next time
+            return
+        offset += len(line)
+        yield offset, line.decode()
+
+
+def update_groups(
+    source: str | os.PathLike[str],
+    checkpoint_path: str | os.PathLike[str],
+    keys: Sequence[str] = ("symbol",),
+    *,
+    fields: TradeFields = DEFAULT_FIELDS,
+    splits: "SplitTable | None" = None,
+) -> IncrementalResult:
+    """
+    group_by_average over a CSV or JSONL log, resuming from a checkpoint.
+
+    The format follows the log's extension (.jsonl/.ndjson, CSV otherwise).
+    Only complete lines are consumed. Rows with a missing, malformed or
+    non-positive quantity or price are counted as rejected and skipped. The
+    checkpoint is rewritten after the run.
+
+    With `splits`, fills are adjusted as in group_by_average. Timestamps are
+    compared as read (strings for CSV), so the table's effective times must be
+    of the same type. The checkpoint records the table's signature; running
+    with a different table rebuilds it, since its sums are already adjusted.
+    """
+    input_format = infer_format(os.fspath(source))
+    if input_format not in FORMATS:
+        msg = f"Unsupported log format: {input_format}"
+        raise ValueError(msg)
+    options = {
+        "keys": list(keys),
+        "input_format": input_format,
+        "quantity_field": fields.quantity,
+        "price_field": fields.price,
+    }
+    if splits is not None:
+        options.update(
+            splits=splits.signature(), symbol_field=fields.symbol, timestamp_field=fields.timestamp
+        )
+
+    with Path(source).open("rb") as stream:
+        size = os.fstat(stream.fileno()).st_size
+        loaded = Checkpoint.load(checkpoint_path)
+        rebuilt = (
+            loaded is None
+            or loaded.options != options
+            or loaded.offset > size
+            or loaded.fingerprint != fingerprint(stream, loaded.offset)
+        )
+        checkpoint = Checkpoint(0, "", options) if rebuilt or loaded is None else loaded
+
+        lines = _complete_lines(stream, checkpoint.offset)
+        rows = rejected = 0
+        for record in _records(lines, checkpoint, input_format):
+            try:
+                key, quantity, price, factor = _fill(record, keys, fields, splits)
+            except (KeyError, TypeError, ValueError):
+                rejected += 1
+                continue
+            rows += 1
+            position = checkpoint.groups.get(key)
+            if position is None:
+                position = checkpoint.groups[key] = Position()
+            position.add(quantity, price, factor)
+
+        checkpoint.rejected += rejected
+        checkpoint.fingerprint = fingerprint(stream, checkpoint.offset)
+
+    checkpoint.save(checkpoint_path)
+    return IncrementalResult(checkpoint.groups, rows, rejected, checkpoint.offset, rebuilt)
+
+
+def _fill(
+    record: Any, keys: Sequence[str], fields: TradeFields, splits: "SplitTable | None"
+) -> tuple[GroupKey, float, float, "Decimal | None"]:
+    """Key, quantity, price and split factor of a record; raises if it is unusable."""
+    key = tuple(record[k] for k in keys)
+    quantity = float(record[fields.quantity])
+    price = float(record[fields.price])
+    if not (quantity > 0 and price > 0):  # also rejects NaN
+        msg = "Quantity and price must be positive"
+        raise ValueError(msg)
+    factor = (
+        None if splits is None else splits.factor(record[fields.symbol], record[fields.timestamp])
+    )
+    return key, quantity, price, factor
+
+
+def _records(
+    lines: Iterator[tuple[int, str]], checkpoint: Checkpoint, input_format: str
+) -> Iterator[Any]:
+    """Parse lines into records, advancing the checkpoint offset as each is consumed."""
+
+    def text() -> Iterator[str]:
+        for end, line in lines:
+            checkpoint.offset = end
+            yield line
+
+    if input_format == "jsonl":
+        for line in text():
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+        return
+
+    reader = csv.DictReader(text(), fieldnames=checkpoint.fieldnames)
+    if checkpoint.fieldnames is None and reader.fieldnames is not None:
+        # On a fresh run this reads the header line; later runs resume after it
+        checkpoint.fieldnames = list(reader.fieldnames)
+    yield from reader
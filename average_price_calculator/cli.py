@@ -1,20 +1,32 @@
 """Command-line interface for the calculator."""
 
-from rich import print as rprint
-from rich.console import Console
-from rich.table import Table
+import contextlib
+from contextlib import ExitStack
+from functools import cache
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING
+
 import typer
 
-from . import __version__
-from .calculator import calculate_average_price_safe
-from .models import PriceData
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# rich, pydantic and numpy are imported inside the commands that use them,
+# so commands like `version` start without loading them.
 
 app = typer.Typer(
     name="avg-price-calc",
     help="Calculate weighted average prices for investments",
     add_completion=False,
 )
-console = Console()
+
+
+@cache
+def get_console(*, stderr: bool = False) -> "Console":
+    from rich.console import Console
+
+    return Console(stderr=stderr)
 
 
 @app.command()
@@ -59,6 +71,12 @@ def calculate(
         --initial-qty 100 --initial-price 10.5
         --new-qty 50 --new-price 12.0
     """
+    from rich.table import Table
+
+    from .calculator import calculate_average_price_safe
+    from .models import PriceData
+
+    console = get_console()
     try:
         data = PriceData(
             initial_quantity=initial_qty,
@@ -104,15 +122,335 @@ def calculate(
         raise typer.Exit(1) from e
 
 
+@app.command()
+def batch(
+    input_path: str = typer.Argument(
+        "-", help="CSV, JSONL or columnar (.apcol) file with PriceData columns; '-' reads stdin"
+    ),
+    *,
+    output: Path | None = typer.Option(
+        None, "--output", "-o", help="Output file (default: stdout)"
+    ),
+    input_format: str | None = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="Input format: csv, jsonl or columnar (default: from extension)",
+    ),
+    output_format: str | None = typer.Option(
+        None,
+        "--output-format",
+        help="Output format: csv, jsonl, npy or arrow (default: from --output, else as input)",
+    ),
+    chunk_size: int = typer.Option(10_000, "--chunk-size", "-c", help="Rows per chunk", min=1),
+    precision: int = typer.Option(
+        6, "--precision", "-p", help="Decimal precision for results", min=0, max=10
+    ),
+    exact: bool = typer.Option(
+        False, "--exact", help="Use Decimal rounding for rows near a rounding tie"
+    ),
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Worker processes computing chunks in parallel", min=1
+    ),
+) -> None:
+    """
+    Calculate average prices for every row of a CSV, JSONL or columnar file.
+
+    Rows are streamed in chunks, so memory stays flat for any input size.
+    Columnar files (see `convert`) are memory-mapped instead of parsed; their
+    results are written as CSV, or JSONL when --output ends in .jsonl.
+    The binary npy (a structured NumPy array) and arrow (Arrow IPC stream,
+    needs pyarrow) outputs hold the numeric inputs and the results and are
+    chosen by --output-format or an --output ending in .npy or .arrow.
+    Results go to stdout (or --output); the summary goes to stderr.
+
+    Example:
+        avg-price-calc batch positions.csv -o results.csv
+        avg-price-calc batch positions.apcol -o results.npy
+    """
+    import importlib.util
+
+    from .batch import BatchOptions
+    from .streaming import COLUMNAR_FORMAT, FORMATS, infer_format, process_columnar, process_stream
+    from .writers import BINARY_FORMATS, OUTPUT_FORMATS
+
+    fmt = input_format or infer_format(None if input_path == "-" else input_path)
+    if fmt not in (*FORMATS, COLUMNAR_FORMAT):
+        msg = f"Format must be one of: {', '.join((*FORMATS, COLUMNAR_FORMAT))}"
+        raise typer.BadParameter(msg)
+    if fmt == COLUMNAR_FORMAT and input_path == "-":
+        msg = "Columnar input must be a file, not stdin"
+        raise typer.BadParameter(msg)
+
+    if output_format is None:
+        inferred = infer_format(None if output is None else str(output))
+        # Text input is echoed in its own format unless a binary output file is named
+        output_format = inferred if fmt == COLUMNAR_FORMAT or inferred in BINARY_FORMATS else fmt
+    if output_format not in OUTPUT_FORMATS:
+        msg = f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}"
+        raise typer.BadParameter(msg)
+    if output_format == "npy" and output is None:
+        msg = "npy output needs a seekable --output file"
+        raise typer.BadParameter(msg)
+    if output_format == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        msg = "Arrow output requires pyarrow"
+        raise typer.BadParameter(msg)
+
+    binary = output_format in BINARY_FORMATS
+    with ExitStack() as stack:
+        if output is None:
+            sink = sys.stdout.buffer if binary else sys.stdout
+        else:
+            sink = stack.enter_context(
+                output.open("wb") if binary else output.open("w", newline="")
+            )
+        options = BatchOptions(
+            precision=precision, exact=exact, chunk_size=chunk_size, workers=workers
+        )
+        if fmt == COLUMNAR_FORMAT:
+            stats = process_columnar(input_path, sink, options, output_format=output_format)
+        else:
+            source = (
+                sys.stdin
+                if input_path == "-"
+                else stack.enter_context(Path(input_path).open(newline=""))
+            )
+            stats = process_stream(
+                source, sink, options, input_format=fmt, output_format=output_format
+            )
+
+    get_console(stderr=True).print(
+        f"[bold]Processed:[/bold] {stats.rows}  "
+        f"[bold]Rejected:[/bold] {stats.rejected}  "
+        f"[bold]Throughput:[/bold] {stats.rows_per_second:,.0f} rows/s"
+    )
+
+
+@app.command()
+def convert(
+    input_path: str = typer.Argument(..., help="CSV or JSONL file; '-' reads stdin"),
+    output: Path = typer.Argument(..., help="Columnar file to write (.apcol)"),
+    input_format: str | None = typer.Option(
+        None, "--format", "-f", help="Input format: csv or jsonl (default: from extension)"
+    ),
+    chunk_size: int = typer.Option(100_000, "--chunk-size", "-c", help="Rows per chunk", min=1),
+    symbol_width: int = typer.Option(16, "--symbol-width", help="Bytes reserved per symbol", min=1),
+) -> None:
+    """
+    Convert a CSV or JSONL file to the memory-mapped columnar format.
+
+    Known numeric fields (PriceData fields, quantity, price, timestamp) and
+    symbol are kept; other fields are dropped.
+
+    Example:
+        avg-price-calc convert trades.csv trades.apcol
+    """
+    from .columnar import write_records
+    from .streaming import FORMATS, infer_format, read_chunks
+
+    fmt = input_format or infer_format(None if input_path == "-" else input_path)
+    if fmt not in FORMATS:
+        msg = f"Format must be one of: {', '.join(FORMATS)}"
+        raise typer.BadParameter(msg)
+
+    with ExitStack() as stack:
+        source = (
+            sys.stdin
+            if input_path == "-"
+            else stack.enter_context(Path(input_path).open(newline=""))
+        )
+        try:
+            rows = write_records(
+                read_chunks(source, fmt, chunk_size), output, symbol_width=symbol_width
+            )
+        except ValueError as e:
+            get_console(stderr=True).print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1) from e
+
+    get_console(stderr=True).print(f"[bold]Wrote:[/bold] {rows} rows to {output}")
+
+
+@app.command()
+def sqlite(
+    database: Path = typer.Argument(..., help="SQLite database file"),
+    table: str = typer.Option("positions", "--table", "-t", help="Table with PriceData columns"),
+    after_id: int | None = typer.Option(
+        None, "--after-id", help="Only recalculate rows with id greater than this"
+    ),
+    chunk_size: int = typer.Option(10_000, "--chunk-size", "-c", help="Rows per chunk", min=1),
+    precision: int = typer.Option(
+        6, "--precision", "-p", help="Decimal precision for results", min=0, max=10
+    ),
+) -> None:
+    """
+    Recalculate the result columns of a SQLite table in place.
+
+    Missing result columns are added. The last id processed is reported so the
+    next run can pass it to --after-id.
+
+    Example:
+        avg-price-calc sqlite positions.db --after-id 1000
+    """
+    from .batch import BatchOptions
+    from .storage import recalculate
+
+    try:
+        options = BatchOptions(precision=precision, exact=True, chunk_size=chunk_size)
+        stats = recalculate(database, table, options, after_id=after_id)
+    except (ValueError, OSError) as e:
+        get_console(stderr=True).print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    get_console(stderr=True).print(
+        f"[bold]Processed:[/bold] {stats.rows}  "
+        f"[bold]Rejected:[/bold] {stats.rejected}  "
+        f"[bold]Last id:[/bold] {stats.last_id}  "
+        f"[bold]Throughput:[/bold] {stats.rows_per_second:,.0f} rows/s"
+    )
+
+
+@app.command()
+def http(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to bind"),
+    port: int = typer.Option(8000, "--port", help="Port to listen on"),
+    batch_window: float = typer.Option(
+        1.0, "--batch-window-ms", help="Micro-batching window in milliseconds", min=0
+    ),
+    max_batch_size: int = typer.Option(1024, "--max-batch-size", help="Rows per batch", min=1),
+    *,
+    enable_metrics: bool = typer.Option(
+        False, "--metrics", help="Record instrumentation counters, served at GET /metrics"
+    ),
+) -> None:
+    """
+    Serve /average-price and /average-price/batch over HTTP.
+
+    Example:
+        avg-price-calc http --port 8000 --batch-window-ms 1
+    """
+    import asyncio
+
+    from . import metrics
+    from .service import serve
+
+    if enable_metrics:
+        metrics.enable()
+    get_console().print(f"[green]Listening on http://{host}:{port}[/green]")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(host, port, batch_window / 1000, max_batch_size))
+
+
+@app.command()
+def serve(
+    socket_path: Path | None = typer.Option(
+        None, "--socket", help="Unix socket path (default: $AVG_PRICE_CALC_SOCKET or runtime dir)"
+    ),
+    *,
+    enable_metrics: bool = typer.Option(
+        False, "--metrics", help="Record instrumentation counters, shown by `stats`"
+    ),
+) -> None:
+    """
+    Run a warm daemon on a Unix socket for avg-price-calc-client.
+
+    Example:
+        avg-price-calc serve &
+        avg-price-calc-client 100 10.5 50 12.0
+    """
+    import asyncio
+
+    from . import metrics
+    from .daemon import default_socket_path, serve as serve_daemon
+
+    if enable_metrics:
+        metrics.enable()
+    path = socket_path or default_socket_path()
+    console = get_console()
+    console.print(f"[green]Listening on {path}[/green]")
+    try:
+        asyncio.run(serve_daemon(path))
+    except KeyboardInterrupt:
+        pass
+    except (RuntimeError, OSError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1) from e
+
+
+@app.command()
+def stats(
+    socket_path: Path | None = typer.Option(
+        None, "--socket", help="Unix socket path of the daemon to query"
+    ),
+    output_format: str = typer.Option(
+        "table", "--format", "-f", help="Output format: table, json or prometheus"
+    ),
+) -> None:
+    """
+    Show instrumentation counters of a running daemon.
+
+    Start the daemon with `avg-price-calc serve --metrics` to record them.
+    """
+    import json
+
+    from . import metrics
+    from .daemon import connect
+
+    if output_format not in ("table", "json", "prometheus"):
+        msg = "Format must be one of: table, json, prometheus"
+        raise typer.BadParameter(msg)
+
+    client = connect(socket_path)
+    if client is None:
+        get_console(stderr=True).print("[red]Error: no daemon is running[/red]")
+        raise typer.Exit(1)
+    with client:
+        response = client.request({"op": "stats"})
+    stages = metrics.from_dict(response["stages"])
+
+    if output_format == "prometheus":
+        typer.echo(metrics.render_prometheus(stages), nl=False)
+        return
+    if output_format == "json":
+        typer.echo(json.dumps(metrics.to_dict(stages)))
+        return
+
+    from rich.table import Table
+
+    table = Table(title="Instrumentation counters", show_header=True)
+    table.add_column("Stage", style="cyan")
+    for column in ("Calls", "Mean (us)", "p50 (us)", "p99 (us)", "Total (ms)"):
+        table.add_column(column, style="green", justify="right")
+    for stage, stage_stats in stages.items():
+        table.add_row(
+            stage,
+            f"{stage_stats.count:,}",
+            f"{stage_stats.mean_ns / 1e3:.2f}",
+            f"<{stage_stats.quantile_ns(0.5) / 1e3:.2f}",
+            f"<{stage_stats.quantile_ns(0.99) / 1e3:.2f}",
+            f"{stage_stats.total_ns / 1e6:.2f}",
+        )
+    console = get_console()
+    console.print(table)
+    if not response["enabled"]:
+        console.print("[yellow]Instrumentation is disabled in the daemon (use --metrics)[/yellow]")
+
+
 @app.command()
 def version() -> None:
     """Show version information."""
-    rprint(f"[bold green]Average Price Calculator[/bold green] v{__version__}")
+    from . import __version__
+
+    typer.echo(f"{typer.style('Average Price Calculator', fg='green', bold=True)} v{__version__}")
 
 
 @app.command()
 def example() -> None:
     """Run an example calculation."""
+    from rich import print as rprint
+
+    from .calculator import calculate_average_price_safe
+    from .models import PriceData
+
     rprint("[yellow]Running example calculation...[/yellow]")
 
     data = PriceData(
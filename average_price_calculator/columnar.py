@@ -0,0 +1,326 @@
+"""
+Binary columnar trade files, read through a memory map without parsing.
+
+Layout: the 8-byte magic, a little-endian uint64 header length, a JSON header
+{"rows": n, "columns": [{"name", "dtype", "offset"}, ...]}, then the data
+section, aligned to 64 bytes. Each column is one contiguous block at its
+offset into the data section; offsets are multiples of 64 as well.
+Columns are little-endian float64 ("<f8") or int64 ("<i8"), or fixed-width
+bytes ("S<n>", e.g. for symbols). Strings are stored UTF-8 encoded.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+import contextlib
+import json
+import math
+import os
+from pathlib import Path
+import shutil
+import struct
+import tempfile
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+MAGIC = b"APCCOL\x00\x01"
+ALIGNMENT = 64
+SUFFIX = ".apcol"
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Column types for the known trade fields when converting from records
+FIELD_DTYPES = {
+    "initial_quantity": "<f8",
+    "initial_price": "<f8",
+    "new_quantity": "<f8",
+    "new_price": "<f8",
+    "quantity": "<f8",
+    "price": "<f8",
+    "timestamp": "<f8",
+}
+
+_LENGTH = struct.Struct("<Q")
+
+
+def _check_dtype(dtype: str) -> np.dtype[Any]:
+    parsed = np.dtype(dtype)
+    if parsed.kind in "fi" and parsed.itemsize == 8:
+        return np.dtype(f"<{parsed.kind}8")
+    if parsed.kind == "S" and parsed.itemsize > 0:
+        return parsed
+    msg = f"Unsupported column type: {dtype} (use <f8, <i8 or S<n>)"
+    raise ValueError(msg)
+
+
+def _pad(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def _data_start(header_size: int) -> int:
+    offset = len(MAGIC) + _LENGTH.size + header_size
+    return offset + _pad(offset)
+
+
+def _as_column(values: npt.ArrayLike, dtype: np.dtype[Any], name: str) -> npt.NDArray[Any]:
+    array = np.asarray(values)
+    if dtype.kind == "S":
+        if array.dtype.kind == "U":
+            array = np.char.encode(array, "utf-8")
+        if array.dtype.kind == "S" and array.dtype.itemsize > dtype.itemsize:
+            msg = f"Column {name!r} has values longer than {dtype.itemsize} bytes"
+            raise ValueError(msg)
+    return np.ascontiguousarray(array, dtype=dtype).reshape(-1)
+
+
+class ColumnarWriter:
+    """
+    Appends chunks of columns to a new columnar file.
+
+    Each column is spooled to its own file in a temporary directory next to
+    `path` while writing, so the row count does not need to be known up front
+    and memory stays bounded by the chunk size. `close` assembles the final
+    file and renames it into place.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], schema: Mapping[str, str]) -> None:
+        if not schema:
+            raise ValueError("At least one column is required")
+        self.path = Path(path)
+        self.dtypes = {name: _check_dtype(dtype) for name, dtype in schema.items()}
+        self.rows = 0
+        self._spool_dir = tempfile.TemporaryDirectory(dir=self.path.parent)
+        self._spools = {
+            name: Path(self._spool_dir.name) / f"{index}.col"
+            for index, name in enumerate(self.dtypes)
+        }
+        for spool in self._spools.values():
+            spool.touch()
+
+    def write(self, columns: Mapping[str, npt.ArrayLike]) -> None:
+        """Append one chunk; every column of the schema must be present with the same length."""
+        missing = self.dtypes.keys() - columns.keys()
+        if missing:
+            msg = f"Missing columns: {', '.join(sorted(missing))}"
+            raise ValueError(msg)
+
+        arrays = {
+            name: _as_column(columns[name], dtype, name) for name, dtype in self.dtypes.items()
+        }
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+
+        for name, array in arrays.items():
+            with self._spools[name].open("ab") as spool:
+                array.tofile(spool)
+        self.rows += lengths.pop()
+
+    def close(self) -> None:
+        """Write the header and column blocks to `path`."""
+        columns = []
+        offset = 0
+        for name, dtype in self.dtypes.items():
+            columns.append({"name": name, "dtype": dtype.str, "offset": offset})
+            offset += self.rows * dtype.itemsize
+            offset += _pad(offset)
+        header = json.dumps({"rows": self.rows, "columns": columns}).encode()
+        data_start = _data_start(len(header))
+
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with temporary.open("wb") as out:
+                out.write(MAGIC + _LENGTH.pack(len(header)) + header)
+                for column in columns:
+                    start = data_start + int(column["offset"])
+                    out.write(b"\0" * (start - out.tell()))
+                    with self._spools[str(column["name"])].open("rb") as spool:
+                        shutil.copyfileobj(spool, out, 16 * 1024 * 1024)
+            temporary.replace(self.path)
+        finally:
+            self.discard()
+            with contextlib.suppress(FileNotFoundError):
+                temporary.unlink()
+
+    def discard(self) -> None:
+        """Drop the spooled data without writing a file."""
+        self._spool_dir.cleanup()
+
+    def __enter__(self) -> "ColumnarWriter":  # noqa: PYI034 - typing.Self needs Python 3.11
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _default_dtype(array: npt.NDArray[Any]) -> str:
+    if array.dtype.kind == "S":
+        return f"S{max(array.dtype.itemsize, 1)}"
+    if array.dtype.kind in "iub":
+        return "<i8"
+    return "<f8"
+
+
+def write_columnar(
+    path: str | os.PathLike[str],
+    columns: Mapping[str, npt.ArrayLike],
+    schema: Mapping[str, str] | None = None,
+) -> None:
+    """
+    Write whole columns to a new file in one call.
+
+    Without a schema, float columns are stored as <f8, integer columns as <i8
+    and strings or bytes as S<n> sized to the longest value.
+    """
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    if schema is None:
+        arrays = {
+            name: np.char.encode(array, "utf-8") if array.dtype.kind == "U" else array
+            for name, array in arrays.items()
+        }
+        schema = {name: _default_dtype(array) for name, array in arrays.items()}
+
+    with ColumnarWriter(path, schema) as writer:
+        writer.write(arrays)
+
+
+def write_records(
+    chunks: Iterable[Sequence[Mapping[str, Any] | None]],
+    path: str | os.PathLike[str],
+    *,
+    symbol_width: int = 16,
+) -> int:
+    """
+    Convert chunks of CSV/JSONL records (as from `streaming.read_chunks`) to a file.
+
+    The known numeric fields present in the first record become <f8 columns
+    and "symbol" an S<symbol_width> column; other fields are dropped. Missing
+    or malformed values are stored as NaN (empty for symbols), except that a
+    timestamp that is present must be a number (e.g. epoch seconds): it is
+    compared with split and FX dates, where NaN would silently match nothing.
+    Returns the row count.
+    """
+    writer: ColumnarWriter | None = None
+    try:
+        for chunk in chunks:
+            if writer is not None and "timestamp" in writer.dtypes:
+                _check_timestamps(chunk, writer.rows)
+            if writer is None:
+                first = next((record for record in chunk if record is not None), {})
+                schema = {name: FIELD_DTYPES[name] for name in first if name in FIELD_DTYPES}
+                if "symbol" in first:
+                    schema["symbol"] = f"S{symbol_width}"
+                writer = ColumnarWriter(path, schema)
+                if "timestamp" in schema:
+                    _check_timestamps(chunk, 0)
+            writer.write(
+                {
+                    name: (
+                        [_symbol(record) for record in chunk]
+                        if name == "symbol"
+                        else [_number(record, name) for record in chunk]
+                    )
+                    for name in writer.dtypes
+                }
+            )
+    except BaseException:
+        if writer is not None:
+            writer.discard()
+        raise
+
+    if writer is None:
+        raise ValueError("Input has no records")
+    writer.close()
+    return writer.rows
+
+
+def _number(record: Mapping[str, Any] | None, name: str) -> float:
+    try:
+        return float(record[name])  # type: ignore[index]
+    except (KeyError, TypeError, ValueError):
+        return float("nan")
+
+
+def _check_timestamps(chunk: Sequence[Mapping[str, Any] | None], offset: int) -> None:
+    for index, record in enumerate(chunk):
+        value = (record or {}).get("timestamp")
+        if value not in (None, "") and math.isnan(_number(record, "timestamp")):
+            msg = f"Record {offset + index}: timestamp {value!r} is not a number"
+            raise ValueError(msg)
+
+
+def _symbol(record: Mapping[str, Any] | None) -> bytes:
+    value = (record or {}).get("symbol") or ""
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+class ColumnarFile:
+    """
+    Read-only view of a columnar file.
+
+    The file is memory-mapped; `column` returns NumPy views into the mapping,
+    so nothing is read from disk until the data is touched and files larger
+    than RAM can be processed chunk by chunk, `chunk_size` rows at a time
+    unless `chunks` is given another size.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self._raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        prefix_size = len(MAGIC) + _LENGTH.size
+        if len(self._raw) < prefix_size or bytes(self._raw[: len(MAGIC)]) != MAGIC:
+            msg = f"{self.path} is not a columnar trade file"
+            raise ValueError(msg)
+        (header_size,) = _LENGTH.unpack(bytes(self._raw[len(MAGIC) : prefix_size]))
+        header = json.loads(bytes(self._raw[prefix_size : prefix_size + header_size]))
+        data_start = _data_start(header_size)
+
+        self.rows: int = header["rows"]
+        self.dtypes: dict[str, np.dtype[Any]] = {}
+        self._offsets: dict[str, int] = {}
+        for column in header["columns"]:
+            dtype = _check_dtype(column["dtype"])
+            offset = data_start + column["offset"]
+            if offset + self.rows * dtype.itemsize > len(self._raw):
+                msg = f"{self.path} is truncated"
+                raise ValueError(msg)
+            self.dtypes[column["name"]] = dtype
+            self._offsets[column["name"]] = offset
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.dtypes)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.dtypes
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        """Zero-copy, read-only view of a whole column."""
+        try:
+            dtype = self.dtypes[name]
+        except KeyError:
+            msg = f"No column named {name!r}"
+            raise KeyError(msg) from None
+        offset = self._offsets[name]
+        return self._raw[offset : offset + self.rows * dtype.itemsize].view(dtype)
+
+    __getitem__ = column
+
+    def chunks(
+        self, chunk_size: int | None = None, names: Iterable[str] | None = None
+    ) -> Iterator[dict[str, npt.NDArray[Any]]]:
+        """Yield row ranges of the selected columns as views, `self.chunk_size` rows by default."""
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        columns = {name: self.column(name) for name in (self.names if names is None else names)}
+        for start in range(0, self.rows, chunk_size):
+            yield {name: column[start : start + chunk_size] for name, column in columns.items()}
@@ -0,0 +1,126 @@
+"""
+Split adjustment of fills, looked up on the fly rather than by rewriting inputs.
+
+A split with ratio r (2 for a 2-for-1 split, 0.1 for a 1-for-10 reverse split)
+multiplies quantities by r and divides prices by r for every fill before its
+effective time; investment is unchanged. Fills are adjusted to the latest
+share basis: the factor for a fill is the product of the ratios of all later
+splits of its symbol. A fill at the effective time is already post-split.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from decimal import Decimal
+import hashlib
+import json
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+_ONE = Decimal(1)
+
+
+class SplitFactors(NamedTuple):
+    """Factors looked up for a chunk: each row's factor is `values[codes[row]]`."""
+
+    codes: npt.NDArray[np.intp]
+    values: list[Decimal]
+
+    def decimals(self) -> list[Decimal]:
+        """The factor of each row."""
+        return [self.values[code] for code in self.codes.tolist()]
+
+
+class SplitTable:
+    """
+    Per-symbol split index: effective times in sorted order next to suffix
+    products of the ratios, so a factor lookup is one binary search.
+
+    Effective times may be any mutually comparable values (epoch seconds,
+    dates); the vectorized `factors` needs NumPy-sortable ones.
+    """
+
+    def __init__(self, splits: Iterable[tuple[str, Any, float]] = ()) -> None:
+        by_symbol: dict[str, list[tuple[Any, Decimal]]] = {}
+        for symbol, effective, ratio in splits:
+            if ratio <= 0:
+                raise ValueError("Split ratios must be positive")
+            by_symbol.setdefault(symbol, []).append((effective, Decimal(str(ratio))))
+
+        self._times: dict[str, list[Any]] = {}
+        self._factors: dict[str, list[Decimal]] = {}
+        for symbol, entries in by_symbol.items():
+            entries.sort(key=lambda entry: entry[0])
+            # factors[i] is the product of the ratios of splits i..n-1; factors[n] is 1
+            factors = [_ONE]
+            for _, ratio in reversed(entries):
+                factors.append(factors[-1] * ratio)
+            factors.reverse()
+            self._times[symbol] = [effective for effective, _ in entries]
+            self._factors[symbol] = factors
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Any],
+        *,
+        symbol_field: str = "symbol",
+        time_field: str = "effective",
+        ratio_field: str = "ratio",
+    ) -> "SplitTable":
+        """Build from mappings such as CSV rows or JSON objects."""
+        return cls(
+            (record[symbol_field], record[time_field], float(record[ratio_field]))
+            for record in records
+        )
+
+    def __len__(self) -> int:
+        return sum(len(times) for times in self._times.values())
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._times
+
+    def signature(self) -> str:
+        """
+        Digest of the effective times and factors of every symbol. Tables that
+        adjust fills the same way have the same signature, so stored adjusted
+        sums can be checked against the table they were built with.
+        """
+        entries = [
+            [symbol, [repr(time) for time in times], [str(f) for f in self._factors[symbol]]]
+            for symbol, times in sorted(self._times.items())
+        ]
+        return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+    def factor(self, symbol: str, timestamp: Any) -> Decimal:
+        """Cumulative ratio of the splits of `symbol` after `timestamp`."""
+        times = self._times.get(symbol)
+        if times is None:
+            return _ONE
+        return self._factors[symbol][bisect_right(times, timestamp)]
+
+    def factors(self, symbols: npt.ArrayLike, timestamps: npt.ArrayLike) -> SplitFactors:
+        """
+        factor for whole columns: one searchsorted per symbol present. The
+        factors stay exact Decimals; rows refer to them by code.
+        """
+        symbol_array = np.asarray(symbols)
+        time_array = np.asarray(timestamps)
+        # Code 0 is the factor of symbols without splits
+        result = SplitFactors(np.zeros(symbol_array.shape, dtype=np.intp), [_ONE])
+        if not self._times or not symbol_array.size:
+            return result
+
+        unique, inverse = np.unique(symbol_array, return_inverse=True)
+        inverse = inverse.reshape(symbol_array.shape)
+        for code, symbol in enumerate(unique.tolist()):
+            if symbol not in self._times:
+                continue
+            mask = inverse == code
+            positions = np.searchsorted(
+                np.asarray(self._times[symbol]), time_array[mask], side="right"
+            )
+            result.codes[mask] = len(result.values) + positions
+            result.values.extend(self._factors[symbol])
+        return result
@@ -0,0 +1,300 @@
+"""
+Warm daemon on a Unix domain socket and a thin client for it.
+
+Protocol: newline-delimited JSON. Each request line is either an object with
+the PriceData fields (plus optional "precision") or an array of such objects.
+Each response line is an object with the CalculationResult fields, or
+{"error": message}, or an array of those for array requests. The control
+requests {"op": "ping"} and {"op": "stats"} check liveness and return the
+instrumentation counters. Clients may
+pipeline: write many lines before reading; responses come back in order.
+
+This module only imports the standard library at import time so the client
+(`avg-price-calc-client`, see main) starts fast; the calculator is imported
+when it is first needed.
+"""
+
+import argparse
+import contextlib
+from collections.abc import Iterable, Sequence
+from itertools import islice
+import json
+import os
+from pathlib import Path
+import socket
+import stat
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import asyncio
+
+SOCKET_ENV = "AVG_PRICE_CALC_SOCKET"
+INPUT_FIELDS = ("initial_quantity", "initial_price", "new_quantity", "new_price")
+RESULT_FIELDS = ("average_price", "total_quantity", "total_investment")
+# Requests a client keeps in flight before reading responses
+PIPELINE_DEPTH = 512
+MAX_PRECISION = 10
+
+Row = Sequence[float]
+
+
+def default_socket_path() -> Path:
+    """Socket path from $AVG_PRICE_CALC_SOCKET, else a per-user runtime path."""
+    if env := os.environ.get(SOCKET_ENV):
+        return Path(env)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"avg-price-calc-{os.getuid()}.sock"
+
+
+def _compute(request: Any) -> dict[str, Any]:
+    from .calculator import calculate_average_price
+
+    try:
+        initial_quantity, initial_price, new_quantity, new_price = (
+            float(request[field]) for field in INPUT_FIELDS
+        )
+        precision = int(request.get("precision", 6))
+        result = calculate_average_price(
+            initial_quantity, initial_price, new_quantity, new_price, precision
+        )
+    except (KeyError, TypeError, AttributeError):
+        return {"error": f"Request must be an object with fields: {', '.join(INPUT_FIELDS)}"}
+    except (ValueError, ArithmeticError) as e:
+        return {"error": str(e)}
+    return dict(zip(RESULT_FIELDS, result, strict=True))
+
+
+def handle_line(line: bytes) -> bytes:
+    """Response line for one request line."""
+    try:
+        request = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        response: Any = {"error": "Request must be valid JSON"}
+    else:
+        if isinstance(request, list):
+            response = [_compute(item) for item in request]
+        elif isinstance(request, dict) and request.get("op") == "ping":
+            response = {"ok": True}
+        elif isinstance(request, dict) and request.get("op") == "stats":
+            from . import metrics
+
+            response = {"enabled": metrics.enabled, "stages": metrics.to_dict()}
+        else:
+            response = _compute(request)
+    return json.dumps(response).encode() + b"\n"
+
+
+async def _handle_connection(
+    reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"
+) -> None:
+    try:
+        while line := await reader.readline():
+            if line.strip():
+                writer.write(handle_line(line))
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def _remove_stale_socket(path: Path) -> None:
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        msg = f"{path} exists and is not a socket"
+        raise RuntimeError(msg)
+    if connect(path) is not None:
+        msg = f"A daemon is already listening on {path}"
+        raise RuntimeError(msg)
+    path.unlink()
+
+
+async def serve(path: Path | None = None) -> None:
+    """Listen on the Unix socket until cancelled."""
+    import asyncio
+
+    path = path or default_socket_path()
+    _remove_stale_socket(path)
+
+    # Import the calculator before accepting connections so the first request is warm
+    from . import calculator
+
+    server = await asyncio.start_unix_server(_handle_connection, path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+
+
+class DaemonClient:
+    """Blocking client for the daemon protocol."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":  # noqa: PYI034 - typing.Self needs Python 3.11
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def request(self, payload: Any) -> Any:
+        """Send one raw request and return the decoded response."""
+        self._file.write(json.dumps(payload).encode() + b"\n")
+        self._file.flush()
+        return json.loads(self._file.readline())
+
+    def calculate(self, *values: float, precision: int = 6) -> tuple[float, float, float]:
+        """Same contract as calculate_average_price, evaluated by the daemon."""
+        return _unpack(self.request(_payload(values, precision)))
+
+    def calculate_many(
+        self, rows: Iterable[Row], precision: int = 6, depth: int = PIPELINE_DEPTH
+    ) -> list[tuple[float, float, float] | ValueError]:
+        """
+        Pipeline one request per row; failed rows come back as ValueError.
+
+        Rows that cannot be encoded, e.g. with the wrong number of values, are
+        not sent. At most `depth` requests are in flight, so neither side
+        blocks on a full socket buffer.
+        """
+        results: list[tuple[float, float, float] | ValueError] = []
+        rows = iter(rows)
+        while window := list(islice(rows, depth)):
+            # None marks a row whose response is still to be read
+            pending = [self._send(row, precision) for row in window]
+            self._file.flush()
+            results.extend(self._receive() if entry is None else entry for entry in pending)
+        return results
+
+    def _send(self, row: Row, precision: int) -> ValueError | None:
+        try:
+            line = json.dumps(_payload(row, precision)).encode()
+        except (TypeError, ValueError) as e:
+            return e if isinstance(e, ValueError) else ValueError(str(e))
+        self._file.write(line + b"\n")
+        return None
+
+    def _receive(self) -> tuple[float, float, float] | ValueError:
+        try:
+            return _unpack(json.loads(self._file.readline()))
+        except ValueError as e:
+            return e
+
+
+def _row_values(row: Row) -> list[float]:
+    """The input values of one row; ValueError if it does not have one per field."""
+    values = list(row) if isinstance(row, Iterable) and not isinstance(row, str | bytes) else []
+    if len(values) != len(INPUT_FIELDS):
+        msg = f"Row must have {len(INPUT_FIELDS)} values: {', '.join(INPUT_FIELDS)}"
+        raise ValueError(msg)
+    return values
+
+
+def _payload(values: Row, precision: int) -> dict[str, Any]:
+    return {**dict(zip(INPUT_FIELDS, _row_values(values), strict=True)), "precision": precision}
+
+
+def _unpack(response: dict[str, Any]) -> tuple[float, float, float]:
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response["average_price"], response["total_quantity"], response["total_investment"]
+
+
+def connect(path: Path | None = None) -> DaemonClient | None:
+    """Client for a running daemon, or None if nothing is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path or default_socket_path()))
+    except OSError:
+        sock.close()
+        return None
+    return DaemonClient(sock)
+
+
+def calculate_many(
+    rows: Iterable[Row], precision: int = 6, path: Path | None = None
+) -> list[tuple[float, float, float] | ValueError]:
+    """Forward rows to the daemon if one is running, else compute in-process."""
+    client = connect(path)
+    if client is not None:
+        with client:
+            return client.calculate_many(rows, precision)
+
+    return [_calculate_local(row, precision) for row in rows]
+
+
+def _calculate_local(row: Row, precision: int) -> tuple[float, float, float] | ValueError:
+    from .calculator import calculate_average_price
+
+    try:
+        initial_quantity, initial_price, new_quantity, new_price = _row_values(row)
+        return calculate_average_price(
+            initial_quantity, initial_price, new_quantity, new_price, precision
+        )
+    except ValueError as e:
+        return e
+    except (TypeError, ArithmeticError) as e:
+        return ValueError(str(e))
+
+
+def _parse_row(line: str) -> list[float] | ValueError:
+    """Values of one 'IQ IP NQ NP' line (spaces or commas), or the error for it."""
+    try:
+        return _row_values([float(value) for value in line.replace(",", " ").split()])
+    except ValueError as e:
+        return e
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Thin client: avg-price-calc-client IQ IP NQ NP, or rows on stdin with --stdin.
+
+    Uses the daemon when it is running and computes in-process otherwise.
+    Rows that cannot be read or calculated are reported on stderr, in order.
+    """
+    parser = argparse.ArgumentParser(prog="avg-price-calc-client", description=main.__doc__)
+    parser.add_argument("values", nargs="*", type=float, help="IQ IP NQ NP")
+    parser.add_argument("-p", "--precision", type=int, default=6)
+    parser.add_argument("--socket", type=Path, default=None, help="Daemon socket path")
+    parser.add_argument(
+        "--stdin", action="store_true", help="Read 'IQ IP NQ NP' rows from stdin (pipelined)"
+    )
+    args = parser.parse_args(argv)
+    if not 0 <= args.precision <= MAX_PRECISION:
+        parser.error(f"precision must be between 0 and {MAX_PRECISION}")
+
+    if args.stdin:
+        parsed = [_parse_row(line) for line in sys.stdin if line.strip()]
+    elif len(args.values) == len(INPUT_FIELDS):
+        parsed = [args.values]
+    else:
+        parser.error("expected four values: IQ IP NQ NP")
+
+    rows = [row for row in parsed if not isinstance(row, ValueError)]
+    results = iter(calculate_many(rows, args.precision, args.socket))
+    status = 0
+    for entry in parsed:
+        result = entry if isinstance(entry, ValueError) else next(results)
+        if isinstance(result, ValueError):
+            sys.stderr.write(f"error: {result}\n")
+            status = 1
+        else:
+            sys.stdout.write(" ".join(f"{value:.{args.precision}f}" for value in result) + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Downsampling of long series for charts.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) keeps the first and last
+points and, from each of the buckets in between, the point that forms the
+largest triangle with the point kept before it and the mean of the next
+bucket. Peaks and the overall shape survive at a few thousand points, where
+plain striding would drop spikes.
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+
+def lttb(x: npt.ArrayLike, y: npt.ArrayLike, threshold: int) -> npt.NDArray[np.intp]:
+    """
+    Indices of the at most `threshold` points kept by LTTB, in ascending order.
+
+    `x` must be increasing and both series finite. Series that already fit
+    are returned whole.
+    """
+    x_values = np.asarray(x, dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    if x_values.shape != y_values.shape or x_values.ndim != 1:
+        raise ValueError("x and y must be 1-D arrays of the same length")
+    if threshold < 3:
+        raise ValueError("Threshold must be at least 3")
+
+    size = len(x_values)
+    if size <= threshold:
+        return np.arange(size)
+
+    # Bucket i holds points edges[i]..edges[i+1]; the first and last points are kept as is
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.intp)
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0], indices[-1] = 0, size - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x = x_values[stop:next_stop].mean()
+        next_y = y_values[stop:next_stop].mean()
+
+        ax, ay = x_values[selected], y_values[selected]
+        # Twice the triangle areas; the factor does not change the argmax
+        areas = np.abs(
+            (ax - next_x) * (y_values[start:stop] - ay)
+            - (ax - x_values[start:stop]) * (next_y - ay)
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    return indices
@@ -0,0 +1,118 @@
+"""Fixed-point integer arithmetic backend."""
+
+from . import metrics
+
+# Default number of decimal places of to_scaled
+DEFAULT_SCALE = 18
+# Significant digits of decimal's default context. Intermediates longer than
+# this are rounded by the Decimal path, so they are left to it.
+DECIMAL_DIGITS = 28
+
+_POWERS_OF_TEN = [10**i for i in range(64)]
+_DECIMAL_LIMIT = 10**DECIMAL_DIGITS
+
+
+def _pow10(exponent: int) -> int:
+    return _POWERS_OF_TEN[exponent] if exponent < len(_POWERS_OF_TEN) else int(10**exponent)
+
+
+def _decompose(value: float) -> tuple[int, int]:
+    """
+    (digits, places) with `value == digits * 10**-places`, read from the shortest
+    repr of the float. This is the same decimal value that `Decimal(str(value))` sees.
+    """
+    if type(value) is int:
+        return value, 0
+
+    mantissa, _, exponent = repr(float(value)).partition("e")
+    whole, _, fraction = mantissa.partition(".")
+    return int(whole + fraction), len(fraction) - int(exponent or 0)
+
+
+def _rescale(digits: int, places: int, scale: int, value: float) -> int:
+    shift = scale - places
+    if shift >= 0:
+        return digits * _pow10(shift)
+
+    digits, remainder = divmod(digits, _pow10(-shift))
+    if remainder:
+        msg = f"Value {value!r} has more than {scale} decimal places"
+        raise ValueError(msg)
+    return digits
+
+
+def to_scaled(value: float, scale: int = DEFAULT_SCALE) -> int:
+    """Exact integer value of `value * 10**scale`; raises if `value` has more places."""
+    return _rescale(*_decompose(value), scale, value)
+
+
+def _exact_in_decimal(*values: int) -> bool:
+    """Whether each value fits in DECIMAL_DIGITS significant digits (trailing zeros are free)."""
+    return all(
+        value < _DECIMAL_LIMIT or len(str(value).rstrip("0")) <= DECIMAL_DIGITS for value in values
+    )
+
+
+def _divide_half_up(numerator: int, denominator: int) -> int:
+    """Positive integer division rounded half-up."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _calculate_decimal(
+    values: tuple[float, float, float, float], precision: int
+) -> tuple[float, float, float]:
+    """The Decimal path's result (or error) for `values`, whatever the global backend."""
+    from .calculator import Position
+
+    initial_quantity, initial_price, new_quantity, new_price = values
+    position = Position().add(initial_quantity, initial_price)
+    return position.add(new_quantity, new_price).result(precision)
+
+
+def calculate_average_price_fixed(
+    initial_quantity: float,
+    initial_price: float,
+    new_quantity: float,
+    new_price: float,
+    precision: int = 6,
+) -> tuple[float, float, float]:
+    """
+    calculate_average_price on scaled integers instead of Decimal.
+
+    Inputs are converted exactly at the most decimal places any input has
+    and all intermediate values stay exact. When an intermediate needs more
+    digits than the Decimal path's 28-digit context, that path would round
+    it, and when a rounded result does, its quantize raises InvalidOperation;
+    either way the call is handed to it instead. Results and errors therefore
+    equal the Decimal path.
+    """
+    values = (initial_quantity, initial_price, new_quantity, new_price)
+    if initial_quantity <= 0 or initial_price <= 0 or new_quantity <= 0 or new_price <= 0:
+        raise ValueError("All values must be positive")
+
+    started = metrics.now_ns() if metrics.enabled else 0
+    parts = [_decompose(value) for value in values]
+    scale = max(0, *(places for _, places in parts))
+    q1, p1, q2, p2 = (
+        _rescale(digits, places, scale, value)
+        for (digits, places), value in zip(parts, values, strict=True)
+    )
+
+    # Investment is held at 2 * scale, quantity at scale
+    investment_1, investment_2 = q1 * p1, q2 * p2
+    total_investment = investment_1 + investment_2
+    total_quantity = q1 + q2
+    if not _exact_in_decimal(investment_1, investment_2, total_investment, total_quantity):
+        return _calculate_decimal(values, precision)
+    output = _pow10(precision)
+    unit = _pow10(scale)
+
+    average_price = _divide_half_up(total_investment * output, total_quantity * unit)
+    total_qty = _divide_half_up(total_quantity * output, unit)
+    total_inv = _divide_half_up(total_investment * output, unit * unit)
+    if max(average_price, total_qty, total_inv) >= _DECIMAL_LIMIT:
+        return _calculate_decimal(values, precision)
+
+    if started:
+        metrics.record("fixedpoint.calculate", metrics.now_ns() - started)
+    return average_price / output, total_qty / output, total_inv / output
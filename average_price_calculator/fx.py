@@ -0,0 +1,163 @@
+"""
+Conversion of fill prices to a base currency with a date-indexed rate table.
+
+A rate is the number of base-currency units per unit of a currency, valid
+from its date until the next rate of that currency (as-of lookup). Lookups
+for whole chunks are one searchsorted per currency; fills without a rate are
+reported together instead of one at a time.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+_ONE = Decimal(1)
+# Missing pairs listed in an error message before it is truncated
+_MAX_REPORTED = 20
+
+
+class MissingRateError(ValueError):
+    """Raised with every (currency, timestamp) pair that has no rate."""
+
+    def __init__(self, missing: list[tuple[str, Any]]) -> None:
+        self.missing = missing
+        shown = ", ".join(
+            f"{currency}@{timestamp}" for currency, timestamp in missing[:_MAX_REPORTED]
+        )
+        more = f" and {len(missing) - _MAX_REPORTED} more" if len(missing) > _MAX_REPORTED else ""
+        super().__init__(f"No FX rate for {len(missing)} fills: {shown}{more}")
+
+
+class Conversion(NamedTuple):
+    """Rates looked up for a chunk. Missing rows have rate NaN."""
+
+    rates: npt.NDArray[np.float64]
+    missing: npt.NDArray[np.bool_]
+
+
+class FxRateTable:
+    """
+    Per-currency sorted arrays of dates and rates to `base`.
+
+    Dates may be any values NumPy can sort consistently with the fills'
+    timestamps: epoch seconds, datetime64 or ISO date strings. The base
+    currency always converts at 1. With `max_age`, a rate older than that
+    (in timestamp units) counts as missing.
+    """
+
+    def __init__(
+        self,
+        rates: Iterable[tuple[str, Any, float]],
+        base: str = "USD",
+        max_age: Any = None,
+    ) -> None:
+        by_currency: dict[str, list[tuple[Any, str]]] = {}
+        for currency, date, rate in rates:
+            if not rate > 0:
+                raise ValueError("FX rates must be positive")
+            by_currency.setdefault(currency, []).append((date, str(rate)))
+
+        self.base = base
+        self.max_age = max_age
+        self._dates: dict[str, npt.NDArray[Any]] = {}
+        self._date_lists: dict[str, list[Any]] = {}
+        self._rates: dict[str, npt.NDArray[np.float64]] = {}
+        self._decimal_rates: dict[str, list[Decimal]] = {}
+        for currency, entries in by_currency.items():
+            entries.sort(key=lambda entry: entry[0])
+            self._date_lists[currency] = [date for date, _ in entries]
+            self._dates[currency] = np.asarray(self._date_lists[currency])
+            self._rates[currency] = np.asarray([float(rate) for _, rate in entries])
+            self._decimal_rates[currency] = [Decimal(rate) for _, rate in entries]
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Any],
+        base: str = "USD",
+        *,
+        currency_field: str = "currency",
+        date_field: str = "date",
+        rate_field: str = "rate",
+    ) -> "FxRateTable":
+        """Build from mappings such as CSV rows or JSON objects; set `max_age` on the result."""
+        return cls(
+            (
+                (record[currency_field], record[date_field], float(record[rate_field]))
+                for record in records
+            ),
+            base,
+        )
+
+    @property
+    def currencies(self) -> list[str]:
+        return sorted({self.base, *self._dates})
+
+    def _index(self, currency: str, timestamp: Any) -> int | None:
+        dates = self._date_lists.get(currency)
+        if dates is None:
+            return None
+        index = bisect_right(dates, timestamp) - 1
+        if index < 0 or (self.max_age is not None and timestamp - dates[index] > self.max_age):
+            return None
+        return index
+
+    def rate(self, currency: str, timestamp: Any) -> Decimal | None:
+        """Exact as-of rate, or None if there is none."""
+        if currency == self.base:
+            return _ONE
+        index = self._index(currency, timestamp)
+        return None if index is None else self._decimal_rates[currency][index]
+
+    def lookup(self, currencies: npt.ArrayLike, timestamps: npt.ArrayLike) -> Conversion:
+        """As-of rates for whole columns."""
+        currency_array = np.asarray(currencies)
+        time_array = np.asarray(timestamps)
+        rates = np.full(currency_array.shape, np.nan)
+        if not currency_array.size:
+            return Conversion(rates, np.zeros(currency_array.shape, dtype=bool))
+
+        unique, inverse = np.unique(currency_array, return_inverse=True)
+        inverse = inverse.reshape(currency_array.shape)
+        for code, currency in enumerate(unique.tolist()):
+            mask = inverse == code
+            if currency == self.base:
+                rates[mask] = 1.0
+                continue
+            dates = self._dates.get(currency)
+            if dates is None:
+                continue
+            fill_times = time_array[mask]
+            index = np.searchsorted(dates, fill_times, side="right") - 1
+            found = index >= 0
+            if self.max_age is not None:
+                found &= fill_times - dates[np.maximum(index, 0)] <= self.max_age
+            rates[mask] = np.where(found, self._rates[currency][np.maximum(index, 0)], np.nan)
+        return Conversion(rates, np.isnan(rates))
+
+    def missing(
+        self, currencies: npt.ArrayLike, timestamps: npt.ArrayLike
+    ) -> list[tuple[str, Any]]:
+        """Distinct (currency, timestamp) pairs of the columns that have no rate."""
+        currency_array = np.asarray(currencies)
+        time_array = np.asarray(timestamps)
+        mask = self.lookup(currency_array, time_array).missing
+        pairs = zip(currency_array[mask].tolist(), time_array[mask].tolist(), strict=True)
+        return sorted(set(pairs))
+
+    def convert(
+        self, prices: npt.ArrayLike, currencies: npt.ArrayLike, timestamps: npt.ArrayLike
+    ) -> npt.NDArray[np.float64]:
+        """
+        Prices in the base currency.
+
+        Raises MissingRateError listing every missing pair of the columns.
+        """
+        conversion = self.lookup(currencies, timestamps)
+        if conversion.missing.any():
+            raise MissingRateError(self.missing(currencies, timestamps))
+        return np.asarray(prices, dtype=np.float64) * conversion.rates
@@ -0,0 +1,114 @@
+"""Lot-based cost basis with sells: FIFO, LIFO and average-cost relief."""
+
+from collections import deque
+from decimal import Decimal
+from typing import NamedTuple
+
+from .calculator import round_decimal
+
+METHODS = ("fifo", "lifo", "average")
+
+
+class Sale(NamedTuple):
+    """Outcome of one sell, with exact Decimal amounts."""
+
+    quantity: Decimal
+    proceeds: Decimal
+    cost_basis: Decimal
+
+    @property
+    def realized_pnl(self) -> Decimal:
+        return self.proceeds - self.cost_basis
+
+
+class LotLedger:
+    """
+    Position ledger that tracks lots through buys and partial sells.
+
+    FIFO and LIFO consume lots from either end of a deque, so each lot is
+    touched at most once when it is fully sold plus once per partial sale:
+    O(1) amortized per trade regardless of ledger size. The average method
+    keeps no lots and relieves cost at the running average price. Totals are
+    kept as exact running sums, so the remaining average is O(1) to read.
+    """
+
+    __slots__ = ("_lots", "method", "realized_pnl", "total_cost", "total_quantity")
+
+    def __init__(self, method: str = "fifo") -> None:
+        if method not in METHODS:
+            msg = f"Unknown method: {method}"
+            raise ValueError(msg)
+        self.method = method
+        # Each lot is a mutable [quantity, price] pair so partial sells update it in place
+        self._lots: deque[list[Decimal]] = deque()
+        self.total_quantity = Decimal(0)
+        self.total_cost = Decimal(0)
+        self.realized_pnl = Decimal(0)
+
+    def __len__(self) -> int:
+        """Number of open lots (0 or 1 for the average method)."""
+        if self.method == "average":
+            return 1 if self.total_quantity else 0
+        return len(self._lots)
+
+    def buy(self, quantity: float, price: float) -> None:
+        if quantity <= 0 or price <= 0:
+            raise ValueError("All values must be positive")
+
+        decimal_quantity = Decimal(str(quantity))
+        decimal_price = Decimal(str(price))
+        if self.method != "average":
+            self._lots.append([decimal_quantity, decimal_price])
+        self.total_quantity += decimal_quantity
+        self.total_cost += decimal_quantity * decimal_price
+
+    def sell(self, quantity: float, price: float) -> Sale:
+        """Relieve `quantity` units sold at `price` and return the realized result."""
+        if quantity <= 0 or price <= 0:
+            raise ValueError("All values must be positive")
+        remaining = Decimal(str(quantity))
+        if remaining > self.total_quantity:
+            raise ValueError("Cannot sell more than the held quantity")
+
+        sold = remaining
+        if self.method == "average":
+            cost_basis = (
+                self.total_cost
+                if remaining == self.total_quantity
+                else remaining * self.total_cost / self.total_quantity
+            )
+        else:
+            cost_basis = Decimal(0)
+            take = self._lots.popleft if self.method == "fifo" else self._lots.pop
+            end = 0 if self.method == "fifo" else -1
+            while remaining:
+                lot = self._lots[end]
+                if lot[0] <= remaining:
+                    take()
+                    remaining -= lot[0]
+                    cost_basis += lot[0] * lot[1]
+                else:
+                    lot[0] -= remaining
+                    cost_basis += remaining * lot[1]
+                    remaining = Decimal(0)
+
+        sale = Sale(sold, sold * Decimal(str(price)), cost_basis)
+        self.total_quantity -= sold
+        self.total_cost -= cost_basis
+        self.realized_pnl += sale.realized_pnl
+        return sale
+
+    @property
+    def average_price(self) -> Decimal:
+        """Unrounded average cost of the units still held."""
+        if self.total_quantity == 0:
+            raise ZeroDivisionError("Total quantity cannot be zero")
+        return self.total_cost / self.total_quantity
+
+    def result(self, precision: int = 6) -> tuple[float, float, float]:
+        """Rounded (avg, total_qty, total_cost) of the open position."""
+        return (
+            round_decimal(self.average_price, precision),
+            round_decimal(self.total_quantity, precision),
+            round_decimal(self.total_cost, precision),
+        )
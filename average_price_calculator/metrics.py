@@ -0,0 +1,159 @@
+"""
+Optional hot-path instrumentation: per-stage call counts and latency histograms.
+
+Disabled by default. Instrumented code checks the module-level `enabled` flag
+before reading the clock, so the disabled cost is one attribute lookup. Set
+AVG_PRICE_CALC_METRICS=1 or call `enable()` to start recording.
+
+Each thread records into its own counters, so recording takes no lock; the
+registry lock is only taken the first time a thread records anything.
+Histogram bucket `i` counts durations below 2**i nanoseconds.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import os
+import threading
+import time
+
+METRICS_ENV = "AVG_PRICE_CALC_METRICS"
+# 2**35 ns is about 34 s; slower samples land in the last bucket
+BUCKET_COUNT = 36
+PROMETHEUS_PREFIX = "avg_price_calc"
+
+enabled = os.environ.get(METRICS_ENV, "").lower() in ("1", "true", "yes", "on")
+
+_local = threading.local()
+_registry: list[dict[str, list[int]]] = []
+_registry_lock = threading.Lock()
+
+now_ns = time.perf_counter_ns
+
+
+def enable() -> None:
+    global enabled  # noqa: PLW0603
+    enabled = True
+
+
+def disable() -> None:
+    global enabled  # noqa: PLW0603
+    enabled = False
+
+
+def _thread_counters() -> dict[str, list[int]]:
+    try:
+        return _local.counters  # type: ignore[no-any-return]
+    except AttributeError:
+        counters: dict[str, list[int]] = {}
+        _local.counters = counters
+        with _registry_lock:
+            _registry.append(counters)
+        return counters
+
+
+def record(stage: str, elapsed_ns: int) -> None:
+    """Add one sample for `stage`. Callers check `enabled` first."""
+    counters = _thread_counters()
+    entry = counters.get(stage)
+    if entry is None:
+        # Layout: sample count, total nanoseconds, then one count per bucket
+        entry = counters[stage] = [0] * (2 + BUCKET_COUNT)
+    entry[0] += 1
+    entry[1] += elapsed_ns
+    entry[2 + min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Record the duration of a block when instrumentation is enabled."""
+    if not enabled:
+        yield
+        return
+    started = now_ns()
+    try:
+        yield
+    finally:
+        record(stage, now_ns() - started)
+
+
+@dataclass
+class StageStats:
+    """Counters for one stage, summed over all threads."""
+
+    count: int = 0
+    total_ns: int = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * BUCKET_COUNT)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def quantile_ns(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile."""
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return float(2**i)
+        return 0.0
+
+
+def snapshot() -> dict[str, StageStats]:
+    """Current counters per stage. Values may lag concurrent writers slightly."""
+    with _registry_lock:
+        registry = list(_registry)
+
+    stats: dict[str, StageStats] = {}
+    for counters in registry:
+        for stage, entry in list(counters.items()):
+            total = stats.setdefault(stage, StageStats())
+            total.count += entry[0]
+            total.total_ns += entry[1]
+            total.buckets = [a + b for a, b in zip(total.buckets, entry[2:], strict=True)]
+    return dict(sorted(stats.items()))
+
+
+def reset() -> None:
+    """Zero all counters."""
+    with _registry_lock:
+        for counters in _registry:
+            counters.clear()
+
+
+def render_prometheus(stats: dict[str, StageStats] | None = None) -> str:
+    """Counters in the Prometheus text exposition format."""
+    stats = snapshot() if stats is None else stats
+    name = f"{PROMETHEUS_PREFIX}_stage_duration_seconds"
+    lines = [
+        f"# HELP {name} Time spent in each instrumented stage.",
+        f"# TYPE {name} histogram",
+    ]
+    for stage, stage_stats in stats.items():
+        label = f'stage="{stage}"'
+        cumulative = 0
+        for i, n in enumerate(stage_stats.buckets[:-1]):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{label},le="{2**i / 1e9:.9g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label},le="+Inf"}} {stage_stats.count}')
+        lines.append(f"{name}_sum{{{label}}} {stage_stats.total_ns / 1e9:.9g}")
+        lines.append(f"{name}_count{{{label}}} {stage_stats.count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_dict(stats: dict[str, StageStats] | None = None) -> dict[str, dict[str, object]]:
+    """JSON-friendly form of a snapshot."""
+    stats = snapshot() if stats is None else stats
+    return {
+        stage: {"count": s.count, "total_ns": s.total_ns, "buckets": s.buckets}
+        for stage, s in stats.items()
+    }
+
+
+def from_dict(data: dict[str, dict[str, object]]) -> dict[str, StageStats]:
+    """Inverse of to_dict."""
+    return {
+        stage: StageStats(int(s["count"]), int(s["total_ns"]), list(s["buckets"]))  # type: ignore[call-overload]
+        for stage, s in data.items()
+    }
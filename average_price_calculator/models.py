@@ -1,7 +1,14 @@
 """Pydantic models for the calculator."""
 
+from collections.abc import Iterable, Iterator
+from typing import overload
+
+import numpy as np
+import numpy.typing as npt
 from pydantic import BaseModel, ConfigDict, Field
 
+from . import metrics
+
 
 class PriceData(BaseModel):
     """Data model for price calculation."""
@@ -63,3 +70,176 @@ class CalculationResult(BaseModel):
             }
         }
     )
+
+
+class ResultRecord:
+    """Lightweight result for hot paths; convert with to_model at API boundaries."""
+
+    __slots__ = ("average_price", "total_investment", "total_quantity")
+
+    def __init__(self, average_price: float, total_quantity: float, total_investment: float):
+        self.average_price = average_price
+        self.total_quantity = total_quantity
+        self.total_investment = total_investment
+
+    @classmethod
+    def from_model(cls, result: CalculationResult) -> "ResultRecord":
+        return cls(result.average_price, result.total_quantity, result.total_investment)
+
+    def to_model(self) -> CalculationResult:
+        return CalculationResult(
+            average_price=self.average_price,
+            total_quantity=self.total_quantity,
+            total_investment=self.total_investment,
+        )
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.average_price
+        yield self.total_quantity
+        yield self.total_investment
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ResultRecord):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultRecord(average_price={self.average_price}, "
+            f"total_quantity={self.total_quantity}, total_investment={self.total_investment})"
+        )
+
+
+class TradeBuffer:
+    """
+    Columnar store of PriceData rows backed by NumPy arrays.
+
+    Rows are validated in bulk with the same `gt=0` constraint as PriceData.
+    Slicing returns a buffer that shares memory with the original; appending to
+    a slice copies it first, so the original is never modified.
+    """
+
+    FIELDS = ("initial_quantity", "initial_price", "new_quantity", "new_price")
+
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._data = np.empty((len(self.FIELDS), max(capacity, 1)), dtype=np.float64)
+        self._size = 0
+
+    @classmethod
+    def from_columns(
+        cls,
+        initial_quantity: npt.ArrayLike,
+        initial_price: npt.ArrayLike,
+        new_quantity: npt.ArrayLike,
+        new_price: npt.ArrayLike,
+    ) -> "TradeBuffer":
+        buffer = cls(capacity=0)
+        buffer.extend(initial_quantity, initial_price, new_quantity, new_price)
+        return buffer
+
+    @classmethod
+    def from_array(cls, data: npt.NDArray[np.float64]) -> "TradeBuffer":
+        """
+        Buffer over a (len(FIELDS), rows) float64 array, sharing its memory.
+
+        The rows are not validated; use from_columns for untrusted input.
+        """
+        buffer: TradeBuffer = cls.__new__(cls)
+        buffer._data = data
+        buffer._size = int(data.shape[1])
+        return buffer
+
+    @classmethod
+    def from_price_data(cls, rows: Iterable[PriceData]) -> "TradeBuffer":
+        buffer = cls()
+        for row in rows:
+            buffer.append(row.initial_quantity, row.initial_price, row.new_quantity, row.new_price)
+        return buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return int(self._data.shape[1])
+
+    def _reserve(self, size: int) -> None:
+        if size > self.capacity:
+            data = np.empty((len(self.FIELDS), max(size, 2 * self.capacity)), dtype=np.float64)
+            data[:, : self._size] = self._data[:, : self._size]
+            self._data = data
+
+    def append(
+        self, initial_quantity: float, initial_price: float, new_quantity: float, new_price: float
+    ) -> None:
+        """Add one row."""
+        values = (initial_quantity, initial_price, new_quantity, new_price)
+        for field, value in zip(self.FIELDS, values, strict=True):
+            if not value > 0 or value == float("inf"):
+                msg = f"Row {self._size}: {field} must be greater than 0"
+                raise ValueError(msg)
+
+        self._reserve(self._size + 1)
+        self._data[:, self._size] = values
+        self._size += 1
+
+    def extend(
+        self,
+        initial_quantity: npt.ArrayLike,
+        initial_price: npt.ArrayLike,
+        new_quantity: npt.ArrayLike,
+        new_price: npt.ArrayLike,
+    ) -> None:
+        """Add many rows at once. Nothing is added if any row is invalid."""
+        started = metrics.now_ns() if metrics.enabled else 0
+        columns = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(x, dtype=np.float64))
+                for x in (initial_quantity, initial_price, new_quantity, new_price)
+            )
+        )
+        for field, column in zip(self.FIELDS, columns, strict=True):
+            bad = np.flatnonzero(~(np.isfinite(column) & (column > 0)))
+            if bad.size:
+                msg = f"Row {self._size + int(bad[0])}: {field} must be greater than 0"
+                raise ValueError(msg)
+        if started:
+            metrics.record("models.validate_bulk", metrics.now_ns() - started)
+
+        count = columns[0].size
+        self._reserve(self._size + count)
+        for i, column in enumerate(columns):
+            self._data[i, self._size : self._size + count] = column.reshape(-1)
+        self._size += count
+
+    def column(self, field: str) -> npt.NDArray[np.float64]:
+        """Read-only view of one column."""
+        view = self._data[self.FIELDS.index(field), : self._size]
+        view.flags.writeable = False
+        return view
+
+    def columns(self) -> tuple[npt.NDArray[np.float64], ...]:
+        """Read-only views of all columns, in FIELDS order."""
+        return tuple(self.column(field) for field in self.FIELDS)
+
+    @overload
+    def __getitem__(self, index: int) -> PriceData: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TradeBuffer": ...
+
+    def __getitem__(self, index: int | slice) -> "PriceData | TradeBuffer":
+        if isinstance(index, slice):
+            return TradeBuffer.from_array(self._data[:, : self._size][:, index])
+
+        row = self._data[:, : self._size][:, index]
+        return PriceData(**dict(zip(self.FIELDS, row.tolist(), strict=True)))
+
+    def to_price_data(self) -> Iterator[PriceData]:
+        """Rows as PriceData models."""
+        for i in range(self._size):
+            yield self[i]
@@ -0,0 +1,163 @@
+"""Rolling weighted average price over the last N seconds or N trades."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .aggregate import DEFAULT_FIELDS, TradeFields
+from .calculator import round_decimal
+
+if TYPE_CHECKING:
+    from .corporate_actions import SplitTable
+
+GroupKey = tuple[Any, ...]
+
+
+class RollingUpdate(NamedTuple):
+    """Window state after one trade, rounded like calculate_average_price."""
+
+    key: GroupKey
+    timestamp: float
+    average_price: float
+    total_quantity: float
+    total_investment: float
+    trades: int
+
+
+class RollingAverage:
+    """
+    Weighted average price over a sliding window of trades.
+
+    The window holds trades newer than `window_seconds` before the latest
+    timestamp and/or the last `window_trades` trades. Trades sit in a deque
+    next to exact Decimal running sums, so each update and each eviction is
+    O(1) and evicting never leaves float residue in the sums. Timestamps are
+    numbers (e.g. epoch seconds) and must not decrease. Results are rounded
+    to `precision` places unless result is given another.
+    """
+
+    __slots__ = (
+        "_trades",
+        "latest",
+        "precision",
+        "total_investment",
+        "total_quantity",
+        "window_seconds",
+        "window_trades",
+    )
+
+    def __init__(
+        self,
+        window_seconds: float | None = None,
+        window_trades: int | None = None,
+        precision: int = 6,
+    ) -> None:
+        if window_seconds is None and window_trades is None:
+            raise ValueError("Either window_seconds or window_trades is required")
+        if (window_seconds is not None and window_seconds <= 0) or (
+            window_trades is not None and window_trades < 1
+        ):
+            raise ValueError("Window sizes must be positive")
+        if precision < 0:
+            raise ValueError("Precision must be non-negative")
+        self.window_seconds = window_seconds
+        self.window_trades = window_trades
+        self.precision = precision
+        self._trades: deque[tuple[float, Decimal, Decimal]] = deque()
+        self.total_quantity = Decimal(0)
+        self.total_investment = Decimal(0)
+        self.latest: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def update(
+        self, timestamp: float, quantity: float, price: float, factor: Decimal | None = None
+    ) -> "RollingAverage":
+        """
+        Add a trade and evict what fell out of the window. Returns self for chaining.
+
+        `factor` scales the quantity as in Position.add.
+        """
+        if quantity <= 0 or price <= 0:
+            raise ValueError("All values must be positive")
+
+        self.advance(timestamp)
+        decimal_quantity = Decimal(str(quantity))
+        investment = decimal_quantity * Decimal(str(price))
+        if factor is not None:
+            decimal_quantity *= factor
+        self._trades.append((timestamp, decimal_quantity, investment))
+        self.total_quantity += decimal_quantity
+        self.total_investment += investment
+        if self.window_trades is not None and len(self._trades) > self.window_trades:
+            self._evict()
+        return self
+
+    def advance(self, timestamp: float) -> None:
+        """Move the clock to `timestamp` without a trade, evicting expired trades."""
+        if self.latest is not None and timestamp < self.latest:
+            msg = f"Timestamp {timestamp} is older than {self.latest}"
+            raise ValueError(msg)
+        self.latest = timestamp
+        if self.window_seconds is not None:
+            cutoff = timestamp - self.window_seconds
+            while self._trades and self._trades[0][0] <= cutoff:
+                self._evict()
+
+    def _evict(self) -> None:
+        _, quantity, investment = self._trades.popleft()
+        if self._trades:
+            self.total_quantity -= quantity
+            self.total_investment -= investment
+        else:
+            # Reset instead of subtracting so an empty window is exactly zero
+            self.total_quantity = Decimal(0)
+            self.total_investment = Decimal(0)
+
+    @property
+    def average_price(self) -> Decimal:
+        """Unrounded weighted average price of the trades in the window."""
+        if self.total_quantity == 0:
+            raise ZeroDivisionError("Total quantity cannot be zero")
+        return self.total_investment / self.total_quantity
+
+    def result(self, precision: int | None = None) -> tuple[float, float, float]:
+        """Rounded (avg, total_qty, total_inv), as returned by calculate_average_price."""
+        if precision is None:
+            precision = self.precision
+        return (
+            round_decimal(self.average_price, precision),
+            round_decimal(self.total_quantity, precision),
+            round_decimal(self.total_investment, precision),
+        )
+
+
+def rolling_average(
+    trades: Iterable[Mapping[str, Any]],
+    window: RollingAverage,
+    *,
+    keys: Sequence[str] = ("symbol",),
+    fields: TradeFields = DEFAULT_FIELDS,
+    splits: "SplitTable | None" = None,
+) -> Iterator[RollingUpdate]:
+    """
+    Yield the rolling average of each group of `keys` after every trade.
+
+    Each group gets an empty window with the sizes and precision of `window`.
+    Trades must arrive in timestamp order within each group. With `splits`,
+    each trade is adjusted to the latest share basis of its symbol.
+    """
+    windows: dict[GroupKey, RollingAverage] = {}
+    for trade in trades:
+        key = tuple(trade[k] for k in keys)
+        group = windows.get(key)
+        if group is None:
+            group = windows[key] = RollingAverage(
+                window.window_seconds, window.window_trades, window.precision
+            )
+        timestamp = trade[fields.timestamp]
+        factor = None if splits is None else splits.factor(trade[fields.symbol], timestamp)
+        group.update(timestamp, trade[fields.quantity], trade[fields.price], factor)
+        yield RollingUpdate(key, timestamp, *group.result(), len(group))
@@ -0,0 +1,331 @@
+"""Asyncio HTTP service with request micro-batching."""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import json
+from typing import Any, TypeVar
+
+from pydantic import TypeAdapter, ValidationError
+
+from . import metrics
+from .batch import calculate_average_price_batch
+from .models import CalculationResult, PriceData
+
+# How long the first request of a batch waits for others to join, in seconds
+DEFAULT_BATCH_WINDOW = 0.001
+DEFAULT_MAX_BATCH_SIZE = 1024
+MAX_PRECISION = 10
+_MAX_BODY_SIZE = 64 * 1024 * 1024
+
+_price_data_list: TypeAdapter[list[PriceData]] = TypeAdapter(list[PriceData])
+
+_T = TypeVar("_T")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+
+def _calculate(items: list[PriceData], precision: int) -> list[CalculationResult | None]:
+    """
+    Evaluate validated rows in one batch call, with Decimal-exact rounding.
+    Rows that cannot be calculated (non-finite or overflowing values) are None.
+    """
+    result = calculate_average_price_batch(
+        [item.initial_quantity for item in items],
+        [item.initial_price for item in items],
+        [item.new_quantity for item in items],
+        [item.new_price for item in items],
+        precision=precision,
+        exact=True,
+    )
+    return [
+        (
+            None
+            if invalid
+            else CalculationResult(average_price=avg, total_quantity=qty, total_investment=inv)
+        )
+        for invalid, avg, qty, inv in zip(
+            result.invalid.tolist(),
+            result.average_price.tolist(),
+            result.total_quantity.tolist(),
+            result.total_investment.tolist(),
+            strict=True,
+        )
+    ]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single calculations and evaluates them together.
+
+    The first request of a batch waits at most `window` seconds for others;
+    a batch is flushed early once it reaches `max_batch_size` rows.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[PriceData, int, asyncio.Future[CalculationResult | None]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def submit(self, data: PriceData, precision: int = 6) -> CalculationResult | None:
+        """Result for `data` once its batch is evaluated; None if it cannot be calculated."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[CalculationResult | None] = loop.create_future()
+        self._pending.append((data, precision, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Evaluate everything collected so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        started = metrics.now_ns() if metrics.enabled else 0
+
+        by_precision: dict[int, list[tuple[PriceData, asyncio.Future[CalculationResult | None]]]]
+        by_precision = defaultdict(list)
+        for data, precision, future in pending:
+            by_precision[precision].append((data, future))
+
+        for precision, group in by_precision.items():
+            try:
+                results = _calculate([data for data, _ in group], precision)
+            except Exception as e:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(group, results, strict=True):
+                if not future.done():
+                    future.set_result(result)
+
+        if started:
+            metrics.record("service.batch", metrics.now_ns() - started)
+
+
+@dataclass
+class Response:
+    """HTTP status with a body, JSON unless stated otherwise."""
+
+    status: int
+    body: bytes
+    content_type: str = "application/json"
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _HTTPError(Exception):
+    """Ends a request early with an error response."""
+
+    def __init__(self, status: int, detail: Any) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _error(status: int, detail: Any) -> Response:
+    return Response(status, json.dumps({"detail": detail}).encode())
+
+
+def _pop_precision(payload: dict[str, Any]) -> int:
+    precision = payload.pop("precision", 6)
+    # bool is an int subclass, but `"precision": true` is not a precision
+    if (
+        not isinstance(precision, int)
+        or isinstance(precision, bool)
+        or not 0 <= precision <= MAX_PRECISION
+    ):
+        msg = f"precision must be an integer between 0 and {MAX_PRECISION}"
+        raise _HTTPError(422, msg)
+    return precision
+
+
+def _parse_payload(body: bytes) -> dict[str, Any]:
+    """The JSON object of a request body."""
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise _HTTPError(400, "Body must be valid JSON") from e
+    if not isinstance(payload, dict):
+        raise _HTTPError(400, "Body must be a JSON object")
+    return payload
+
+
+def _validate(validate: Callable[[Any], _T], value: Any) -> _T:
+    """`validate(value)`, with validation errors as a 422."""
+    started = metrics.now_ns() if metrics.enabled else 0
+    try:
+        data = validate(value)
+    except ValidationError as e:
+        raise _HTTPError(422, e.errors(include_url=False, include_context=False)) from e
+    if started:
+        metrics.record("models.validate", metrics.now_ns() - started)
+    return data
+
+
+class PriceService:
+    """
+    Request handling for the `/average-price` endpoints.
+
+    POST /average-price takes a PriceData body (plus optional "precision") and
+    returns a CalculationResult; concurrent requests are micro-batched.
+    POST /average-price/batch takes {"items": [PriceData, ...], "precision": n}
+    and returns {"results": [CalculationResult, ...]}. GET /metrics returns the
+    instrumentation counters in Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        self.batcher = MicroBatcher(batch_window, max_batch_size)
+
+    async def handle(self, method: str, path: str, body: bytes) -> Response:
+        """Response to one request; unexpected errors become a 500, not a dropped connection."""
+        try:
+            return await self._handle(method, path, body)
+        except _HTTPError as e:
+            return _error(e.status, e.detail)
+        except Exception:
+            return _error(500, "Internal server error")
+
+    async def _handle(self, method: str, path: str, body: bytes) -> Response:
+        routes: dict[str, tuple[str, Callable[[bytes], Awaitable[Response]]]] = {
+            "/metrics": ("GET", self._metrics),
+            "/average-price": ("POST", self._average_price),
+            "/average-price/batch": ("POST", self._average_price_batch),
+        }
+        route = routes.get(path.split("?", 1)[0].rstrip("/"))
+        if route is None:
+            raise _HTTPError(404, "Not found")
+        allowed, endpoint = route
+        if method != allowed:
+            raise _HTTPError(405, "Method not allowed")
+        return await endpoint(body)
+
+    async def _metrics(self, _body: bytes) -> Response:
+        return Response(200, metrics.render_prometheus().encode(), "text/plain; version=0.0.4")
+
+    async def _average_price(self, body: bytes) -> Response:
+        payload = _parse_payload(body)
+        precision = _pop_precision(payload)
+        data = _validate(PriceData.model_validate, payload)
+        try:
+            result = await self.batcher.submit(data, precision)
+        except ArithmeticError as e:
+            raise _HTTPError(422, "Values cannot be calculated") from e
+        if result is None:
+            raise _HTTPError(422, "Values cannot be calculated")
+        return self._render(lambda: result.model_dump_json().encode())
+
+    async def _average_price_batch(self, body: bytes) -> Response:
+        payload = _parse_payload(body)
+        precision = _pop_precision(payload)
+        items = _validate(_price_data_list.validate_python, payload.get("items", []))
+        try:
+            results = _calculate(items, precision) if items else []
+        except ArithmeticError as e:
+            raise _HTTPError(422, "Values cannot be calculated") from e
+        valid = [result for result in results if result is not None]
+        if len(valid) < len(results):
+            raise _HTTPError(422, f"Row {results.index(None)}: values cannot be calculated")
+        return self._render(
+            lambda: json.dumps({"results": [result.model_dump() for result in valid]}).encode()
+        )
+
+    @staticmethod
+    def _render(dump: Callable[[], bytes]) -> Response:
+        started = metrics.now_ns() if metrics.enabled else 0
+        body = dump()
+        if started:
+            metrics.record("service.render", metrics.now_ns() - started)
+        return Response(200, body)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one connection, with keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split(maxsplit=2)
+
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > _MAX_BODY_SIZE:
+                    response = _error(413, "Payload too large")
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length)
+                    response = await self.handle(method, path, body)
+                    keep_alive = headers.get("connection", "").lower() != "close" and (
+                        version.strip() == "HTTP/1.1"
+                    )
+
+                writer.write(
+                    f"HTTP/1.1 {response.status} {_REASONS[response.status]}\r\n"
+                    f"Content-Type: {response.content_type}\r\n"
+                    f"Content-Length: {len(response.body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + response.body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class LocalClient:
+    """In-process stand-in for an HTTP client, for tests and embedding."""
+
+    def __init__(self, service: PriceService) -> None:
+        self.service = service
+
+    async def post(self, path: str, payload: Any) -> Response:
+        return await self.service.handle("POST", path, json.dumps(payload).encode())
+
+    async def get(self, path: str) -> Response:
+        return await self.service.handle("GET", path, b"")
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    batch_window: float = DEFAULT_BATCH_WINDOW,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> None:
+    """Run the HTTP service until cancelled."""
+    service = PriceService(batch_window, max_batch_size)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,149 @@
+"""
+Dollar-cost-averaging backtests over a price series.
+
+Each strategy turns the price series into the number of units bought at every
+step. The average-cost path then follows from cumulative sums, the same
+weighted average as chaining calculate_average_price over every buy. Many
+strategies are evaluated together as the rows of one matrix.
+"""
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+import os
+from typing import NamedTuple, Protocol
+
+import numpy as np
+import numpy.typing as npt
+
+from .batch import round_half_up
+
+FloatArray = npt.NDArray[np.float64]
+
+
+class Strategy(Protocol):
+    def quantities(self, prices: FloatArray) -> FloatArray:
+        """Units bought at each step of `prices`."""
+        ...
+
+
+def _schedule(steps: int, interval: int) -> npt.NDArray[np.bool_]:
+    if interval < 1:
+        raise ValueError("Interval must be positive")
+    return np.asarray(np.arange(steps) % interval == 0, dtype=bool)
+
+
+@dataclass(frozen=True)
+class FixedAmount:
+    """Invest `amount` every `interval` steps."""
+
+    amount: float
+    interval: int = 1
+
+    def quantities(self, prices: FloatArray) -> FloatArray:
+        return np.where(_schedule(len(prices), self.interval), self.amount / prices, 0.0)
+
+
+@dataclass(frozen=True)
+class FixedQuantity:
+    """Buy `quantity` units every `interval` steps."""
+
+    quantity: float
+    interval: int = 1
+
+    def quantities(self, prices: FloatArray) -> FloatArray:
+        return np.where(_schedule(len(prices), self.interval), self.quantity, 0.0)
+
+
+@dataclass(frozen=True)
+class BuyTheDip:
+    """
+    Invest `amount` on scheduled steps where the price is at least `threshold`
+    (a fraction, e.g. 0.1) below its running peak.
+    """
+
+    amount: float
+    threshold: float
+    interval: int = 1
+
+    def quantities(self, prices: FloatArray) -> FloatArray:
+        dip = prices <= np.maximum.accumulate(prices) * (1 - self.threshold)
+        return np.where(dip & _schedule(len(prices), self.interval), self.amount / prices, 0.0)
+
+
+class SimulationResult(NamedTuple):
+    """Position path of one strategy. Steps before the first buy hold NaN averages."""
+
+    strategy: Strategy
+    average_cost: FloatArray
+    total_quantity: FloatArray
+    total_investment: FloatArray
+
+    def final(self, precision: int = 6) -> tuple[float, float, float]:
+        """Rounded (avg, total_qty, total_inv) after the last step."""
+        if not self.total_quantity[-1] > 0:
+            raise ZeroDivisionError("Total quantity cannot be zero")
+        values = np.array(
+            [self.average_cost[-1], self.total_quantity[-1], self.total_investment[-1]]
+        )
+        avg, qty, inv = round_half_up(values, precision).tolist()
+        return avg, qty, inv
+
+
+def _check_prices(prices: npt.ArrayLike) -> FloatArray:
+    array = np.asarray(prices, dtype=np.float64).reshape(-1)
+    if not len(array):
+        raise ValueError("Price series is empty")
+    if not (np.isfinite(array) & (array > 0)).all():
+        raise ValueError("All values must be positive")
+    return array
+
+
+def _simulate_shard(strategies: Sequence[Strategy], prices: FloatArray) -> list[SimulationResult]:
+    """Evaluate strategies as the rows of one matrix. Module-level for worker processes."""
+    quantity = np.stack([strategy.quantities(prices) for strategy in strategies])
+    total_quantity = np.cumsum(quantity, axis=1)
+    total_investment = np.cumsum(quantity * prices, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_cost = total_investment / total_quantity
+    return [
+        SimulationResult(strategy, *columns)
+        for strategy, *columns in zip(
+            strategies, average_cost, total_quantity, total_investment, strict=True
+        )
+    ]
+
+
+def simulate(prices: npt.ArrayLike, strategy: Strategy) -> SimulationResult:
+    """Run one strategy over a price series."""
+    return _simulate_shard([strategy], _check_prices(prices))[0]
+
+
+def simulate_many(
+    prices: npt.ArrayLike,
+    strategies: Sequence[Strategy],
+    *,
+    workers: int = 1,
+    shard_size: int = 64,
+) -> list[SimulationResult]:
+    """
+    Run a parameter sweep over one price series, results in input order.
+
+    Strategies are evaluated `shard_size` at a time; with `workers` > 1 the
+    shards are spread over a process pool (0 means one worker per CPU). Full
+    paths are sent back from the workers, so the pool pays off when there are
+    several cores and strategy evaluation, not result size, dominates.
+    """
+    if shard_size < 1:
+        raise ValueError("Shard size must be positive")
+    series = _check_prices(prices)
+    shards = [strategies[i : i + shard_size] for i in range(0, len(strategies), shard_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(shards) < 2:
+        return [result for shard in shards for result in _simulate_shard(shard, series)]
+
+    compute = partial(_simulate_shard, prices=series)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        return [result for part in pool.map(compute, shards) for result in part]
@@ -0,0 +1,118 @@
+"""
+Inverse and what-if calculations on top of the weighted average.
+
+The scalar solvers use Decimal and round like calculate_average_price; the
+grid functions evaluate whole price x quantity meshes in one NumPy pass.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import numpy.typing as npt
+
+from .batch import round_half_up
+from .calculator import round_decimal
+
+
+def _positive(*values: float) -> list[Decimal]:
+    if any(x <= 0 for x in values):
+        raise ValueError("All values must be positive")
+    return [Decimal(str(x)) for x in values]
+
+
+def required_quantity(
+    initial_quantity: float,
+    initial_price: float,
+    new_price: float,
+    target_average: float,
+    precision: int = 6,
+) -> float:
+    """
+    Units to buy at `new_price` so the average becomes `target_average`.
+
+    Solves (Q0*P0 + q*p) / (Q0 + q) = T for q. The target must lie strictly
+    between the current average and the new price.
+    """
+    q0, p0, price, target = _positive(initial_quantity, initial_price, new_price, target_average)
+    if not (price < target < p0 or p0 < target < price):
+        raise ValueError("Target average must lie between the current average and the new price")
+    return round_decimal(q0 * (p0 - target) / (target - price), precision)
+
+
+def required_price(
+    initial_quantity: float,
+    initial_price: float,
+    new_quantity: float,
+    target_average: float,
+    precision: int = 6,
+) -> float:
+    """Price at which buying `new_quantity` units makes the average `target_average`."""
+    q0, p0, quantity, target = _positive(
+        initial_quantity, initial_price, new_quantity, target_average
+    )
+    price = (target * (q0 + quantity) - q0 * p0) / quantity
+    if price <= 0:
+        raise ValueError("Target average is not reachable with a positive price")
+    return round_decimal(price, precision)
+
+
+def break_even_price(
+    quantity: float, average_price: float, fees: float = 0.0, precision: int = 6
+) -> float:
+    """Sell price at which the whole position recovers its cost plus `fees`."""
+    if fees < 0:
+        raise ValueError("Fees must not be negative")
+    q, average = _positive(quantity, average_price)
+    return round_decimal(average + Decimal(str(fees)) / q, precision)
+
+
+def average_price_grid(
+    initial_quantity: float,
+    initial_price: float,
+    prices: npt.ArrayLike,
+    quantities: npt.ArrayLike,
+    precision: int | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Average price for every (price, quantity) pair of an additional purchase.
+
+    Returns an array of shape (len(prices), len(quantities)); entries with a
+    non-positive price or quantity are NaN. With `precision`, values are
+    rounded half-up like batch results.
+    """
+    if initial_quantity <= 0 or initial_price <= 0:
+        raise ValueError("All values must be positive")
+
+    price = np.asarray(prices, dtype=np.float64).reshape(-1, 1)
+    quantity = np.asarray(quantities, dtype=np.float64).reshape(1, -1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grid = (initial_quantity * initial_price + price * quantity) / (initial_quantity + quantity)
+    grid[~((price > 0) & (quantity > 0))] = np.nan
+    return grid if precision is None else round_half_up(grid, precision)
+
+
+def required_quantity_grid(
+    initial_quantity: float,
+    initial_price: float,
+    prices: npt.ArrayLike,
+    targets: npt.ArrayLike,
+) -> npt.NDArray[np.float64]:
+    """
+    required_quantity for every (target, price) pair, unrounded.
+
+    Returns an array of shape (len(targets), len(prices)); unreachable
+    combinations are NaN.
+    """
+    if initial_quantity <= 0 or initial_price <= 0:
+        raise ValueError("All values must be positive")
+
+    price = np.asarray(prices, dtype=np.float64).reshape(1, -1)
+    target = np.asarray(targets, dtype=np.float64).reshape(-1, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grid = initial_quantity * (initial_price - target) / (target - price)
+    reachable = (price > 0) & (
+        ((price < target) & (target < initial_price))
+        | ((initial_price < target) & (target < price))
+    )
+    grid[~reachable] = np.nan
+    return grid
@@ -0,0 +1,201 @@
+"""
+SQLite adapter: stream positions out, calculate in batches, write results back.
+
+Rows are read with fetchmany on one connection and results written with
+executemany on another, one transaction per chunk. The database is switched
+to WAL mode so the reader keeps a consistent snapshot while the writer
+commits.
+"""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+import os
+import re
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .aggregate import DEFAULT_FIELDS, GroupKey, TradeFields, group_by_average
+from .batch import BatchOptions, calculate_average_price_batch
+from .calculator import Position
+from .streaming import INPUT_FIELDS, RESULT_FIELDS, BatchStats
+
+if TYPE_CHECKING:
+    from .corporate_actions import SplitTable
+
+DEFAULT_CHUNK_SIZE = 10_000
+# Applied to every connection opened by this module
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -64 * 1024,  # KiB
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+@dataclass
+class RecalculationStats(BatchStats):
+    """BatchStats plus the highest id processed, for the next incremental run."""
+
+    last_id: int | None = None
+
+
+def _quote(name: str) -> str:
+    if not _IDENTIFIER.fullmatch(name):
+        msg = f"Invalid SQL identifier: {name!r}"
+        raise ValueError(msg)
+    return f'"{name}"'
+
+
+def connect(path: str | os.PathLike[str]) -> sqlite3.Connection:
+    """Open a database with the bulk-throughput pragmas applied."""
+    connection = sqlite3.connect(path)
+    for name, value in PRAGMAS.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+def ensure_result_columns(connection: sqlite3.Connection, table: str = "positions") -> None:
+    """Add the average_price, total_quantity and total_investment columns if missing."""
+    existing = {row[1] for row in connection.execute(f"PRAGMA table_info({_quote(table)})")}
+    if not existing:
+        msg = f"No table named {table!r}"
+        raise ValueError(msg)
+    with connection:
+        for field in RESULT_FIELDS:
+            if field not in existing:
+                connection.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {field} REAL")
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _column(values: Sequence[Any]) -> npt.NDArray[np.float64]:
+    """Float column of a chunk; NULL and non-numeric values become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_as_float(value) for value in values], dtype=np.float64)
+
+
+def _fetch_chunks(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[list[Any]]:
+    while rows := cursor.fetchmany(chunk_size):
+        yield rows
+
+
+def recalculate(
+    path: str | os.PathLike[str],
+    table: str = "positions",
+    options: BatchOptions | None = None,
+    *,
+    after_id: int | None = None,
+    id_column: str = "id",
+) -> RecalculationStats:
+    """
+    Recalculate the result columns of every row of `table`, or only rows with
+    `id_column` > `after_id` for incremental runs.
+
+    `options` gives the chunk size, precision and exactness (exact by
+    default); chunks are calculated in this process. Rows with missing or
+    non-positive inputs are counted as rejected and their results set to
+    NULL. Pass the returned `last_id` as `after_id` next time.
+    """
+    if options is None:
+        options = BatchOptions(exact=True)
+
+    quoted_table, quoted_id = _quote(table), _quote(id_column)
+    select = (
+        f"SELECT {quoted_id}, {', '.join(INPUT_FIELDS)} FROM {quoted_table} "
+        f"WHERE {quoted_id} > ? ORDER BY {quoted_id}"
+    )
+    update = (
+        f"UPDATE {quoted_table} SET {', '.join(f'{field} = ?' for field in RESULT_FIELDS)} "
+        f"WHERE {quoted_id} = ?"
+    )
+
+    writer = connect(path)
+    reader = connect(path)
+    stats = RecalculationStats(last_id=after_id)
+    started = time.perf_counter()
+    try:
+        ensure_result_columns(writer, table)
+        cursor = reader.execute(select, (-(2**63) if after_id is None else after_id,))
+        for rows in _fetch_chunks(cursor, options.chunk_size):
+            ids, *columns = zip(*rows, strict=True)
+            # NULL inputs become NaN and are flagged invalid by the batch path
+            initial_quantity, initial_price, new_quantity, new_price = map(_column, columns)
+            result = calculate_average_price_batch(
+                initial_quantity,
+                initial_price,
+                new_quantity,
+                new_price,
+                precision=options.precision,
+                exact=options.exact,
+            )
+            values = zip(
+                result.average_price.tolist(),
+                result.total_quantity.tolist(),
+                result.total_investment.tolist(),
+                result.invalid.tolist(),
+                ids,
+                strict=True,
+            )
+            with writer:
+                writer.executemany(
+                    update,
+                    (
+                        (None, None, None, row_id) if invalid else (avg, qty, inv, row_id)
+                        for avg, qty, inv, invalid, row_id in values
+                    ),
+                )
+            stats.rows += len(rows)
+            stats.rejected += int(result.invalid.sum())
+            stats.last_id = ids[-1]
+    finally:
+        reader.close()
+        writer.close()
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def aggregate_fills(
+    path: str | os.PathLike[str],
+    table: str = "fills",
+    keys: Sequence[str] = ("symbol",),
+    *,
+    fields: TradeFields = DEFAULT_FIELDS,
+    splits: "SplitTable | None" = None,
+) -> dict[GroupKey, Position]:
+    """
+    group_by_average over a fills table, streamed with fetchmany.
+
+    With `splits`, fills are adjusted to the latest share basis as in
+    group_by_average, reading the symbol and timestamp columns as well.
+    """
+    names = [*keys, fields.quantity, fields.price]
+    if splits is not None:
+        names += [fields.symbol, fields.timestamp]
+    columns = ", ".join(_quote(name) for name in dict.fromkeys(names))
+    connection = connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        cursor = connection.execute(f"SELECT {columns} FROM {_quote(table)}")
+        return group_by_average(
+            (row for rows in _fetch_chunks(cursor, DEFAULT_CHUNK_SIZE) for row in rows),
+            keys,
+            fields=fields,
+            splits=splits,
+        )
+    finally:
+        connection.close()
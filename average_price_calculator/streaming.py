@@ -0,0 +1,363 @@
+"""Chunked CSV/JSONL processing for the batch command."""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+import csv
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain, islice
+import json
+import time
+from typing import IO, TYPE_CHECKING, Any, TextIO
+
+import numpy as np
+
+from .batch import BatchOptions, BatchResult, calculate_average_price_batch
+
+if TYPE_CHECKING:
+    from .columnar import ColumnarFile
+    from .writers import Schema
+
+INPUT_FIELDS = ("initial_quantity", "initial_price", "new_quantity", "new_price")
+RESULT_FIELDS = ("average_price", "total_quantity", "total_investment")
+FORMATS = ("csv", "jsonl")
+# Binary input format read by process_columnar; see the columnar module
+COLUMNAR_FORMAT = "columnar"
+# Binary output formats written by the writers module
+_BINARY_EXTENSIONS = {".npy": "npy", ".arrow": "arrow", ".arrows": "arrow"}
+
+Record = dict[str, Any]
+
+
+@dataclass
+class BatchStats:
+    """Counters reported at the end of a batch run."""
+
+    rows: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def infer_format(path: str | None, default: str = "csv") -> str:
+    """Guess the file format from its extension."""
+    if path and path.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    if path and path.lower().endswith(".apcol"):
+        return COLUMNAR_FORMAT
+    for extension, fmt in _BINARY_EXTENSIONS.items():
+        if path and path.lower().endswith(extension):
+            return fmt
+    return default
+
+
+def _read_records(stream: TextIO, fmt: str) -> Iterator[Record | None]:
+    """Yield input records one by one; unparsable lines come out as None."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def read_chunks(stream: TextIO, fmt: str, chunk_size: int) -> Iterator[list[Record | None]]:
+    """Split the input into lists of at most `chunk_size` records."""
+    if fmt not in FORMATS:
+        msg = f"Unknown format: {fmt}"
+        raise ValueError(msg)
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+
+    records = _read_records(stream, fmt)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+def _parse_value(record: Record | None, field: str) -> float:
+    try:
+        return float(record[field])  # type: ignore[index]
+    except (KeyError, TypeError, ValueError):
+        return float("nan")
+
+
+def chunk_columns(
+    chunk: list[Record | None], fields: Sequence[str] = INPUT_FIELDS
+) -> list[np.ndarray]:
+    """Float columns of a chunk (the inputs by default); missing or malformed values become NaN."""
+    return [
+        np.fromiter((_parse_value(record, field) for record in chunk), np.float64, len(chunk))
+        for field in fields
+    ]
+
+
+def calculate_chunk(chunk: list[Record | None], precision: int, *, exact: bool) -> BatchResult:
+    """Parse and calculate one chunk. Module-level so it can run in worker processes."""
+    return calculate_chunk_columns(chunk, precision, exact=exact)[1]
+
+
+def calculate_chunk_columns(
+    chunk: list[Record | None], precision: int, *, exact: bool
+) -> tuple[dict[str, np.ndarray], BatchResult]:
+    """calculate_chunk that also returns the parsed input columns, for column writers."""
+    columns = chunk_columns(chunk)
+    initial_quantity, initial_price, new_quantity, new_price = columns
+    result = calculate_average_price_batch(
+        initial_quantity, initial_price, new_quantity, new_price, precision=precision, exact=exact
+    )
+    return dict(zip(INPUT_FIELDS, columns, strict=True)), result
+
+
+def ordered_map(
+    pool: ProcessPoolExecutor, fn: Callable[[Any], Any], items: Iterable[Any], window: int
+) -> Iterator[tuple[Any, Any]]:
+    """
+    Yield (item, fn(item)) in input order, keeping at most `window` tasks in flight.
+
+    Unlike Executor.map this does not consume the whole input up front, so memory
+    stays bounded by the window.
+    """
+    pending: deque[tuple[Any, Future[Any]]] = deque()
+    for item in items:
+        pending.append((item, pool.submit(fn, item)))
+        if len(pending) >= window:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    while pending:
+        done_item, future = pending.popleft()
+        yield done_item, future.result()
+
+
+def compute_chunks(
+    chunks: Iterable[list[Record | None]],
+    compute: Callable[[list[Record | None]], Any],
+    stack: ExitStack,
+    workers: int,
+    min_parallel_rows: int,
+) -> Iterator[tuple[list[Record | None], Any]]:
+    """
+    Yield (chunk, compute(chunk)) in input order.
+
+    Chunks are computed in-process until `min_parallel_rows` rows have been
+    seen; only then is a pool of `workers` processes started (and registered
+    on `stack`) for the rest, so inputs below the threshold never pay for
+    process startup and nothing has to be buffered to find out.
+    """
+    rows = 0
+    chunks = iter(chunks)
+    for chunk in chunks:
+        if workers > 1 and rows >= min_parallel_rows:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            yield from ordered_map(pool, compute, chain([chunk], chunks), window=2 * workers)
+            return
+        rows += len(chunk)
+        yield chunk, compute(chunk)
+
+
+class RecordWriter:
+    """Writes records with their results as CSV or JSONL."""
+
+    def __init__(self, stream: IO[str], fmt: str, precision: int) -> None:
+        if fmt not in FORMATS:
+            msg = f"Unknown format: {fmt}"
+            raise ValueError(msg)
+        self.stream = stream
+        self.fmt = fmt
+        self.precision = precision
+        self._csv: csv.DictWriter[str] | None = None
+
+    def write(self, record: Record, result: tuple[float, float, float]) -> None:
+        values = dict(zip(RESULT_FIELDS, result, strict=True))
+        if self.fmt == "jsonl":
+            self.stream.write(json.dumps({**record, **values}) + "\n")
+            return
+
+        if self._csv is None:
+            self._csv = csv.DictWriter(
+                self.stream, [*record, *RESULT_FIELDS], extrasaction="ignore"
+            )
+            self._csv.writeheader()
+        self._csv.writerow(
+            {**record, **{field: f"{v:.{self.precision}f}" for field, v in values.items()}}
+        )
+
+
+def process_stream(
+    source: TextIO,
+    sink: IO[Any],
+    options: BatchOptions | None = None,
+    *,
+    input_format: str = "csv",
+    output_format: str | None = None,
+) -> BatchStats:
+    """
+    Calculate results for every record in `source` and write them to `sink`.
+
+    Only one chunk of `options.chunk_size` records is held in memory at a time
+    (two per worker with `options.workers` > 1, where chunks after the first
+    `options.min_parallel_rows` rows are computed in a process pool and
+    written in input order; see compute_chunks).
+    Rejected records (missing, malformed or non-positive values) are counted and
+    left out of the output.
+
+    CSV and JSONL output echo each record with its results. Binary output
+    formats (npy, arrow; `sink` must then be a binary stream) hold the parsed
+    input columns and the results, written by the writers module.
+    """
+    options = options or BatchOptions()
+    output_format = output_format or input_format
+    binary = output_format not in FORMATS
+    stats = BatchStats()
+    started = time.perf_counter()
+    compute = partial(
+        calculate_chunk_columns if binary else calculate_chunk,
+        precision=options.precision,
+        exact=options.exact,
+    )
+    chunks = read_chunks(source, input_format, options.chunk_size)
+
+    with ExitStack() as stack:
+        results = compute_chunks(chunks, compute, stack, options.workers, options.min_parallel_rows)
+
+        if binary:
+            from .writers import open_writer
+
+            schema: Schema = dict.fromkeys((*INPUT_FIELDS, *RESULT_FIELDS), np.float64)
+            writer = stack.enter_context(
+                open_writer(sink, output_format, options.precision, schema)
+            )
+            _write_columns((computed for _, computed in results), writer, stats)
+        else:
+            _write_results(results, RecordWriter(sink, output_format, options.precision), stats)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _write_results(
+    results: Iterable[tuple[list[Record | None], BatchResult]],
+    writer: RecordWriter,
+    stats: BatchStats,
+) -> None:
+    for chunk, result in results:
+        stats.rows += len(chunk)
+        stats.rejected += int(result.invalid.sum())
+
+        rows = zip(
+            chunk,
+            result.invalid.tolist(),
+            result.average_price.tolist(),
+            result.total_quantity.tolist(),
+            result.total_investment.tolist(),
+            strict=True,
+        )
+        for record, invalid, *values in rows:
+            if not invalid:
+                writer.write(record, tuple(values))  # type: ignore[arg-type]
+
+
+def _write_columns(
+    results: Iterable[tuple[Any, BatchResult]], writer: Any, stats: BatchStats
+) -> None:
+    """Write (input columns, result) chunks with a writers.ColumnWriter."""
+    from .writers import result_columns
+
+    for columns, result in results:
+        stats.rows += len(result.invalid)
+        stats.rejected += int(result.invalid.sum())
+        writer.write(result_columns(result, columns))
+
+
+def _calculate_columnar_range(
+    bounds: tuple[int, int], source: "ColumnarFile | str", precision: int, *, exact: bool
+) -> BatchResult:
+    """
+    Calculate one row range of a columnar file.
+
+    In-process callers pass the open file; workers get its path and map the
+    file themselves, so no column data is pickled.
+    """
+    from .columnar import ColumnarFile
+
+    if not isinstance(source, ColumnarFile):
+        source = ColumnarFile(source)
+    start, stop = bounds
+    initial_quantity, initial_price, new_quantity, new_price = (
+        source.column(field)[start:stop] for field in INPUT_FIELDS
+    )
+    return calculate_average_price_batch(
+        initial_quantity, initial_price, new_quantity, new_price, precision=precision, exact=exact
+    )
+
+
+def process_columnar(
+    path: str,
+    sink: IO[Any],
+    options: BatchOptions | None = None,
+    *,
+    output_format: str = "csv",
+) -> BatchStats:
+    """
+    process_stream for a columnar file.
+
+    The input columns are zero-copy views of the memory-mapped file, so the
+    calculation parses nothing and memory use stays flat for any file size.
+    With `options.workers` > 1 and at least `options.min_parallel_rows` rows,
+    each worker process maps the file itself and only row ranges and results
+    cross process boundaries. Every column of the file is
+    written next to the results, straight from the mapped views, in any of the
+    writers module's formats.
+    """
+    from .columnar import ColumnarFile
+    from .writers import open_writer
+
+    options = options or BatchOptions()
+    chunk_size, precision, exact = options.chunk_size, options.precision, options.exact
+    source = ColumnarFile(path)
+    missing = [field for field in INPUT_FIELDS if field not in source]
+    if missing:
+        msg = f"Columnar file is missing columns: {', '.join(missing)}"
+        raise ValueError(msg)
+
+    stats = BatchStats()
+    started = time.perf_counter()
+    ranges = [
+        (start, min(start + chunk_size, len(source))) for start in range(0, len(source), chunk_size)
+    ]
+
+    with ExitStack() as stack:
+        if options.workers > 1 and len(ranges) > 1 and len(source) >= options.min_parallel_rows:
+            compute = partial(
+                _calculate_columnar_range, source=str(path), precision=precision, exact=exact
+            )
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=options.workers))
+            computed = ordered_map(pool, compute, ranges, window=2 * options.workers)
+        else:
+            computed = (
+                (bounds, _calculate_columnar_range(bounds, source, precision, exact=exact))
+                for bounds in ranges
+            )
+        schema: Schema = {**source.dtypes, **dict.fromkeys(RESULT_FIELDS, np.float64)}
+        writer = stack.enter_context(open_writer(sink, output_format, precision, schema))
+        results = (
+            ({name: source.column(name)[start:stop] for name in source.names}, result)
+            for (start, stop), result in computed
+        )
+        _write_columns(results, writer, stats)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
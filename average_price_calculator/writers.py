@@ -0,0 +1,249 @@
+"""
+Bulk writers for result columns: CSV, JSONL, NumPy .npy and Arrow IPC.
+
+A writer takes whole chunks as a mapping of column name to array and formats
+them column by column, without a record or model object per row. The text
+formats match what RecordWriter produces for the same values: floats keep
+their shortest repr, and CSV writes the result fields at the given precision.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+import json
+import struct
+from types import TracebackType
+from typing import IO, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .batch import BatchResult
+from .streaming import RESULT_FIELDS
+
+TEXT_FORMATS = ("csv", "jsonl")
+BINARY_FORMATS = ("npy", "arrow")
+OUTPUT_FORMATS = (*TEXT_FORMATS, *BINARY_FORMATS)
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Digits reserved for the row count, so the .npy header can be rewritten in place
+_NPY_ROW_DIGITS = 20
+_CSV_SPECIAL = (",", '"', "\r", "\n")
+
+Columns = Mapping[str, npt.NDArray[Any]]
+Schema = Mapping[str, npt.DTypeLike]
+
+# Columns of binary output that ends before the first chunk, unless the caller knows better
+RESULT_SCHEMA: Schema = dict.fromkeys(RESULT_FIELDS, np.float64)
+
+
+def result_columns(
+    result: BatchResult, inputs: Columns | None = None
+) -> dict[str, npt.NDArray[Any]]:
+    """Columns of the valid rows of a chunk: `inputs` first, then the results."""
+    columns = {**(inputs or {}), **{field: getattr(result, field) for field in RESULT_FIELDS}}
+    if not result.invalid.any():
+        return {name: np.asarray(column) for name, column in columns.items()}
+    valid = ~result.invalid
+    return {name: np.asarray(column)[valid] for name, column in columns.items()}
+
+
+def _decoded(column: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    return np.char.decode(column, "utf-8") if column.dtype.kind == "S" else column
+
+
+def _csv_quote(value: str) -> str:
+    if any(char in value for char in _CSV_SPECIAL):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class ColumnWriter(ABC):
+    """
+    Base class: writes chunks of columns to a stream.
+
+    The first chunk fixes the column names and order. Use as a context
+    manager or call close(); closing finishes the output but leaves the
+    stream open. Binary formats write `schema` (column names and dtypes) as
+    their header when closed without any chunk, so empty output still loads.
+    """
+
+    def __init__(self, stream: IO[Any], precision: int = 6, schema: Schema | None = None) -> None:
+        self.stream = stream
+        self.precision = precision
+        self.schema = RESULT_SCHEMA if schema is None else schema
+        self.rows = 0
+        self._names: list[str] | None = None
+
+    def write(self, columns: Columns) -> None:
+        names = list(columns)
+        if self._names is None:
+            self._names = names
+            self._start(columns)
+        elif names != self._names:
+            msg = f"Expected columns {self._names}, got {names}"
+            raise ValueError(msg)
+
+        rows = len(columns[names[0]]) if names else 0
+        if rows:
+            self._write(columns)
+            self.rows += rows
+
+    def close(self) -> None:  # noqa: B027 - optional hook, text formats need no trailer
+        """Finish the output, e.g. a trailer or header that depends on the row count."""
+
+    def __enter__(self) -> "ColumnWriter":  # noqa: PYI034 - typing.Self needs Python 3.11
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _start(self, columns: Columns) -> None:  # noqa: B027 - optional hook
+        """Write whatever precedes the first row."""
+
+    def _start_empty(self) -> None:
+        """Start the output from the schema if no chunk was written."""
+        if self._names is None:
+            self.write({name: np.empty(0, dtype) for name, dtype in self.schema.items()})
+
+    @abstractmethod
+    def _write(self, columns: Columns) -> None:
+        """Write a non-empty chunk."""
+
+
+class CsvWriter(ColumnWriter):
+    """CSV with a header row and csv-module quoting and line endings."""
+
+    def _start(self, columns: Columns) -> None:
+        self.stream.write(",".join(_csv_quote(name) for name in columns) + "\r\n")
+
+    def _write(self, columns: Columns) -> None:
+        specs, values = [], []
+        for name, column in columns.items():
+            if column.dtype.kind in "SU":
+                specs.append("%s")
+                values.append([_csv_quote(value) for value in _decoded(column).tolist()])
+            else:
+                specs.append(f"%.{self.precision}f" if name in RESULT_FIELDS else "%r")
+                values.append(column.tolist())
+        template = ",".join(specs) + "\r\n"
+        self.stream.write("".join([template % row for row in zip(*values, strict=True)]))
+
+
+class JsonlWriter(ColumnWriter):
+    """One JSON object per line, formatted as json.dumps would."""
+
+    def _write(self, columns: Columns) -> None:
+        specs, values = [], []
+        for name, column in columns.items():
+            # Names are escaped for the %-template as well as for JSON
+            key = json.dumps(name).replace("%", "%%")
+            if column.dtype.kind in "iu" or (
+                column.dtype.kind == "f" and np.isfinite(column).all()
+            ):
+                # repr of a finite float or int is exactly what json.dumps writes
+                specs.append(f"{key}: %r")
+                values.append(column.tolist())
+            else:
+                specs.append(f"{key}: %s")
+                values.append([json.dumps(value) for value in _decoded(column).tolist()])
+        template = "{" + ", ".join(specs) + "}\n"
+        self.stream.write("".join([template % row for row in zip(*values, strict=True)]))
+
+
+def _npy_header(dtype: np.dtype[Any], rows: int) -> bytes:
+    descr = np.lib.format.dtype_to_descr(dtype)
+    text = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+    size = len(text) - len(str(rows)) + _NPY_ROW_DIGITS + 1
+    size += -(len(_NPY_MAGIC) + 2 + size) % 64
+    return _NPY_MAGIC + struct.pack("<H", size) + (text.ljust(size - 1) + "\n").encode("latin1")
+
+
+class NpyWriter(ColumnWriter):
+    """
+    One structured array in NumPy .npy format, readable with np.load.
+
+    Rows are appended as raw bytes and the row count in the header is filled
+    in on close, so the stream must be a seekable binary file.
+    """
+
+    def _start(self, columns: Columns) -> None:
+        if not self.stream.seekable():
+            raise ValueError("npy output needs a seekable file")
+        self.dtype = np.dtype([(name, column.dtype) for name, column in columns.items()])
+        self._header_offset = self.stream.tell()
+        self.stream.write(_npy_header(self.dtype, 0))
+
+    def _write(self, columns: Columns) -> None:
+        for name, column in columns.items():
+            field = self.dtype.fields[name][0]  # type: ignore[index]
+            if column.dtype.kind in "SU" and column.dtype.itemsize > field.itemsize:
+                msg = f"Column {name!r} is wider than {field} in the first chunk"
+                raise ValueError(msg)
+
+        array = np.empty(len(columns[next(iter(columns))]), self.dtype)
+        for name, column in columns.items():
+            array[name] = column
+        self.stream.write(array.tobytes())
+
+    def close(self) -> None:
+        self._start_empty()
+        end = self.stream.tell()
+        self.stream.seek(self._header_offset)
+        self.stream.write(_npy_header(self.dtype, self.rows))
+        self.stream.seek(end)
+
+
+class ArrowWriter(ColumnWriter):
+    """Arrow IPC stream format, one record batch per chunk. Needs pyarrow."""
+
+    def __init__(self, stream: IO[Any], precision: int = 6, schema: Schema | None = None) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc
+        except ImportError as e:
+            msg = "Arrow output requires pyarrow"
+            raise ImportError(msg) from e
+        super().__init__(stream, precision, schema)
+        self._pa = pa
+        self._writer: Any = None
+
+    def _batch(self, columns: Columns) -> Any:
+        return self._pa.record_batch(
+            [self._pa.array(_decoded(column)) for column in columns.values()], names=list(columns)
+        )
+
+    def _start(self, columns: Columns) -> None:
+        schema = self._batch({name: column[:0] for name, column in columns.items()}).schema
+        self._writer = self._pa.ipc.new_stream(self.stream, schema)
+
+    def _write(self, columns: Columns) -> None:
+        self._writer.write_batch(self._batch(columns))
+
+    def close(self) -> None:
+        self._start_empty()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+WRITERS: dict[str, type[ColumnWriter]] = {
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+    "npy": NpyWriter,
+    "arrow": ArrowWriter,
+}
+
+
+def open_writer(
+    stream: IO[Any], fmt: str, precision: int = 6, schema: Schema | None = None
+) -> ColumnWriter:
+    """Writer for `fmt`. Binary formats need a binary stream, text formats a text one."""
+    if fmt not in WRITERS:
+        msg = f"Unknown output format: {fmt}"
+        raise ValueError(msg)
+    return WRITERS[fmt](stream, precision, schema)
@@ -0,0 +1,58 @@
+"""Compare a pytest-benchmark JSON report against a stored baseline."""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("current", type=Path, help="pytest-benchmark JSON of the current run")
+    parser.add_argument("baseline", type=Path, help="pytest-benchmark JSON to compare against")
+    parser.add_argument(
+        "-t", "--threshold", type=float, default=10.0, help="allowed slowdown of the mean, in percent"
+    )
+    args = parser.parse_args()
+
+    return args
+
+
+def load_means(path):
+    report = json.loads(path.read_text())
+    return {bench["fullname"]: bench["stats"]["mean"] for bench in report["benchmarks"]}
+
+
+def main():
+    args = get_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not args.baseline.exists():
+        logger.error("No baseline at %s; run `make bench-baseline` to create one", args.baseline)
+        return 1
+
+    current = load_means(args.current)
+    baseline = load_means(args.baseline)
+
+    regressions = []
+    for name, mean in sorted(current.items()):
+        if name not in baseline:
+            logger.info("  new       %s", name)
+            continue
+        change = (mean / baseline[name] - 1) * 100
+        status = "REGRESSED" if change > args.threshold else "ok"
+        logger.info("  %-9s %s: %+.1f%%", status, name, change)
+        if change > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        logger.error(
+            "%d benchmark(s) slower than baseline by more than %s%%", len(regressions), args.threshold
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
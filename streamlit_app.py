@@ -1,7 +1,82 @@
 """Streamlit web application for the calculator."""
 
+import hashlib
+import io
+
+import numpy as np
 import streamlit as st
-from average_price_calculator import PriceData, calculate_average_price_safe
+from average_price_calculator import PriceData
+from average_price_calculator.batch import running_average_batch
+from average_price_calculator.cache import CalculationCache
+from average_price_calculator.downsample import lttb
+from average_price_calculator.solver import average_price_grid, required_quantity
+from average_price_calculator.streaming import chunk_columns, infer_format, read_chunks
+
+# Points drawn per chart, whatever the number of fills
+CHART_POINTS = 2000
+# Viridis-like anchor colors for the heatmap, from low to high values
+HEATMAP_COLORS = np.array(
+    [[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]], dtype=float
+)
+
+
+@st.cache_resource
+def get_cache() -> CalculationCache:
+    """One calculation cache shared by all reruns and sessions."""
+    return CalculationCache(maxsize=1024)
+
+
+@st.cache_data(max_entries=4, show_spinner="Parsing trades...")
+def load_trades(
+    digest: str,  # noqa: ARG001 - only read by st.cache_data, as the cache key
+    _content: bytes,
+    fmt: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantity and price columns of an uploaded CSV/JSONL file.
+
+    Cached by the content hash `digest`; the content itself is not hashed again.
+    """
+    stream = io.StringIO(_content.decode("utf-8-sig"), newline="")
+    chunks = [
+        chunk_columns(chunk, ("quantity", "price")) for chunk in read_chunks(stream, fmt, 100_000)
+    ]
+    if not chunks:
+        return np.empty(0), np.empty(0)
+    quantity, price = (np.concatenate(column) for column in zip(*chunks, strict=True))
+    return quantity, price
+
+
+@st.cache_data(max_entries=4, show_spinner="Computing average cost...")
+def average_cost_curve(
+    digest: str,  # noqa: ARG001 - only read by st.cache_data, as the cache key
+    _quantity: np.ndarray,
+    _price: np.ndarray,
+    points: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Running average cost after each valid fill, downsampled to at most `points`.
+
+    Returns the kept fill indices, their averages and the invalid-row mask.
+    """
+    result = running_average_batch(_quantity, _price)
+    fills = np.flatnonzero(~result.invalid)
+    averages = result.average_price[fills]
+    kept = lttb(fills, averages, points)
+    return fills[kept], averages[kept], result.invalid
+
+
+def colorize(values: np.ndarray) -> np.ndarray:
+    """Map a 2-D array to RGB pixels; NaN becomes grey."""
+    low, high = np.nanmin(values), np.nanmax(values)
+    scaled = (values - low) / (high - low) if high > low else np.zeros_like(values)
+    stops = np.linspace(0, 1, len(HEATMAP_COLORS))
+    pixels = np.stack(
+        [np.interp(scaled, stops, HEATMAP_COLORS[:, channel]) for channel in range(3)], axis=-1
+    )
+    pixels[np.isnan(values)] = 128
+    return pixels.astype(np.uint8)
+
 
 # Page configuration
 st.set_page_config(
@@ -29,6 +104,11 @@ with st.sidebar:
         st.session_state.initial_price = 3.602
         st.session_state.new_qty = 2.93867
         st.session_state.new_price = 2.11
+    st.markdown("---")
+    cache_stats = get_cache().stats()
+    st.caption(
+        f"Cache: {cache_stats.size} entries, {cache_stats.hits} hits, {cache_stats.misses} misses"
+    )
 
 # Input form
 with st.form("calculator_form"):
@@ -83,8 +163,8 @@ if calculate:
             new_price=new_price,
         )
 
-        # Calculate
-        result = calculate_average_price_safe(data, precision)
+        # Calculate; reruns with unchanged inputs are served from the cache
+        result = get_cache().calculate_safe(data, precision)
 
         # Display results
         st.success("Calculation successful!")
@@ -137,6 +217,78 @@ if calculate:
     except (ValueError, ZeroDivisionError) as e:
         st.error(f"Error: {e}")
 
+# What-if scenarios over a price x quantity grid
+st.markdown("---")
+st.header("What-if Scenarios")
+col1, col2, col3 = st.columns(3)
+with col1:
+    price_range = st.slider(
+        "New price range",
+        0.01,
+        max(initial_price * 3, 1.0),
+        (max(initial_price * 0.25, 0.01), max(initial_price * 1.75, 0.02)),
+    )
+with col2:
+    max_quantity = st.number_input(
+        "Max new quantity", value=max(initial_qty * 10, 1.0), min_value=0.01
+    )
+with col3:
+    resolution = st.select_slider("Grid size", [100, 250, 500, 1000], value=500)
+
+if initial_qty > 0 and initial_price > 0:
+    prices = np.linspace(float(price_range[0]), float(price_range[1]), resolution)
+    quantities = np.linspace(max_quantity / resolution, max_quantity, resolution)
+    grid = average_price_grid(initial_qty, initial_price, prices, quantities)
+    # Highest price on the top row
+    st.image(colorize(grid[::-1]))
+    st.caption(
+        f"Rows: new price {price_range[1]:g} (top) to {price_range[0]:g} (bottom); "
+        f"columns: new quantity up to {max_quantity:g}. "
+        f"Average ranges from {np.nanmin(grid):.{precision}f} (purple) "
+        f"to {np.nanmax(grid):.{precision}f} (yellow)."
+    )
+
+    target_col, price_col = st.columns(2)
+    with target_col:
+        target = st.number_input(
+            "Target average", value=initial_price * 0.9, min_value=0.0, format="%.4f"
+        )
+    with price_col:
+        buy_price = st.number_input(
+            "Buy price", value=initial_price * 0.75, min_value=0.0, format="%.4f"
+        )
+    try:
+        units = required_quantity(initial_qty, initial_price, buy_price, target, precision)
+        st.info(
+            f"Buy {units:.{precision}f} units at {buy_price:g} to reach an average of {target:g}"
+        )
+    except ValueError as e:
+        st.warning(str(e))
+
+# Bulk upload: running average cost over a whole trade file
+st.markdown("---")
+st.header("Bulk Upload")
+uploaded = st.file_uploader(
+    "Trade file (CSV or JSONL with quantity and price columns, one fill per row)",
+    type=["csv", "jsonl", "ndjson"],
+)
+if uploaded is not None:
+    content = uploaded.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+    quantity, price = load_trades(digest, content, infer_format(uploaded.name))
+    fills, averages, invalid = average_cost_curve(digest, quantity, price, CHART_POINTS)
+
+    if not len(fills):
+        st.warning("No valid fills: every row needs a positive quantity and price")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Fills", f"{len(quantity):,}")
+        col2.metric("Rejected", f"{int(invalid.sum()):,}")
+        col3.metric("Final Average Price", f"${averages[-1]:.{precision}f}")
+        # Fill numbers are 1-based row numbers of the file
+        st.line_chart({"Fill": fills + 1, "Average price": averages}, x="Fill", y="Average price")
+        st.caption(f"{len(fills):,} of {len(quantity) - int(invalid.sum()):,} points shown")
+
 # Footer
 st.markdown("---")
 st.caption(
@@ -0,0 +1 @@
+"""Benchmarks; run with `make bench`."""
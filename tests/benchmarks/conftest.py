@@ -0,0 +1,20 @@
+"""Fixtures for benchmarks."""
+
+import os
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Largest batch size to run; raise to 10_000_000 for the full sweep
+MAX_ROWS = int(float(os.environ.get("BENCH_MAX_ROWS", "1e6")))
+BATCH_SIZES = [n for n in (1_000, 100_000, 1_000_000, 10_000_000) if n <= MAX_ROWS]
+
+
+@pytest.fixture(scope="session")
+def columns() -> list[npt.NDArray[np.float64]]:
+    """Random positive inputs with a few decimal places, MAX_ROWS long."""
+    rng = np.random.default_rng(0)
+    return [np.round(rng.uniform(0.01, 1000, MAX_ROWS), 4) for _ in range(4)]
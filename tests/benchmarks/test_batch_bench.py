@@ -0,0 +1,70 @@
+"""Benchmarks for the batch and service paths."""
+
+import asyncio
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from average_price_calculator import calculate_average_price_batch
+from average_price_calculator.service import LocalClient, PriceService
+
+from .conftest import BATCH_SIZES
+
+
+@pytest.mark.parametrize("precision", [2, 6])
+@pytest.mark.parametrize("rows", BATCH_SIZES)
+def test_batch(
+    benchmark: Any, columns: list[npt.NDArray[np.float64]], rows: int, precision: int
+) -> None:
+    sliced = [column[:rows] for column in columns]
+    result = benchmark(calculate_average_price_batch, *sliced, precision=precision)
+    assert not result.invalid.any()
+
+
+@pytest.mark.parametrize("rows", BATCH_SIZES[:3])
+def test_batch_exact(benchmark: Any, columns: list[npt.NDArray[np.float64]], rows: int) -> None:
+    sliced = [column[:rows] for column in columns]
+    benchmark(calculate_average_price_batch, *sliced, precision=2, exact=True)
+
+
+ITEM = {
+    "initial_quantity": 4.37562,
+    "initial_price": 3.602,
+    "new_quantity": 2.93867,
+    "new_price": 2.11,
+}
+
+
+def test_service_single(benchmark: Any) -> None:
+    client = LocalClient(PriceService(batch_window=0))
+    loop = asyncio.new_event_loop()
+    try:
+        response = benchmark(lambda: loop.run_until_complete(client.post("/average-price", ITEM)))
+    finally:
+        loop.close()
+    assert response.status == 200
+
+
+def test_service_concurrent(benchmark: Any) -> None:
+    client = LocalClient(PriceService())
+
+    async def burst() -> list[Any]:
+        return await asyncio.gather(*(client.post("/average-price", ITEM) for _ in range(1000)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(lambda: loop.run_until_complete(burst()))
+    finally:
+        loop.close()
+
+
+def test_service_batch_endpoint(benchmark: Any) -> None:
+    client = LocalClient(PriceService())
+    payload = {"items": [ITEM] * 1000}
+    loop = asyncio.new_event_loop()
+    try:
+        benchmark(lambda: loop.run_until_complete(client.post("/average-price/batch", payload)))
+    finally:
+        loop.close()
@@ -0,0 +1,55 @@
+"""Benchmarks for the scalar calculator, pydantic path and CLI startup."""
+
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+
+from average_price_calculator import (
+    Calculator,
+    PriceData,
+    calculate_average_price,
+    calculate_average_price_safe,
+)
+from average_price_calculator.fixedpoint import calculate_average_price_fixed
+
+ROW = (4.37562, 3.602, 2.93867, 2.11)
+
+
+@pytest.mark.parametrize(
+    "calculate", [calculate_average_price, calculate_average_price_fixed], ids=["decimal", "fixed"]
+)
+def test_scalar(benchmark: Any, calculate: Any) -> None:
+    result = benchmark(calculate, *ROW, 6)
+    assert result[0] == 3.002558
+
+
+def test_calculator_object(benchmark: Any) -> None:
+    result = benchmark(Calculator().calculate, *ROW)
+    assert result[0] == 3.002558
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_calculator_many(benchmark: Any, workers: int) -> None:
+    rows = [ROW] * 10_000
+    results = benchmark(Calculator().calculate_many, rows, workers=workers)
+    assert results[-1][0] == 3.002558
+
+
+def test_safe_with_validation(benchmark: Any) -> None:
+    def run() -> Any:
+        data = PriceData(
+            initial_quantity=ROW[0], initial_price=ROW[1], new_quantity=ROW[2], new_price=ROW[3]
+        )
+        return calculate_average_price_safe(data)
+
+    assert benchmark(run).average_price == 3.002558
+
+
+@pytest.mark.parametrize("command", ["version", "example"])
+def test_cli_cold_start(benchmark: Any, command: str) -> None:
+    args = [sys.executable, "-m", "average_price_calculator.cli", command]
+    benchmark.pedantic(
+        subprocess.run, args=(args,), kwargs={"check": True, "capture_output": True}, rounds=5
+    )
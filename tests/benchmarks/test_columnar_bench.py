@@ -0,0 +1,49 @@
+"""Columnar files against re-parsing CSV for the same columns."""
+
+import csv
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from average_price_calculator import calculate_average_price_batch
+from average_price_calculator.columnar import ColumnarFile, write_columnar
+from average_price_calculator.streaming import INPUT_FIELDS, chunk_columns, read_chunks
+
+ROWS = 100_000
+
+
+@pytest.fixture(scope="module")
+def files(
+    tmp_path_factory: pytest.TempPathFactory, columns: list[npt.NDArray[np.float64]]
+) -> tuple[Path, Path]:
+    directory = tmp_path_factory.mktemp("columnar")
+    sliced = [column[:ROWS] for column in columns]
+    columnar_path = directory / "positions.apcol"
+    write_columnar(columnar_path, dict(zip(INPUT_FIELDS, sliced, strict=True)))
+
+    csv_path = directory / "positions.csv"
+    with csv_path.open("w", newline="") as stream:
+        writer = csv.writer(stream)
+        writer.writerow(INPUT_FIELDS)
+        writer.writerows(zip(*(column.tolist() for column in sliced), strict=True))
+    return columnar_path, csv_path
+
+
+def test_batch_from_csv(benchmark: Any, files: tuple[Path, Path]) -> None:
+    def run() -> None:
+        with files[1].open(newline="") as stream:
+            for chunk in read_chunks(stream, "csv", ROWS):
+                calculate_average_price_batch(*chunk_columns(chunk))
+
+    benchmark(run)
+
+
+def test_batch_from_columnar(benchmark: Any, files: tuple[Path, Path]) -> None:
+    def run() -> None:
+        source = ColumnarFile(files[0])
+        calculate_average_price_batch(*(source.column(field) for field in INPUT_FIELDS))
+
+    benchmark(run)
@@ -0,0 +1,25 @@
+"""Per-trade cost of the lot ledger as the number of open lots grows."""
+
+from typing import Any
+
+import pytest
+
+from average_price_calculator.ledger import LotLedger
+
+
+@pytest.mark.parametrize("method", ["fifo", "lifo", "average"])
+@pytest.mark.parametrize("lots", [1_000, 10_000, 100_000])
+def test_trade_with_large_ledger(benchmark: Any, method: str, lots: int) -> None:
+    ledger = LotLedger(method)
+    for i in range(lots):
+        ledger.buy(10, 100 + i % 50)
+    # Leave a partially sold lot at each end so every sell splits a lot
+    ledger.sell(5, 120)
+
+    def trade() -> None:
+        # Selling and buying one lot's worth keeps the ledger size constant
+        ledger.sell(10, 120)
+        ledger.buy(10, 110)
+
+    benchmark(trade)
+    assert method == "average" or len(ledger) >= lots - 1
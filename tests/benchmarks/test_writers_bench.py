@@ -0,0 +1,44 @@
+"""Bulk column writers against one CalculationResult.model_dump per row."""
+
+import io
+import json
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from average_price_calculator import CalculationResult, calculate_average_price_batch
+from average_price_calculator.batch import BatchResult
+from average_price_calculator.streaming import RESULT_FIELDS
+from average_price_calculator.writers import open_writer, result_columns
+
+ROWS = 100_000
+
+
+@pytest.fixture(scope="module")
+def result(columns: list[npt.NDArray[np.float64]]) -> BatchResult:
+    return calculate_average_price_batch(*(column[:ROWS] for column in columns))
+
+
+def test_jsonl_via_model_dump(benchmark: Any, result: BatchResult) -> None:
+    def run() -> None:
+        sink = io.StringIO()
+        for row in zip(*(getattr(result, field).tolist() for field in RESULT_FIELDS), strict=True):
+            model = CalculationResult(**dict(zip(RESULT_FIELDS, row, strict=True)))
+            sink.write(json.dumps(model.model_dump()) + "\n")
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "npy", "arrow"])
+def test_bulk_writer(benchmark: Any, result: BatchResult, fmt: str) -> None:
+    if fmt == "arrow":
+        pytest.importorskip("pyarrow")
+
+    def run() -> None:
+        sink = io.BytesIO() if fmt in ("npy", "arrow") else io.StringIO()
+        with open_writer(sink, fmt) as writer:
+            writer.write(result_columns(result))
+
+    benchmark(run)
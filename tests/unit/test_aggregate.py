@@ -0,0 +1,65 @@
+"""Tests for group-by aggregation."""
+
+import json
+from decimal import Decimal
+
+from average_price_calculator import Position, TradeFields, group_by_average, merge_groups
+
+TRADES = [
+    {"symbol": "AAA", "account": "a", "quantity": 100, "price": 10},
+    {"symbol": "BBB", "account": "a", "quantity": 10, "price": 5},
+    {"symbol": "AAA", "account": "b", "quantity": 100, "price": 20},
+    {"symbol": "AAA", "account": "a", "quantity": 0.1, "price": 0.2},
+]
+
+
+def test_group_by_symbol() -> None:
+    groups = group_by_average(TRADES)
+
+    assert set(groups) == {("AAA",), ("BBB",)}
+    assert groups[("AAA",)].count == 3
+    assert groups[("AAA",)].total_investment == Decimal("3000.02")
+    assert groups[("BBB",)].result() == (5.0, 10.0, 50.0)
+
+
+def test_group_by_multiple_keys() -> None:
+    groups = group_by_average(TRADES, keys=("symbol", "account"))
+    assert groups[("AAA", "b")].result(precision=2) == (20.0, 100.0, 2000.0)
+
+
+def test_group_by_custom_fields() -> None:
+    trades = [{"ticker": t["symbol"], "qty": t["quantity"], "px": t["price"]} for t in TRADES]
+    fields = TradeFields(quantity="qty", price="px")
+    assert group_by_average(trades, keys=("ticker",), fields=fields) == {
+        (key[0],): position for key, position in group_by_average(TRADES).items()
+    }
+
+
+def test_merge_partials_equals_full_scan() -> None:
+    full = group_by_average(TRADES)
+    partials = [group_by_average(TRADES[i : i + 1]) for i in range(len(TRADES))]
+
+    assert merge_groups(*partials) == full
+    assert merge_groups(merge_groups(*partials[:2]), merge_groups(*partials[2:])) == full
+
+
+def test_merge_does_not_alias_inputs() -> None:
+    partial = group_by_average(TRADES[:1])
+    before = partial[("AAA",)].copy()
+
+    merged = merge_groups(partial)
+    merged[("AAA",)].add(10, 10)
+
+    assert partial[("AAA",)] == before
+
+
+def test_position_merge_is_associative() -> None:
+    a, b, c = (Position().add(q, p) for q, p in [(1, 0.1), (2, 0.2), (3, 0.3)])
+    assert (a + b) + c == a + (b + c)
+    assert (a + b).count == 2
+
+
+def test_position_round_trip() -> None:
+    position = Position().add(0.1, 0.3).add(0.2, 0.7)
+    restored = Position.from_dict(json.loads(json.dumps(position.to_dict())))
+    assert restored == position
@@ -0,0 +1,161 @@
+"""Tests for the vectorized batch calculator."""
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from average_price_calculator import (
+    BatchResult,
+    calculate_average_price,
+    calculate_average_price_batch,
+)
+from average_price_calculator.batch import (
+    BatchOptions,
+    calculate_average_price_parallel,
+    running_average_batch,
+)
+from average_price_calculator.calculator import running_average
+
+Row = tuple[float, float, float, float]
+
+ROWS: list[Row] = [
+    (100, 10, 100, 20),
+    (100, 10, 50, 20),
+    (1000, 5, 500, 10),
+    (4.37562, 3.602, 2.93867, 2.11),
+    (100, 10.123456, 50, 20.987654),
+]
+
+
+def _columns(rows: list[Row]) -> list[list[float]]:
+    return [list(column) for column in zip(*rows, strict=True)]
+
+
+@pytest.mark.parametrize("precision", [0, 2, 6])
+def test_matches_scalar(precision: int) -> None:
+    result = calculate_average_price_batch(*_columns(ROWS), precision=precision)
+
+    assert isinstance(result, BatchResult)
+    assert not result.invalid.any()
+    for i, row in enumerate(ROWS):
+        expected = calculate_average_price(*row, precision=precision)
+        assert result.average_price[i] == expected[0]
+        assert result.total_quantity[i] == expected[1]
+        assert result.total_investment[i] == expected[2]
+
+
+def test_invalid_rows_are_masked() -> None:
+    result = calculate_average_price_batch(
+        [100, 0, 100, -1, 100],
+        [10, 10, np.nan, 10, 10],
+        [100, 100, 100, 100, np.inf],
+        [20, 20, 20, 20, 20],
+    )
+
+    assert result.invalid.tolist() == [False, True, True, True, True]
+    assert result.average_price[0] == 15.0
+    assert np.isnan(result.average_price[1:]).all()
+    assert np.isnan(result.total_quantity[1:]).all()
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("exact", [False, True])
+def test_overflowing_rows_are_masked(exact: bool) -> None:  # noqa: FBT001
+    result = calculate_average_price_batch(
+        [1e308, 1e20, 100], [1e308, 1e10, 10], [1, 1, 100], [1, 1, 20], exact=exact
+    )
+
+    # 1e30 fits float64 but not the Decimal path's 28 digits at 6 places
+    assert result.invalid.tolist() == [True, exact, False]
+    assert result.average_price[2] == 15.0
+
+
+def test_broadcasts_scalars() -> None:
+    result = calculate_average_price_batch(100, 10, [50, 100, 200], 20)
+    assert result.average_price.tolist() == [13.333333, 15.0, 16.666667]
+
+
+def test_exact_mode_resolves_ties() -> None:
+    # 2.675 is stored as 2.67499999..., so float rounding goes down while Decimal goes up
+    rows: list[Row] = [(1, 2.675, 1, 2.675), (3, 1.005, 1, 1.005)]
+    expected = [calculate_average_price(*row, precision=2) for row in rows]
+
+    exact = calculate_average_price_batch(*_columns(rows), precision=2, exact=True)
+
+    assert exact.average_price.tolist() == [row[0] for row in expected]
+    assert exact.total_investment.tolist() == [row[2] for row in expected]
+
+
+def test_exact_mode_matches_scalar_on_random_inputs() -> None:
+    rng = np.random.default_rng(42)
+    columns = [np.round(rng.uniform(0.01, 1000, 2000), 3) for _ in range(4)]
+
+    result = calculate_average_price_batch(*columns, precision=2, exact=True)
+
+    for i, (initial_quantity, initial_price, new_quantity, new_price) in enumerate(
+        zip(*(column.tolist() for column in columns), strict=True)
+    ):
+        expected = calculate_average_price(
+            initial_quantity, initial_price, new_quantity, new_price, precision=2
+        )
+        assert (
+            result.average_price[i],
+            result.total_quantity[i],
+            result.total_investment[i],
+        ) == expected
+
+
+def test_negative_precision() -> None:
+    with pytest.raises(ValueError, match="Precision must be non-negative"):
+        calculate_average_price_batch([1], [1], [1], [1], precision=-1)
+
+
+def test_parallel_matches_serial() -> None:
+    rng = np.random.default_rng(7)
+    columns = [rng.uniform(0.01, 1000, 10_000) for _ in range(4)]
+    columns[1][::97] = -1.0
+
+    initial_quantity, initial_price, new_quantity, new_price = columns
+
+    serial = calculate_average_price_batch(*columns)
+    parallel = calculate_average_price_parallel(
+        initial_quantity,
+        initial_price,
+        new_quantity,
+        new_price,
+        BatchOptions(chunk_size=3_000, workers=2, min_parallel_rows=0),
+    )
+
+    for expected, actual in zip(serial, parallel, strict=True):
+        np.testing.assert_array_equal(expected, actual)
+
+
+def test_parallel_small_input_runs_serially(mocker: MockerFixture) -> None:
+    pool = mocker.patch("average_price_calculator.batch.ProcessPoolExecutor")
+    result = calculate_average_price_parallel([100], [10], [100], [20], BatchOptions(workers=4))
+
+    pool.assert_not_called()
+    assert result.average_price.tolist() == [15.0]
+
+
+def test_batch_options_are_validated() -> None:
+    with pytest.raises(ValueError, match="Chunk size must be positive"):
+        BatchOptions(chunk_size=0)
+    with pytest.raises(ValueError, match="Workers must be positive"):
+        BatchOptions(workers=0)
+
+
+def test_running_average_batch_matches_running_average() -> None:
+    rng = np.random.default_rng(3)
+    quantity = rng.uniform(0.01, 100, 500).round(4)
+    price = rng.uniform(1, 1000, 500).round(2)
+    quantity[[0, 10, 11]] = [np.nan, 0.0, -1.0]
+
+    result = running_average_batch(quantity, price, precision=4)
+    valid = ~result.invalid
+    expected = list(running_average(zip(quantity[valid], price[valid], strict=True), 4))
+
+    assert np.flatnonzero(result.invalid).tolist() == [0, 10, 11]
+    assert np.isnan(result.average_price[~valid]).all()
+    np.testing.assert_allclose(result.average_price[valid], [e[0] for e in expected], atol=1e-4)
+    np.testing.assert_allclose(result.total_quantity[valid], [e[1] for e in expected], atol=1e-4)
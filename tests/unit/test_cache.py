@@ -0,0 +1,109 @@
+"""Tests for the calculation cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from average_price_calculator import PriceData, calculate_average_price
+from average_price_calculator.cache import CalculationCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hits_and_misses() -> None:
+    cache = CalculationCache()
+
+    assert cache.calculate(100, 10, 100, 20) == (15.0, 200.0, 3000.0)
+    assert cache.calculate(100.0, 10.0, 100.0, 20.0) == (15.0, 200.0, 3000.0)
+    cache.calculate(100, 10, 100, 20, precision=2)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+    assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_lru_eviction() -> None:
+    cache = CalculationCache(maxsize=2)
+    cache.calculate(1, 1, 1, 1)
+    cache.calculate(2, 2, 2, 2)
+    cache.calculate(1, 1, 1, 1)  # refresh 1
+    cache.calculate(3, 3, 3, 3)  # evicts 2
+
+    assert cache.stats().evictions == 1
+    cache.calculate(1, 1, 1, 1)
+    assert cache.stats().hits == 2
+    cache.calculate(2, 2, 2, 2)
+    assert cache.stats().misses == 4
+
+
+def test_ttl_expiry() -> None:
+    clock = FakeClock()
+    cache = CalculationCache(ttl=10, clock=clock)
+    cache.calculate(1, 1, 1, 1)
+    clock.now = 5
+    cache.calculate(1, 1, 1, 1)
+    clock.now = 11
+    cache.calculate(1, 1, 1, 1)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 2, 1)
+
+
+def test_invalid_inputs_are_not_cached() -> None:
+    cache = CalculationCache()
+    with pytest.raises(ValueError, match="All values must be positive"):
+        cache.calculate(0, 1, 1, 1)
+    assert len(cache) == 0
+
+
+def test_warm_matches_scalar() -> None:
+    cache = CalculationCache()
+    rows = [
+        (1, 2.675, 1, 2.675),
+        (4.37562, 3.602, 2.93867, 2.11),
+        (0, 1, 1, 1),
+        (1, 2.675, 1, 2.675),
+    ]
+
+    assert cache.warm(rows, precision=2) == 2
+    assert cache.warm(rows, precision=2) == 0
+    assert cache.calculate(*rows[0], precision=2) == calculate_average_price(*rows[0], precision=2)
+    assert cache.calculate(*rows[1], precision=2) == calculate_average_price(*rows[1], precision=2)
+    assert cache.stats().hits == 2
+    assert cache.stats().rejected == 2
+
+
+def test_warm_skips_rows_that_cannot_be_calculated() -> None:
+    cache = CalculationCache()
+    rows = [(1e308, 1, 1, 1), (1, 2), (1, "x", 1, 1), (100, 10, 100, 20), (1e25, 1, 1e25, 1)]
+
+    assert cache.warm(rows) == 1  # type: ignore[arg-type]
+    assert cache.stats().rejected == 4
+    assert cache.calculate(100, 10, 100, 20) == (15.0, 200.0, 3000.0)
+
+
+def test_calculate_safe() -> None:
+    cache = CalculationCache()
+    data = PriceData(initial_quantity=100, initial_price=10, new_quantity=50, new_price=20)
+    assert cache.calculate_safe(data).average_price == 13.333333
+    assert cache.calculate_safe(data, precision=6).total_quantity == 150.0
+    assert cache.stats().hits == 1
+
+
+def test_thread_safety() -> None:
+    cache = CalculationCache(maxsize=50)
+    rows = [(i % 100 + 1, 10, 1, 20) for i in range(5000)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda row: cache.calculate(*row), rows))
+
+    assert results == [calculate_average_price(*row) for row in rows]
+    stats = cache.stats()
+    assert stats.hits + stats.misses == 5000
+    assert stats.size <= 50
@@ -1,15 +1,20 @@
 """Tests for the calculator module."""
 
 import pytest
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, Context, Decimal, InvalidOperation, localcontext
 from pathlib import Path
+from typing import Any
 
 # Use relative import
 try:
     from average_price_calculator import (
+        Calculator,
+        Position,
         PriceData,
         CalculationResult,
         calculate_average_price,
         calculate_average_price_safe,
+        running_average,
     )
     from average_price_calculator.cli import app
 except ImportError:
@@ -18,10 +23,13 @@ except ImportError:
 
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from average_price_calculator import (
+        Calculator,
+        Position,
         PriceData,
         CalculationResult,
         calculate_average_price,
         calculate_average_price_safe,
+        running_average,
     )
     from average_price_calculator.cli import app
 
@@ -170,3 +178,102 @@ def test_cli_integration() -> None:
     """Test that CLI can be imported."""
     assert app is not None
     assert callable(app)
+
+
+class TestPosition:
+    """Test Position accumulator and running_average."""
+
+    def test_two_fills_match_scalar(self) -> None:
+        """Two fills give the same result as calculate_average_price."""
+        position = Position().add(4.37562, 3.602).add(2.93867, 2.11)
+        assert position.result() == calculate_average_price(4.37562, 3.602, 2.93867, 2.11)
+
+    def test_many_fills_round_once(self) -> None:
+        """Folding fills keeps exact sums instead of re-rounding each step."""
+        fills = [(1, 0.1 + i * 0.001) for i in range(1000)]
+        position = Position()
+        for quantity, price in fills:
+            position.add(quantity, price)
+
+        exact = sum(Decimal(str(p)) for _, p in fills) / len(fills)
+        assert position.average_price == exact
+        assert position.result(precision=PRECISION_2)[1] == 1000.0
+
+    def test_running_average(self) -> None:
+        """running_average yields one result per fill."""
+        results = list(running_average([(100, 10), (100, 20), (200, 30)]))
+        assert [r[0] for r in results] == [10.0, EXPECTED_AVG, 22.5]
+        assert results[-1][1] == 400.0
+
+    def test_invalid_fill(self) -> None:
+        """Non-positive fills are rejected."""
+        with pytest.raises(ValueError, match="All values must be positive"):
+            Position().add(0, 10)
+
+    def test_empty_position(self) -> None:
+        """An empty position has no average price."""
+        with pytest.raises(ZeroDivisionError):
+            Position().result()
+
+
+class TestCalculator:
+    """Test the Calculator with its own Decimal context."""
+
+    ROWS: tuple[tuple[float, float, float, float], ...] = (
+        (4.37562, 3.602, 2.93867, 2.11),
+        (100, 10.123456, 50, 20.987654),
+        (1, 1, 2, 1),
+    )
+
+    def test_matches_calculate_average_price(self) -> None:
+        """Default settings give the same results as the module function."""
+        calculator = Calculator()
+        for row in self.ROWS:
+            assert calculator.calculate(*row) == calculate_average_price(*row)
+            assert calculator.calculate(*row, PRECISION_2) == calculate_average_price(
+                *row, PRECISION_2
+            )
+
+    def test_ignores_thread_context(self) -> None:
+        """A changed thread context does not change the results."""
+        calculator = Calculator()
+        expected = calculator.calculate(*self.ROWS[1])
+        with localcontext(Context(prec=3, rounding=ROUND_DOWN)):
+            assert calculator.calculate(*self.ROWS[1]) == expected
+            with pytest.raises(InvalidOperation):
+                calculate_average_price(*self.ROWS[1])
+
+    def test_rounding_modes(self) -> None:
+        """The final quantize uses the configured rounding mode."""
+        # 0.125 is exactly representable, so only the rounding mode matters
+        assert Calculator(2).calculate(1, 0.125, 1, 0.125)[0] == 0.13
+        assert Calculator(2, ROUND_HALF_EVEN).calculate(1, 0.125, 1, 0.125)[0] == 0.12
+        assert Calculator(2, ROUND_DOWN).calculate(1, 0.2, 2, 0.1)[0] == 0.13
+
+    def test_context_precision(self) -> None:
+        """Intermediate results follow the configured context."""
+        # 1.2345 x 1 rounds half-even to 1.234 at 4 significant digits
+        assert Calculator(3, context=Context(prec=4)).calculate(1.2345, 1, 1, 1)[2] == 2.234
+        assert Calculator(3).calculate(1.2345, 1, 1, 1)[2] == 2.235
+
+    def test_calculate_many(self) -> None:
+        """Threaded runs match serial ones; invalid rows become None."""
+        invalid = [(0, 1, 1, 1), (float("nan"), 1, 1, 1), (float("inf"), 1, 1, 1), (1, 1, 1), 5]
+        rows: list[Any] = [*self.ROWS, *invalid] * 50
+        calculator = Calculator()
+        serial = calculator.calculate_many(rows)
+        assert serial[:3] == [calculator.calculate(*row) for row in self.ROWS]
+        assert serial[3:8] == [None] * len(invalid)
+        assert calculator.calculate_many(rows, workers=4, chunk_size=7) == serial
+        assert calculator.calculate_many(iter(rows), chunk_size=1) == serial
+
+    def test_validation(self) -> None:
+        """Invalid settings and inputs are rejected."""
+        with pytest.raises(ValueError, match="rounding mode"):
+            Calculator(rounding="ROUND_NEAREST")
+        with pytest.raises(ValueError, match="non-negative"):
+            Calculator(-1)
+        with pytest.raises(ValueError, match="All values must be positive"):
+            Calculator().calculate(0, 1, 1, 1)
+        with pytest.raises(ValueError, match="positive"):
+            Calculator().calculate_many([], workers=0)
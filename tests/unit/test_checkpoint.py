@@ -0,0 +1,121 @@
+"""Tests for checkpointed incremental aggregation."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from average_price_calculator import Position
+from average_price_calculator.aggregate import GroupKey, group_by_average
+from average_price_calculator.checkpoint import Checkpoint, update_groups
+from average_price_calculator.corporate_actions import SplitTable
+
+HEADER = "symbol,quantity,price\n"
+ROWS = ["AAA,100,10\n", "BBB,5,2.5\n", "AAA,50,13.1\n", "CCC,-1,1\n", "BBB,7,2.75\n"]
+
+
+def _expected(rows: list[str]) -> dict[GroupKey, Position]:
+    trades = []
+    for row in rows:
+        symbol, quantity, price = row.strip().split(",")
+        if float(quantity) > 0:
+            trades.append({"symbol": symbol, "quantity": float(quantity), "price": float(price)})
+    return group_by_average(trades)
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> tuple[Path, Path]:
+    return tmp_path / "trades.csv", tmp_path / "trades.checkpoint.json"
+
+
+def test_resumes_from_appended_tail(paths: tuple[Path, Path]) -> None:
+    log, state = paths
+    log.write_text(HEADER + "".join(ROWS[:2]))
+    first = update_groups(log, state)
+    assert first.rebuilt
+    assert first.rows == 2
+
+    with log.open("a") as stream:
+        stream.writelines(ROWS[2:])
+    second = update_groups(log, state)
+
+    assert not second.rebuilt
+    assert (second.rows, second.rejected) == (2, 1)
+    assert second.groups == _expected(ROWS)
+    assert update_groups(log, state).rows == 0
+
+
+def test_incomplete_last_line_is_read_later(paths: tuple[Path, Path]) -> None:
+    log, state = paths
+    log.write_text(HEADER + ROWS[0] + "BBB,5,")
+    assert update_groups(log, state).rows == 1
+
+    with log.open("a") as stream:
+        stream.write("2.5\n")
+    result = update_groups(log, state)
+    assert result.rows == 1
+    assert result.groups == _expected(ROWS[:2])
+
+
+@pytest.mark.parametrize("change", ["rewrite", "truncate", "corrupt", "options"])
+def test_mismatch_triggers_rebuild(paths: tuple[Path, Path], change: str) -> None:
+    log, state = paths
+    log.write_text(HEADER + "".join(ROWS))
+    update_groups(log, state)
+    keys: tuple[str, ...] = ("symbol",)
+
+    if change == "rewrite":
+        log.write_text(HEADER + "".join(ROWS).replace("AAA", "ZZZ"))
+    elif change == "truncate":
+        log.write_text(HEADER + ROWS[0])
+    elif change == "corrupt":
+        state.write_text(state.read_text()[:20])
+    else:
+        keys = ("symbol", "quantity")
+
+    result = update_groups(log, state, keys)
+    assert result.rebuilt
+    assert result.offset == log.stat().st_size
+    expected_rows = {"rewrite": 4, "truncate": 1, "corrupt": 4, "options": 4}[change]
+    assert result.rows == expected_rows
+
+
+def test_splits_are_applied_and_tracked(paths: tuple[Path, Path]) -> None:
+    log, state = paths
+    rows = ["AAA,100,10,2024-01-05\n", "BBB,5,2.5,2024-01-05\n", "AAA,50,4,2024-03-01\n"]
+    splits = SplitTable.from_records([{"symbol": "AAA", "effective": "2024-02-01", "ratio": "2"}])
+    log.write_text("symbol,quantity,price,timestamp\n" + rows[0])
+    update_groups(log, state, splits=splits)
+    with log.open("a") as stream:
+        stream.writelines(rows[1:])
+    result = update_groups(log, state, splits=splits)
+
+    trades = [
+        {"symbol": symbol, "quantity": float(quantity), "price": float(price), "timestamp": date}
+        for symbol, quantity, price, date in (row.strip().split(",") for row in rows)
+    ]
+    assert not result.rebuilt
+    assert result.groups == group_by_average(trades, splits=splits)
+    # 200 post-split shares for 1000, then 50 for 200
+    assert result.groups[("AAA",)].result() == (4.8, 250.0, 1200.0)
+
+    other = SplitTable.from_records([{"symbol": "AAA", "effective": "2024-02-01", "ratio": "3"}])
+    assert update_groups(log, state, splits=other).rebuilt
+
+
+def test_jsonl_log_and_checkpoint_round_trip(tmp_path: Path) -> None:
+    log = tmp_path / "trades.jsonl"
+    state = tmp_path / "state.json"
+    log.write_text(json.dumps({"symbol": "AAA", "quantity": 1, "price": 2}) + "\nnot json\n")
+    result = update_groups(log, state)
+
+    assert (result.rows, result.rejected) == (1, 1)
+    checkpoint = Checkpoint.load(state)
+    assert checkpoint is not None
+    assert Checkpoint.from_dict(checkpoint.to_dict()) == checkpoint
+    assert checkpoint.groups[("AAA",)].result() == (2.0, 1.0, 2.0)
+
+
+def test_format_follows_extension(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unsupported log format"):
+        update_groups(tmp_path / "trades.apcol", tmp_path / "state.json")
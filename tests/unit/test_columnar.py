@@ -0,0 +1,220 @@
+"""Tests for the memory-mapped columnar file format."""
+
+from decimal import Decimal
+import io
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+from typer.testing import CliRunner
+
+from average_price_calculator import Position
+from average_price_calculator.aggregate import group_by_average, group_columnar_average
+from average_price_calculator.batch import BatchOptions
+from average_price_calculator.cli import app
+from average_price_calculator.columnar import (
+    ColumnarFile,
+    ColumnarWriter,
+    write_columnar,
+    write_records,
+)
+from average_price_calculator.streaming import process_columnar, process_stream, read_chunks
+
+CSV_INPUT = """initial_quantity,initial_price,new_quantity,new_price,symbol
+100,10,100,20,AAA
+0,10,1,1,BBB
+1000,5,500,10,CCC
+"""
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    write_columnar(
+        path,
+        {
+            "quantity": [1.5, 2.0, 3.25],
+            "timestamp": np.array([1, 2, 3]),
+            "symbol": ["AAA", "BB", "ÉÉ"],
+        },
+    )
+
+    source = ColumnarFile(path)
+    assert len(source) == 3
+    assert source.names == ["quantity", "timestamp", "symbol"]
+    assert source["quantity"].tolist() == [1.5, 2.0, 3.25]
+    assert source["timestamp"].dtype == np.dtype("<i8")
+    assert np.char.decode(source["symbol"], "utf-8").tolist() == ["AAA", "BB", "ÉÉ"]
+
+
+def test_columns_are_read_only_views(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    write_columnar(path, {"quantity": np.arange(10, dtype=float), "price": np.ones(10)})
+
+    source = ColumnarFile(path)
+    quantity = source.column("quantity")
+    assert not quantity.flags.writeable
+    assert quantity.ctypes.data % 64 == 0
+    assert np.shares_memory(quantity, source.column("quantity"))
+    chunks = list(source.chunks(4, ["quantity"]))
+    assert [len(chunk["quantity"]) for chunk in chunks] == [4, 4, 2]
+    assert np.shares_memory(chunks[1]["quantity"], quantity)
+
+
+def test_writer_appends_chunks(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    with ColumnarWriter(path, {"quantity": "<f8", "symbol": "S4"}) as writer:
+        writer.write({"quantity": [1.0, 2.0], "symbol": ["A", "B"]})
+        writer.write({"quantity": [3.0], "symbol": [b"C"]})
+        with pytest.raises(ValueError, match="longer than 4 bytes"):
+            writer.write({"quantity": [4.0], "symbol": ["TOOLONG"]})
+        with pytest.raises(ValueError, match="same length"):
+            writer.write({"quantity": [4.0, 5.0], "symbol": ["D"]})
+
+    assert ColumnarFile(path)["quantity"].tolist() == [1.0, 2.0, 3.0]
+    assert not path.with_name(path.name + ".tmp").exists()
+
+
+def test_invalid_files(tmp_path: Path) -> None:
+    path = tmp_path / "bad.apcol"
+    path.write_bytes(b"not a columnar file")
+    with pytest.raises(ValueError, match="not a columnar trade file"):
+        ColumnarFile(path)
+
+    write_columnar(path, {"quantity": np.ones(100)})
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(ValueError, match="truncated"):
+        ColumnarFile(path)
+
+    with pytest.raises(ValueError, match="Unsupported column type"):
+        ColumnarWriter(path, {"quantity": "<f4"})
+    with pytest.raises(ValueError, match="Chunk size must be positive"):
+        ColumnarFile(path, chunk_size=0)
+
+
+def test_write_records_rejects_non_numeric_timestamps(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    records = [{"symbol": "AAA", "quantity": "1", "timestamp": "1700000000"}, None]
+    write_records([records], path)
+    timestamps = ColumnarFile(path)["timestamp"]
+    assert timestamps[0] == 1_700_000_000
+    assert np.isnan(timestamps[1])
+
+    with pytest.raises(ValueError, match="Record 2: timestamp '2024-01-02T00:00:00'"):
+        write_records([records, [{"symbol": "AAA", "timestamp": "2024-01-02T00:00:00"}]], path)
+    assert ColumnarFile(path).rows == 2
+
+
+def test_process_columnar_matches_csv(tmp_path: Path) -> None:
+    path = tmp_path / "positions.apcol"
+    assert write_records(read_chunks(io.StringIO(CSV_INPUT), "csv", 2), path) == 3
+
+    expected = io.StringIO()
+    process_stream(io.StringIO(CSV_INPUT), expected)
+    for workers in (1, 2):
+        sink = io.StringIO()
+        options = BatchOptions(chunk_size=1, workers=workers, min_parallel_rows=0)
+        stats = process_columnar(str(path), sink, options)
+        assert (stats.rows, stats.rejected) == (3, 1)
+        # Inputs come back as floats rather than the original strings; results match
+        assert [line.split(",")[4:] for line in sink.getvalue().splitlines()] == [
+            line.split(",")[4:] for line in expected.getvalue().splitlines()
+        ]
+
+
+def test_process_columnar_maps_the_file_once_in_process(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    path = tmp_path / "positions.apcol"
+    write_records(read_chunks(io.StringIO(CSV_INPUT), "csv", 2), path)
+    opened = mocker.spy(ColumnarFile, "__init__")
+    pool = mocker.patch("average_price_calculator.streaming.ProcessPoolExecutor")
+
+    stats = process_columnar(str(path), io.StringIO(), BatchOptions(chunk_size=1, workers=2))
+    assert stats.rows == 3
+    assert opened.call_count == 1
+    pool.assert_not_called()
+
+
+def test_group_columnar_average(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    symbols = rng.choice(["AAA", "BBB", "CCC"], 1000)
+    venues = rng.choice(["X", "Y"], 1000)
+    quantity = rng.integers(1, 1000, 1000).astype(float)
+    price = np.round(rng.uniform(1, 100, 1000), 2)
+    path = tmp_path / "trades.apcol"
+    write_columnar(path, {"symbol": symbols, "venue": venues, "quantity": quantity, "price": price})
+
+    trades = [
+        {"symbol": s, "venue": v, "quantity": q, "price": p}
+        for s, v, q, p in zip(
+            symbols.tolist(), venues.tolist(), quantity.tolist(), price.tolist(), strict=True
+        )
+    ]
+    expected = group_by_average(trades, ("symbol", "venue"))
+    groups = group_columnar_average(ColumnarFile(path, chunk_size=300), ("symbol", "venue"))
+
+    assert groups.keys() == expected.keys()
+    for key, position in groups.items():
+        assert position.count == expected[key].count
+        assert position.result() == expected[key].result()
+
+
+@pytest.mark.parametrize(
+    "price",
+    [
+        # Few decimals: summed as scaled integers
+        lambda rng, n: np.round(rng.uniform(0, 1, n), 1) + 0.1,
+        # Full float precision: summed as Decimal
+        lambda rng, n: rng.uniform(0.01, 1e6, n),
+    ],
+)
+def test_group_columnar_sums_are_exact(tmp_path: Path, price: Any) -> None:
+    rng = np.random.default_rng(1)
+    symbols = rng.choice(["AAA", "BBB"], 500)
+    quantity = np.round(rng.uniform(0.001, 100, 500), 3)
+    prices = price(rng, 500)
+    path = tmp_path / "trades.apcol"
+    write_columnar(path, {"symbol": symbols, "quantity": quantity, "price": prices})
+
+    trades = [
+        {"symbol": s, "quantity": q, "price": p}
+        for s, q, p in zip(symbols.tolist(), quantity.tolist(), prices.tolist(), strict=True)
+    ]
+    expected = group_by_average(trades)
+    groups = group_columnar_average(ColumnarFile(path, chunk_size=128))
+
+    def sums(positions: dict[Any, Position]) -> dict[Any, tuple[Decimal, Decimal, int]]:
+        return {
+            key: (p.total_quantity, p.total_investment, p.count) for key, p in positions.items()
+        }
+
+    assert sums(groups) == sums(expected)
+
+
+def test_group_columnar_average_rejects_invalid_rows(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    write_columnar(path, {"symbol": ["A", "B"], "quantity": [1.0, -1.0], "price": [1.0, 1.0]})
+    with pytest.raises(ValueError, match="Row 1"):
+        group_columnar_average(path)
+
+
+def test_convert_and_batch_commands(tmp_path: Path) -> None:
+    input_path = tmp_path / "positions.csv"
+    columnar_path = tmp_path / "positions.apcol"
+    output_path = tmp_path / "results.jsonl"
+    input_path.write_text(CSV_INPUT)
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["convert", str(input_path), str(columnar_path)])
+    assert result.exit_code == 0
+    assert "Wrote: 3 rows" in result.output
+
+    result = runner.invoke(app, ["batch", str(columnar_path), "-o", str(output_path)])
+    assert result.exit_code == 0
+    assert "Processed: 3" in result.output
+    assert len(output_path.read_text().splitlines()) == 2
+
+    result = runner.invoke(app, ["batch", "-", "--format", "columnar"])
+    assert result.exit_code != 0
@@ -0,0 +1,92 @@
+"""Tests for split adjustments."""
+
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from average_price_calculator.aggregate import group_by_average, group_columnar_average
+from average_price_calculator.columnar import ColumnarFile, write_columnar
+from average_price_calculator.corporate_actions import SplitTable
+from average_price_calculator.rolling import RollingAverage, rolling_average
+
+SPLITS = SplitTable([("AAA", 100, 2), ("AAA", 200, 0.5), ("AAA", 300, 3), ("BBB", 100, 4)])
+
+TRADES = [
+    {"symbol": "AAA", "timestamp": 50, "quantity": 10, "price": 60},
+    {"symbol": "AAA", "timestamp": 150, "quantity": 10, "price": 40},
+    {"symbol": "AAA", "timestamp": 300, "quantity": 30, "price": 20},
+    {"symbol": "CCC", "timestamp": 50, "quantity": 1, "price": 5},
+]
+
+
+@pytest.mark.parametrize(
+    ("symbol", "timestamp", "factor"),
+    [("AAA", 0, 3), ("AAA", 100, Decimal("1.5")), ("AAA", 250, 3), ("AAA", 300, 1), ("ZZZ", 0, 1)],
+)
+def test_factor_lookup(symbol: str, timestamp: int, factor: Decimal) -> None:
+    assert SPLITS.factor(symbol, timestamp) == factor
+
+
+def test_vectorized_factors_match_scalar() -> None:
+    symbols = np.array(["AAA", "BBB", "AAA", "CCC", "BBB", "AAA"])
+    timestamps = np.array([0, 99, 199, 100, 100, 1000])
+    expected = [
+        SPLITS.factor(s, t) for s, t in zip(symbols.tolist(), timestamps.tolist(), strict=True)
+    ]
+    assert SPLITS.factors(symbols, timestamps).decimals() == expected
+
+
+def test_group_by_average_adjusts_on_the_fly() -> None:
+    groups = group_by_average(TRADES, splits=SPLITS)
+
+    # 10 @ 60 becomes 30 @ 20 and 10 @ 40 becomes 15 @ 26.67; investment is unchanged
+    assert groups[("AAA",)].result() == (21.333333, 75.0, 1600.0)
+    assert groups[("CCC",)].result() == (5.0, 1.0, 5.0)
+    assert TRADES[0]["quantity"] == 10
+
+
+def test_rolling_average_with_splits() -> None:
+    updates = list(rolling_average(TRADES[:3], RollingAverage(window_trades=2), splits=SPLITS))
+    assert [u.average_price for u in updates] == [20.0, 22.222222, 22.222222]
+
+
+def test_columnar_path_matches(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    write_columnar(
+        path, {field: np.array([trade[field] for trade in TRADES]) for field in TRADES[0]}
+    )
+    groups = group_columnar_average(ColumnarFile(path, chunk_size=2), splits=SPLITS)
+    assert groups == group_by_average(TRADES, splits=SPLITS)
+
+
+def test_columnar_path_keeps_factors_exact(tmp_path: Path) -> None:
+    splits = SplitTable([("AAA", 100, 1 / 3), ("AAA", 200, 1 / 7), ("AAA", 300, 3)])
+    trades = [
+        {"symbol": "AAA", "timestamp": timestamp, "quantity": quantity, "price": 10.0}
+        for timestamp, quantity in [(50, 7.0), (60, 3.0), (150, 11.0), (400, 13.0)]
+    ]
+    path = tmp_path / "trades.apcol"
+    write_columnar(
+        path, {field: np.array([trade[field] for trade in trades]) for field in trades[0]}
+    )
+
+    groups = group_columnar_average(path, splits=splits)
+    expected = group_by_average(trades, splits=splits)
+    # Factors are scaled per group rather than per fill, so sums agree to the
+    # precision of the Decimal context
+    for key, position in groups.items():
+        assert position.result() == expected[key].result()
+        difference = position.total_quantity - expected[key].total_quantity
+        assert abs(difference) <= expected[key].total_quantity.scaleb(-26)
+
+
+def test_from_records_and_validation() -> None:
+    table = SplitTable.from_records([{"symbol": "A", "effective": "2024-06-10", "ratio": "10"}])
+    assert table.factor("A", "2024-06-09") == 10
+    assert table.factor("A", "2024-06-10") == 1
+    assert len(table) == 1
+    assert "A" in table
+    with pytest.raises(ValueError, match="positive"):
+        SplitTable([("A", 1, 0)])
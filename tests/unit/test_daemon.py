@@ -0,0 +1,152 @@
+"""Tests for the Unix socket daemon and its client."""
+
+import asyncio
+from collections.abc import Iterator
+import contextlib
+import io
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from average_price_calculator import calculate_average_price
+from average_price_calculator.cli import app
+from average_price_calculator.daemon import calculate_many, connect, handle_line, main, serve
+
+
+@pytest.fixture
+def socket_path() -> Iterator[Path]:
+    # AF_UNIX paths are limited to ~100 bytes, so avoid pytest's long tmp_path
+    with tempfile.TemporaryDirectory(prefix="apc") as directory:
+        yield Path(directory) / "d.sock"
+
+
+@pytest.fixture
+def daemon(socket_path: Path) -> Iterator[Path]:
+    loop = asyncio.new_event_loop()
+    serving = loop.create_task(serve(socket_path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if socket_path.exists():
+            break
+        time.sleep(0.01)
+
+    yield socket_path
+
+    async def shutdown() -> None:
+        # The server and any connection handlers still reading from a client
+        tasks = {serving, *asyncio.all_tasks()} - {asyncio.current_task()}
+        for pending in tasks:
+            pending.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    with contextlib.suppress(Exception):
+        loop.close()
+
+
+def test_handle_line() -> None:
+    single = handle_line(
+        b'{"initial_quantity": 100, "initial_price": 10, "new_quantity": 100, "new_price": 20}'
+    )
+    assert (
+        single == b'{"average_price": 15.0, "total_quantity": 200.0, "total_investment": 3000.0}\n'
+    )
+    assert b"must be positive" in handle_line(
+        b'[{"initial_quantity": 0, "initial_price": 1, "new_quantity": 1, "new_price": 1}]'
+    )
+    assert b"valid JSON" in handle_line(b"{")
+    assert b"fields" in handle_line(b'{"initial_quantity": 1}')
+
+
+def test_client_round_trip(daemon: Path) -> None:
+    client = connect(daemon)
+    assert client is not None
+    with client:
+        assert client.calculate(4.37562, 3.602, 2.93867, 2.11) == calculate_average_price(
+            4.37562, 3.602, 2.93867, 2.11
+        )
+        with pytest.raises(ValueError, match="must be positive"):
+            client.calculate(0, 1, 1, 1)
+        assert client.request({"op": "ping"}) == {"ok": True}
+
+
+def test_pipelined_requests(daemon: Path) -> None:
+    rows = [(i, 10, i, 20) for i in range(1, 2001)] + [(0, 1, 1, 1)]
+    client = connect(daemon)
+    assert client is not None
+    with client:
+        results = client.calculate_many(rows, precision=2, depth=64)
+
+    assert results[:-1] == [calculate_average_price(*row, precision=2) for row in rows[:-1]]
+    assert isinstance(results[-1], ValueError)
+
+
+@pytest.mark.parametrize("row", [(1, 10, 20), (1, 10, 1, 20, 5), 7, "1234"])
+def test_bad_rows_come_back_as_errors(daemon: Path, socket_path: Path, row: object) -> None:
+    rows = [(100, 10, 100, 20), row, (100, 10, 100, 20)]
+    client = connect(daemon)
+    assert client is not None
+    with client:
+        results = client.calculate_many(rows)  # type: ignore[arg-type]
+    fallback = calculate_many(rows, path=socket_path.with_name("none.sock"))  # type: ignore[arg-type]
+
+    for found in (results, fallback):
+        assert found[0] == found[2] == (15.0, 200.0, 3000.0)
+        assert isinstance(found[1], ValueError)
+        assert "must have 4 values" in str(found[1])
+
+
+def test_fallback_without_daemon(socket_path: Path) -> None:
+    assert connect(socket_path) is None
+    assert calculate_many([(100, 10, 100, 20)], path=socket_path) == [(15.0, 200.0, 3000.0)]
+
+
+def test_client_main(daemon: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["100", "10", "100", "20", "-p", "2", "--socket", str(daemon)]) == 0
+    assert capsys.readouterr().out == "15.00 200.00 3000.00\n"
+
+
+def test_client_stdin_reports_bad_lines(
+    daemon: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO("100 10 100 20\nabc 1 1 1\n0,1,1,1\n1 2\n"))
+    assert main(["--stdin", "--socket", str(daemon)]) == 1
+
+    out, err = capsys.readouterr()
+    assert out == "15.000000 200.000000 3000.000000\n"
+    assert err.splitlines() == [
+        "error: could not convert string to float: 'abc'",
+        "error: All values must be positive",
+        "error: Row must have 4 values: initial_quantity, initial_price, new_quantity, new_price",
+    ]
+
+
+def test_client_rejects_bad_arguments() -> None:
+    for argv in (["1", "2"], ["1", "2", "3", "4", "-p", "11"]):
+        with pytest.raises(SystemExit):
+            main(argv)
+
+
+def test_serve_refuses_second_daemon(daemon: Path) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        asyncio.run(serve(daemon))
+
+
+def test_serve_refuses_to_replace_a_file(socket_path: Path) -> None:
+    socket_path.write_text("data")
+    with pytest.raises(RuntimeError, match="not a socket"):
+        asyncio.run(serve(socket_path))
+    assert socket_path.read_text() == "data"
+
+
+def test_serve_command_reports_os_errors(tmp_path: Path) -> None:
+    result = CliRunner().invoke(app, ["serve", "--socket", str(tmp_path / "missing" / "d.sock")])
+    assert result.exit_code == 1
+    assert "Error:" in result.output
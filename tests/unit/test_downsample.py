@@ -0,0 +1,44 @@
+"""Tests for LTTB downsampling."""
+
+import numpy as np
+import pytest
+
+from average_price_calculator.downsample import lttb
+
+
+def test_keeps_endpoints_and_order() -> None:
+    rng = np.random.default_rng(0)
+    x = np.arange(100_000)
+    y = np.cumsum(rng.normal(size=100_000))
+    indices = lttb(x, y, 1000)
+
+    assert len(indices) == 1000
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+
+
+def test_keeps_spikes() -> None:
+    y = np.zeros(10_000)
+    y[[1234, 7777]] = [50.0, -50.0]
+    indices = lttb(np.arange(10_000), y, 100)
+    assert {1234, 7777} <= set(indices.tolist())
+
+
+def test_one_point_per_bucket() -> None:
+    # 2 + 4 buckets over 10 interior points
+    indices = lttb(np.arange(12), np.array([0, 1, 5, 1, 0, 0, 9, 0, 0, 0, 0, 0]), 6)
+    assert indices.tolist() == [0, 2, 4, 6, 8, 11]
+
+
+def test_short_series_returned_whole() -> None:
+    assert lttb([0, 1, 2], [1, 2, 3], 5).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    ("x", "y", "threshold", "message"),
+    [([0, 1], [0, 1], 2, "at least 3"), ([0, 1], [0], 3, "same length")],
+)
+def test_validation(x: list[int], y: list[int], threshold: int, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        lttb(x, y, threshold)
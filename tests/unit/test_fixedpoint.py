@@ -0,0 +1,119 @@
+"""Differential tests of the fixed-point backend against the Decimal path."""
+
+from collections.abc import Iterator
+from decimal import InvalidOperation
+import random
+
+import pytest
+
+from average_price_calculator import (
+    PriceData,
+    calculate_average_price,
+    calculate_average_price_safe,
+    get_backend,
+    set_backend,
+)
+from average_price_calculator.fixedpoint import calculate_average_price_fixed, to_scaled
+
+
+@pytest.fixture
+def fixed_backend() -> Iterator[None]:
+    previous = get_backend()
+    set_backend("fixed")
+    yield
+    set_backend(previous)
+
+
+Row = tuple[float, float, float, float]
+
+
+def _random_value(rng: random.Random) -> float:
+    return round(rng.uniform(0.000001, 10 ** rng.randint(0, 6)), rng.randint(0, 6)) or 1.0
+
+
+def _assert_matches_decimal(values: Row, precision: int = 6) -> None:
+    initial_quantity, initial_price, new_quantity, new_price = values
+    assert calculate_average_price_fixed(
+        initial_quantity, initial_price, new_quantity, new_price, precision
+    ) == calculate_average_price(
+        initial_quantity, initial_price, new_quantity, new_price, precision
+    ), values
+
+
+@pytest.mark.parametrize("precision", [0, 1, 2, 3, 6, 10])
+def test_matches_decimal_on_random_inputs(precision: int) -> None:
+    rng = random.Random(precision)
+    for _ in range(2000):
+        values = (_random_value(rng), _random_value(rng), _random_value(rng), _random_value(rng))
+        _assert_matches_decimal(values, precision)
+
+
+def test_matches_decimal_on_full_precision_floats() -> None:
+    rng = random.Random(0)
+    for _ in range(2000):
+        q1, p1, q2, p2 = (rng.uniform(0.000001, 10 ** rng.randint(0, 6)) for _ in range(4))
+        _assert_matches_decimal((q1, p1, q2, p2))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        (1, 2.675, 1, 2.675),
+        (3, 1.005, 1, 1.005),
+        (4.37562, 3.602, 2.93867, 2.11),
+        (1e-7, 0.1, 0.2, 0.30000000000000004),
+        (1.5e20, 3, 2, 1e-3),
+        (1 / 300, 1, 1, 1),
+        (1 / 3, 2 / 7, 1e-20, 0.1),
+        (1, 1 / 3, 1, 1 / 7),
+        (123456789.123, 1e-25, 1, 1),
+    ],
+)
+def test_matches_decimal_on_edge_cases(values: Row) -> None:
+    for precision in (2, 6):
+        _assert_matches_decimal(values, precision)
+
+
+@pytest.mark.parametrize("values", [(1e25, 1, 1e25, 1), (1, 1e22, 1, 1e22), (5e21, 1, 5e21, 1)])
+def test_results_beyond_the_decimal_context_raise_like_decimal(values: Row) -> None:
+    initial_quantity, initial_price, new_quantity, new_price = values
+    with pytest.raises(InvalidOperation):
+        calculate_average_price(initial_quantity, initial_price, new_quantity, new_price)
+    with pytest.raises(InvalidOperation):
+        calculate_average_price_fixed(initial_quantity, initial_price, new_quantity, new_price)
+
+
+def test_to_scaled() -> None:
+    assert to_scaled(2.675, 3) == 2675
+    assert to_scaled(100, 2) == 10_000
+    assert to_scaled(1e-7, 8) == 10
+    assert to_scaled(1.5e20, 0) == 150_000_000_000_000_000_000
+    assert to_scaled(1 / 300, 19) == 33_333_333_333_333_335
+
+
+def test_to_scaled_rejects_extra_digits() -> None:
+    with pytest.raises(ValueError, match="more than 2 decimal places"):
+        to_scaled(0.125, 2)
+
+
+@pytest.mark.usefixtures("fixed_backend")
+def test_global_backend() -> None:
+    assert get_backend() == "fixed"
+    data = PriceData(initial_quantity=100, initial_price=10, new_quantity=50, new_price=20)
+    assert calculate_average_price_safe(data).average_price == 13.333333
+    assert calculate_average_price(100, 10, 100, 20) == (15.0, 200.0, 3000.0)
+
+
+@pytest.mark.usefixtures("fixed_backend")
+def test_fixed_backend_validates() -> None:
+    with pytest.raises(ValueError, match="All values must be positive"):
+        calculate_average_price(0, 10, 1, 1)
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError, match="Unknown backend"):
+        set_backend("float")
+    with pytest.raises(ValueError, match="Unknown backend"):
+        calculate_average_price_safe(
+            PriceData(initial_quantity=1, initial_price=1, new_quantity=1, new_price=1), 6, "float"
+        )
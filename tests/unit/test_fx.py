@@ -0,0 +1,110 @@
+"""Tests for FX conversion to a base currency."""
+
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from average_price_calculator.aggregate import group_by_average, group_columnar_average
+from average_price_calculator.columnar import ColumnarFile, write_columnar
+from average_price_calculator.fx import FxRateTable, MissingRateError
+
+RATES = FxRateTable([("EUR", 20, 1.2), ("EUR", 10, 1.1), ("GBP", 10, 1.25)])
+
+TRADES = [
+    {"symbol": "AAA", "currency": "USD", "timestamp": 5, "quantity": 10, "price": 100},
+    {"symbol": "AAA", "currency": "EUR", "timestamp": 15, "quantity": 10, "price": 100},
+    {"symbol": "AAA", "currency": "EUR", "timestamp": 25, "quantity": 20, "price": 50},
+    {"symbol": "BBB", "currency": "GBP", "timestamp": 10, "quantity": 4, "price": 8},
+]
+
+
+@pytest.mark.parametrize(
+    ("currency", "timestamp", "rate"),
+    [
+        ("USD", 0, Decimal(1)),
+        ("EUR", 10, Decimal("1.1")),
+        ("EUR", 19, Decimal("1.1")),
+        ("EUR", 20, Decimal("1.2")),
+        ("EUR", 9, None),
+        ("JPY", 10, None),
+    ],
+)
+def test_as_of_rate(currency: str, timestamp: int, rate: Decimal | None) -> None:
+    assert RATES.rate(currency, timestamp) == rate
+
+
+def test_vectorized_lookup_matches_scalar() -> None:
+    currencies = np.array(["EUR", "USD", "GBP", "EUR", "JPY", "EUR"])
+    timestamps = np.array([10, 0, 11, 25, 10, 5])
+    conversion = RATES.lookup(currencies, timestamps)
+
+    expected = [RATES.rate(c, t) for c, t in zip(currencies, timestamps, strict=True)]
+    assert conversion.missing.tolist() == [rate is None for rate in expected]
+    found = ~conversion.missing
+    assert conversion.rates[found].tolist() == [float(r) for r in expected if r is not None]
+
+
+def test_max_age() -> None:
+    table = FxRateTable([("EUR", 10, 1.1), ("EUR", 20, 1.2)], max_age=5)
+    assert table.rate("EUR", 15) == Decimal("1.1")
+    assert table.rate("EUR", 26) is None
+    assert table.lookup(["EUR", "EUR"], [15, 26]).missing.tolist() == [False, True]
+
+
+def test_convert_reports_every_missing_pair() -> None:
+    with pytest.raises(MissingRateError) as excinfo:
+        RATES.convert([1, 2, 3, 4], ["JPY", "EUR", "EUR", "JPY"], [10, 5, 15, 10])
+    assert excinfo.value.missing == [("EUR", 5), ("JPY", 10)]
+    assert "2 fills" in str(excinfo.value)
+
+    assert RATES.convert([10, 10], ["EUR", "USD"], [20, 20]).tolist() == [12.0, 10.0]
+
+
+def test_group_by_average_in_base_currency() -> None:
+    groups = group_by_average(TRADES, fx=RATES)
+
+    # 1000 USD + 10 x 110 USD + 20 x 60 USD over 40 units
+    assert groups[("AAA",)].result() == (82.5, 40.0, 3300.0)
+    assert groups[("BBB",)].result() == (10.0, 4.0, 40.0)
+
+
+def test_group_by_average_collects_missing_rates() -> None:
+    trades = [*TRADES, {**TRADES[1], "timestamp": 1}, {**TRADES[3], "currency": "CHF"}]
+    with pytest.raises(MissingRateError) as excinfo:
+        group_by_average(trades, fx=RATES)
+    assert excinfo.value.missing == [("CHF", 10), ("EUR", 1)]
+
+
+def test_columnar_path_matches(tmp_path: Path) -> None:
+    path = tmp_path / "trades.apcol"
+    write_columnar(
+        path, {field: np.array([trade[field] for trade in TRADES]) for field in TRADES[0]}
+    )
+    source = ColumnarFile(path, chunk_size=3)
+    groups = group_columnar_average(source, fx=RATES)
+    assert {key: p.result() for key, p in groups.items()} == {
+        key: p.result() for key, p in group_by_average(TRADES, fx=RATES).items()
+    }
+
+    with pytest.raises(MissingRateError) as excinfo:
+        group_columnar_average(source, fx=FxRateTable([("EUR", 20, 1.2)]))
+    assert excinfo.value.missing == [("EUR", 15), ("GBP", 10)]
+
+
+def test_validation_and_records() -> None:
+    with pytest.raises(ValueError, match="positive"):
+        FxRateTable([("EUR", 1, 0)])
+
+    table = FxRateTable.from_records(
+        [{"currency": "EUR", "date": "2024-01-02", "rate": "1.1"}], base="GBP"
+    )
+    assert table.currencies == ["EUR", "GBP"]
+    assert table.rate("EUR", "2024-01-03") == Decimal("1.1")
+    assert table.lookup(["EUR"], ["2024-01-01"]).missing.tolist() == [True]
+
+    table = FxRateTable.from_records([{"currency": "EUR", "date": 10, "rate": 1.1}])
+    table.max_age = 5
+    assert table.rate("EUR", 15) == Decimal("1.1")
+    assert table.rate("EUR", 16) is None
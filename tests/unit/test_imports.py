@@ -0,0 +1,56 @@
+"""Import-time regression tests."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative `python -X importtime` budget for `import average_price_calculator`
+IMPORT_BUDGET_US = int(os.environ.get("IMPORT_BUDGET_US", "150000"))
+HEAVY_MODULES = ("numpy", "pydantic", "rich")
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def _cumulative_import_us(module: str) -> int:
+    stderr = _run(f"import {module}", "-X", "importtime").stderr
+    # Lines look like "import time:  self [us] |  cumulative | imported package"
+    for line in stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    pytest.fail(f"{module} not found in -X importtime output")
+
+
+def test_package_import_time_budget() -> None:
+    # Best of three runs to smooth out a cold filesystem cache
+    elapsed = min(_cumulative_import_us("average_price_calculator") for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_US, f"import took {elapsed} us"
+
+
+@pytest.mark.parametrize("module", ["average_price_calculator", "average_price_calculator.cli"])
+def test_import_does_not_load_heavy_modules(module: str) -> None:
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    loaded = set(_run(code).stdout.split())
+    assert not loaded & set(HEAVY_MODULES)
+
+
+def test_lazy_attributes_resolve() -> None:
+    code = (
+        "import sys, average_price_calculator as a; "
+        "a.PriceData; a.calculate_average_price_batch; "
+        "print('pydantic' in sys.modules, 'numpy' in sys.modules, isinstance(a.__version__, str))"
+    )
+    assert _run(code).stdout.split() == ["True", "True", "True"]
+
+
+def test_unknown_attribute() -> None:
+    import average_price_calculator
+
+    with pytest.raises(AttributeError):
+        average_price_calculator.does_not_exist  # noqa: B018
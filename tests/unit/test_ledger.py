@@ -0,0 +1,66 @@
+"""Tests for the lot ledger."""
+
+from decimal import Decimal
+
+import pytest
+
+from average_price_calculator.ledger import LotLedger
+
+
+def _ledger(method: str) -> LotLedger:
+    ledger = LotLedger(method)
+    ledger.buy(100, 10)
+    ledger.buy(100, 20)
+    return ledger
+
+
+@pytest.mark.parametrize(
+    ("method", "cost_basis", "remaining_avg"),
+    [("fifo", 2000, 20.0), ("lifo", 2500, 10.0), ("average", 2250, 15.0)],
+)
+def test_partial_sell(method: str, cost_basis: int, remaining_avg: float) -> None:
+    ledger = _ledger(method)
+    sale = ledger.sell(150, 25)
+
+    assert sale.cost_basis == cost_basis
+    assert sale.proceeds == 3750
+    assert sale.realized_pnl == 3750 - cost_basis
+    assert ledger.realized_pnl == sale.realized_pnl
+    assert ledger.result() == (remaining_avg, 50.0, remaining_avg * 50)
+
+
+def test_fifo_partial_lot_is_updated_in_place() -> None:
+    ledger = _ledger("fifo")
+    ledger.sell(30, 1)
+    ledger.sell(30, 1)
+
+    assert len(ledger) == 2
+    assert ledger.total_cost == Decimal(40 * 10 + 100 * 20)
+
+
+def test_sell_everything() -> None:
+    for method in ("fifo", "lifo", "average"):
+        ledger = _ledger(method)
+        ledger.sell(200, 15)
+        assert ledger.total_quantity == 0
+        assert ledger.total_cost == 0
+        assert ledger.realized_pnl == 0
+        assert len(ledger) == 0
+
+
+def test_average_method_matches_calculator_after_buys() -> None:
+    ledger = LotLedger("average")
+    ledger.buy(4.37562, 3.602)
+    ledger.buy(2.93867, 2.11)
+    assert ledger.result() == (3.002558, 7.31429, 21.961577)
+
+
+def test_oversell_and_invalid_values() -> None:
+    ledger = _ledger("fifo")
+    with pytest.raises(ValueError, match="more than the held quantity"):
+        ledger.sell(201, 10)
+    with pytest.raises(ValueError, match="All values must be positive"):
+        ledger.sell(1, 0)
+    with pytest.raises(ValueError, match="Unknown method"):
+        LotLedger("hifo")
+    assert ledger.total_quantity == 200
@@ -0,0 +1,116 @@
+"""Tests for the instrumentation layer."""
+
+import asyncio
+from collections.abc import Iterator
+import json
+import threading
+
+import pytest
+
+from average_price_calculator import Position, TradeBuffer, calculate_average_price, metrics
+from average_price_calculator.daemon import handle_line
+from average_price_calculator.fixedpoint import calculate_average_price_fixed
+from average_price_calculator.service import LocalClient, PriceService
+
+ITEM = {"initial_quantity": 1, "initial_price": 2, "new_quantity": 3, "new_price": 4}
+
+
+@pytest.fixture
+def instrumented() -> Iterator[None]:
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_by_default_records_nothing() -> None:
+    metrics.reset()
+    calculate_average_price(1, 2, 3, 4)
+    assert metrics.snapshot() == {}
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_calculator_stages() -> None:
+    calculate_average_price(1, 2, 3, 4)
+    calculate_average_price_fixed(1, 2, 3, 4)
+    Position().add(1, 2).result()
+    TradeBuffer.from_columns([1], [2], [3], [4])
+
+    stats = metrics.snapshot()
+    assert stats["calculator.convert"].count == 2
+    assert stats["calculator.quantize"].count == 2
+    assert stats["fixedpoint.calculate"].count == 1
+    assert stats["models.validate_bulk"].count == 1
+    assert sum(stats["calculator.convert"].buckets) == 2
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_counters_are_summed_across_threads() -> None:
+    def work() -> None:
+        for _ in range(100):
+            metrics.record("test.stage", 1000)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stage = metrics.snapshot()["test.stage"]
+    assert stage.count == 400
+    assert stage.mean_ns == 1000
+    # 1000 ns has bit length 10, so it lands in the "< 1024 ns" bucket
+    assert stage.buckets[10] == 400
+    assert stage.quantile_ns(0.99) == 1024
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_timed_context_manager() -> None:
+    with metrics.timed("test.block"):
+        pass
+    assert metrics.snapshot()["test.block"].count == 1
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_prometheus_format() -> None:
+    metrics.record("test.stage", 1000)
+    metrics.record("test.stage", 3000)
+    text = metrics.render_prometheus()
+
+    assert "# TYPE avg_price_calc_stage_duration_seconds histogram" in text
+    assert (
+        'avg_price_calc_stage_duration_seconds_bucket{stage="test.stage",le="1.024e-06"} 1' in text
+    )
+    assert 'avg_price_calc_stage_duration_seconds_bucket{stage="test.stage",le="+Inf"} 2' in text
+    assert 'avg_price_calc_stage_duration_seconds_count{stage="test.stage"} 2' in text
+    assert 'avg_price_calc_stage_duration_seconds_sum{stage="test.stage"} 4e-06' in text
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_round_trip_through_dict() -> None:
+    metrics.record("test.stage", 5)
+    assert metrics.from_dict(json.loads(json.dumps(metrics.to_dict()))) == metrics.snapshot()
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_service_metrics_endpoint() -> None:
+    async def run() -> str:
+        client = LocalClient(PriceService(batch_window=0))
+        await client.post("/average-price", ITEM)
+        response = await client.get("/metrics")
+        assert response.content_type.startswith("text/plain")
+        return response.body.decode()
+
+    text = asyncio.run(run())
+    for stage in ("models.validate", "service.batch", "service.render", "batch.calculate"):
+        assert f'stage="{stage}"' in text
+
+
+@pytest.mark.usefixtures("instrumented")
+def test_daemon_stats_op() -> None:
+    handle_line(json.dumps(ITEM).encode())
+    response = json.loads(handle_line(b'{"op": "stats"}'))
+
+    assert response["enabled"] is True
+    assert response["stages"]["calculator.convert"]["count"] == 1
@@ -0,0 +1,84 @@
+"""Tests for TradeBuffer and ResultRecord."""
+
+import numpy as np
+import pytest
+
+from average_price_calculator import (
+    CalculationResult,
+    PriceData,
+    ResultRecord,
+    TradeBuffer,
+    calculate_average_price_batch,
+)
+
+ROW = (4.37562, 3.602, 2.93867, 2.11)
+
+
+def test_append_and_columns() -> None:
+    buffer = TradeBuffer(capacity=1)
+    for i in range(1, 6):
+        buffer.append(i, 10, i, 20)
+
+    assert len(buffer) == 5
+    assert buffer.capacity >= 5
+    assert buffer.column("initial_quantity").tolist() == [1, 2, 3, 4, 5]
+    assert not buffer.column("new_price").flags.writeable
+
+
+def test_extend_validates_in_bulk() -> None:
+    buffer = TradeBuffer.from_columns([1, 2], [10, 10], [1, 1], [20, 20])
+
+    with pytest.raises(ValueError, match="Row 3: initial_price must be greater than 0"):
+        buffer.extend([1, 1], [10, 0], [1, 1], [20, 20])
+    with pytest.raises(ValueError, match="new_quantity"):
+        buffer.append(1, 1, float("nan"), 1)
+    assert len(buffer) == 2
+
+
+def test_slicing_is_zero_copy() -> None:
+    buffer = TradeBuffer.from_columns(np.arange(1, 11), 10, 1, 20)
+    tail = buffer[5:]
+
+    assert len(tail) == 5
+    assert np.shares_memory(tail.column("initial_quantity"), buffer.column("initial_quantity"))
+
+    tail.append(100, 10, 1, 20)
+    assert len(tail) == 6
+    assert len(buffer) == 10
+    assert buffer.column("initial_quantity")[-1] == 10
+
+
+def test_from_array_shares_memory() -> None:
+    data = np.ones((len(TradeBuffer.FIELDS), 3))
+    buffer = TradeBuffer.from_array(data)
+    assert len(buffer) == 3
+    assert np.shares_memory(buffer.column("new_price"), data)
+
+
+def test_price_data_round_trip() -> None:
+    rows = [
+        PriceData(initial_quantity=q, initial_price=p, new_quantity=q, new_price=p)
+        for q, p in [(1.5, 2.5), (3.0, 4.0)]
+    ]
+    buffer = TradeBuffer.from_price_data(rows)
+
+    assert list(buffer.to_price_data()) == rows
+    assert buffer[-1] == rows[-1]
+
+
+def test_result_record_conversion() -> None:
+    result = CalculationResult(average_price=1.5, total_quantity=2.0, total_investment=3.0)
+    record = ResultRecord.from_model(result)
+
+    assert tuple(record) == (1.5, 2.0, 3.0)
+    assert record.to_model() == result
+    assert not hasattr(record, "__dict__")
+
+
+def test_batch_records() -> None:
+    buffer = TradeBuffer.from_columns(*([value] for value in ROW))
+    result = calculate_average_price_batch(*buffer.columns())
+    records = calculate_average_price_batch([1, -1], 1, 1, 1).records()
+
+    assert result.records()[0] == ResultRecord(3.002558, 7.31429, 21.961577)
+    assert records[1] is None
@@ -0,0 +1,81 @@
+"""Tests for rolling averages."""
+
+import pytest
+
+from average_price_calculator.aggregate import TradeFields
+from average_price_calculator.calculator import calculate_average_price
+from average_price_calculator.rolling import RollingAverage, rolling_average
+
+
+def test_time_window_evicts_old_trades() -> None:
+    window = RollingAverage(window_seconds=10)
+    window.update(0, 100, 10)
+    window.update(5, 100, 20)
+    assert window.result() == (15.0, 200.0, 3000.0)
+
+    # The trade at t=0 is exactly 10 s old and leaves the window
+    window.update(10, 100, 30)
+    assert len(window) == 2
+    assert window.result() == (25.0, 200.0, 5000.0)
+
+    window.advance(100)
+    assert len(window) == 0
+    assert window.total_quantity == 0
+    with pytest.raises(ZeroDivisionError):
+        window.result()
+
+
+def test_trade_count_window() -> None:
+    window = RollingAverage(window_trades=2)
+    for timestamp, price in enumerate([10, 20, 30]):
+        window.update(timestamp, 1, price)
+    assert window.result() == (25.0, 2.0, 50.0)
+
+
+def test_matches_calculator_rounding() -> None:
+    window = RollingAverage(window_trades=2)
+    window.update(0, 4.37562, 3.602).update(1, 2.93867, 2.11)
+    assert window.result() == calculate_average_price(4.37562, 3.602, 2.93867, 2.11)
+
+
+def test_rolling_average_per_symbol() -> None:
+    trades = [
+        {"symbol": "AAA", "timestamp": 0, "quantity": 1, "price": 10},
+        {"symbol": "BBB", "timestamp": 1, "quantity": 1, "price": 100},
+        {"symbol": "AAA", "timestamp": 2, "quantity": 1, "price": 20},
+        {"symbol": "AAA", "timestamp": 8, "quantity": 2, "price": 40},
+    ]
+    updates = list(rolling_average(trades, RollingAverage(window_seconds=5)))
+
+    assert [(u.key, u.timestamp, u.average_price, u.trades) for u in updates] == [
+        (("AAA",), 0, 10.0, 1),
+        (("BBB",), 1, 100.0, 1),
+        (("AAA",), 2, 15.0, 2),
+        (("AAA",), 8, 40.0, 1),
+    ]
+
+
+def test_rolling_average_precision_and_fields() -> None:
+    trades = [{"ts": 0, "qty": 3, "px": 1}, {"ts": 1, "qty": 3, "px": 2}]
+    fields = TradeFields(quantity="qty", price="px", timestamp="ts")
+    window = RollingAverage(window_trades=2, precision=2)
+
+    updates = list(rolling_average(trades, window, keys=(), fields=fields))
+    assert [u.average_price for u in updates] == [1.0, 1.5]
+    assert len(window) == 0
+
+
+def test_invalid_input() -> None:
+    with pytest.raises(ValueError, match="required"):
+        RollingAverage()
+    with pytest.raises(ValueError, match="must be positive"):
+        RollingAverage(window_trades=0)
+    with pytest.raises(ValueError, match="non-negative"):
+        RollingAverage(window_trades=1, precision=-1)
+
+    window = RollingAverage(window_seconds=1)
+    window.update(5, 1, 1)
+    with pytest.raises(ValueError, match="older than"):
+        window.update(4, 1, 1)
+    with pytest.raises(ValueError, match="All values must be positive"):
+        window.update(6, 0, 1)
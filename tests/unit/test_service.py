@@ -0,0 +1,135 @@
+"""Tests for the HTTP service and micro-batching."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from average_price_calculator import PriceData, calculate_average_price
+from average_price_calculator.service import LocalClient, MicroBatcher, PriceService
+
+ITEM = {
+    "initial_quantity": 4.37562,
+    "initial_price": 3.602,
+    "new_quantity": 2.93867,
+    "new_price": 2.11,
+}
+ROW = (4.37562, 3.602, 2.93867, 2.11)
+
+
+def _run(coro: Any) -> Any:
+    return asyncio.run(coro)
+
+
+def test_single_request() -> None:
+    response = _run(LocalClient(PriceService()).post("/average-price", ITEM))
+
+    assert response.status == 200
+    assert response.json() == dict(
+        zip(
+            ("average_price", "total_quantity", "total_investment"),
+            calculate_average_price(*ROW),
+            strict=True,
+        )
+    )
+
+
+def test_concurrent_requests_are_batched(mocker: Any) -> None:
+    service = PriceService(batch_window=0.05)
+    client = LocalClient(service)
+    spy = mocker.spy(service.batcher, "flush")
+
+    async def many() -> list[Any]:
+        payloads = [{**ITEM, "new_price": float(i + 1), "precision": 2} for i in range(20)]
+        return await asyncio.gather(*(client.post("/average-price", p) for p in payloads))
+
+    responses = _run(many())
+
+    assert spy.call_count == 1
+    assert [r.json()["average_price"] for r in responses] == [
+        calculate_average_price(*ROW[:3], float(i + 1), precision=2)[0] for i in range(20)
+    ]
+
+
+def test_batcher_flushes_at_max_size() -> None:
+    batcher = MicroBatcher(window=10, max_batch_size=2)
+    data = PriceData(**ITEM)
+
+    async def two() -> tuple[Any, ...]:
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit(data), batcher.submit(data, precision=1)), timeout=1
+        )
+
+    results = _run(two())
+    assert results[1].average_price == 3.0
+
+
+def test_batch_endpoint() -> None:
+    response = _run(
+        LocalClient(PriceService()).post(
+            "/average-price/batch", {"items": [ITEM, ITEM], "precision": 3}
+        )
+    )
+    assert response.status == 200
+    assert [r["average_price"] for r in response.json()["results"]] == [3.003, 3.003]
+
+
+@pytest.mark.parametrize(
+    ("path", "payload", "status"),
+    [
+        ("/average-price", {**ITEM, "initial_price": 0}, 422),
+        ("/average-price", {**ITEM, "precision": 11}, 422),
+        ("/average-price", {**ITEM, "precision": True}, 422),
+        ("/average-price/batch", {"items": [{"initial_quantity": 1}]}, 422),
+        ("/average-price", {**ITEM, "new_price": float("inf")}, 422),
+        ("/average-price", {**ITEM, "new_price": 1e308}, 422),
+        ("/average-price", [ITEM], 400),
+        ("/unknown", ITEM, 404),
+    ],
+)
+def test_errors(path: str, payload: Any, status: int) -> None:
+    response = _run(LocalClient(PriceService()).post(path, payload))
+    assert response.status == status
+    assert "detail" in response.json()
+
+
+def test_batch_reports_the_row_that_cannot_be_calculated() -> None:
+    items = [ITEM, {**ITEM, "initial_price": float("inf")}, {**ITEM, "new_price": 1e308}]
+    response = _run(LocalClient(PriceService()).post("/average-price/batch", {"items": items}))
+    assert response.status == 422
+    assert response.json() == {"detail": "Row 1: values cannot be calculated"}
+
+
+def test_metrics_only_answers_get() -> None:
+    response = _run(LocalClient(PriceService()).post("/metrics", {}))
+    assert response.status == 405
+
+
+def test_unexpected_error_is_a_500(mocker: Any) -> None:
+    mocker.patch("average_price_calculator.service._calculate", side_effect=RuntimeError("boom"))
+    response = _run(LocalClient(PriceService()).post("/average-price/batch", {"items": [ITEM]}))
+    assert response.status == 500
+    assert response.json() == {"detail": "Internal server error"}
+
+
+def test_http_round_trip() -> None:
+    async def request() -> bytes:
+        service = PriceService()
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = b'{"initial_quantity": 100, "initial_price": 10, "new_quantity": 100, "new_price": 20}'
+            writer.write(
+                b"POST /average-price HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+            return data
+
+    data = _run(request())
+    assert data.startswith(b"HTTP/1.1 200 OK")
+    assert data.endswith(b'{"average_price":15.0,"total_quantity":200.0,"total_investment":3000.0}')
@@ -0,0 +1,75 @@
+"""Tests for the DCA simulator."""
+
+import numpy as np
+import pytest
+
+from average_price_calculator.calculator import Position
+from average_price_calculator.simulation import (
+    BuyTheDip,
+    FixedAmount,
+    FixedQuantity,
+    simulate,
+    simulate_many,
+)
+
+PRICES = [10.0, 8.0, 12.0, 9.0, 6.0, 11.0]
+
+
+def _chained(prices: list[float], quantities: np.ndarray) -> tuple[float, float, float]:
+    position = Position()
+    for price, quantity in zip(prices, quantities.tolist(), strict=True):
+        if quantity:
+            position.add(quantity, price)
+    return position.result()
+
+
+def test_fixed_quantity_path() -> None:
+    result = simulate(PRICES, FixedQuantity(2, interval=2))
+
+    assert result.total_quantity.tolist() == [2, 2, 4, 4, 6, 6]
+    assert result.average_cost.tolist()[:3] == [10.0, 10.0, 11.0]
+    assert result.final() == (9.333333, 6.0, 56.0)
+
+
+@pytest.mark.parametrize(
+    "strategy", [FixedAmount(100), FixedQuantity(1.5, interval=3), BuyTheDip(50, threshold=0.2)]
+)
+def test_matches_chained_calculation(strategy: object) -> None:
+    prices = np.asarray(PRICES)
+    result = simulate(prices, strategy)  # type: ignore[arg-type]
+    expected = _chained(PRICES, strategy.quantities(prices))  # type: ignore[attr-defined]
+    assert result.final() == expected
+
+
+def test_buy_the_dip_only_buys_below_peak() -> None:
+    result = simulate(PRICES, BuyTheDip(60, threshold=0.3))
+
+    # Peak is 12 from step 2; only the price of 6 is at least 30% below it
+    assert np.isnan(result.average_cost[:4]).all()
+    assert result.final() == (6.0, 10.0, 60.0)
+    with pytest.raises(ZeroDivisionError):
+        simulate(PRICES, BuyTheDip(60, threshold=0.9)).final()
+
+
+def test_sweep_parallel_matches_serial() -> None:
+    rng = np.random.default_rng(0)
+    prices = np.exp(np.cumsum(rng.normal(0, 0.01, 2000))) * 100
+    strategies = [FixedAmount(100, interval=i) for i in range(1, 11)] + [
+        BuyTheDip(100, threshold=t) for t in (0.01, 0.02, 0.05)
+    ]
+
+    serial = simulate_many(prices, strategies)
+    parallel = simulate_many(prices, strategies, workers=2, shard_size=4)
+
+    assert [r.strategy for r in parallel] == strategies
+    for a, b in zip(serial, parallel, strict=True):
+        np.testing.assert_array_equal(a.average_cost, b.average_cost)
+
+
+def test_invalid_prices() -> None:
+    with pytest.raises(ValueError, match="positive"):
+        simulate([1.0, 0.0], FixedAmount(1))
+    with pytest.raises(ValueError, match="empty"):
+        simulate([], FixedAmount(1))
+    with pytest.raises(ValueError, match="Interval"):
+        simulate([1.0], FixedAmount(1, interval=0))
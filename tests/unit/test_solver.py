@@ -0,0 +1,64 @@
+"""Tests for the target-average solver and scenario grids."""
+
+import numpy as np
+import pytest
+
+from average_price_calculator.calculator import calculate_average_price
+from average_price_calculator.solver import (
+    average_price_grid,
+    break_even_price,
+    required_price,
+    required_quantity,
+    required_quantity_grid,
+)
+
+
+def test_required_quantity_round_trips() -> None:
+    quantity = required_quantity(100, 10, 4, 8)
+    assert quantity == 50.0
+    assert calculate_average_price(100, 10, quantity, 4)[0] == 8.0
+
+    # Averaging up works the same way
+    assert required_quantity(100, 10, 20, 12) == 25.0
+
+
+@pytest.mark.parametrize("target", [10, 4, 3, 11])
+def test_required_quantity_unreachable(target: float) -> None:
+    with pytest.raises(ValueError, match="between"):
+        required_quantity(100, 10, 4, target)
+
+
+def test_required_price() -> None:
+    price = required_price(100, 10, 50, 8)
+    assert price == 4.0
+    assert calculate_average_price(100, 10, 50, price)[0] == 8.0
+    with pytest.raises(ValueError, match="not reachable"):
+        required_price(100, 10, 1, 1)
+
+
+def test_break_even_price() -> None:
+    assert break_even_price(100, 8) == 8.0
+    assert break_even_price(3, 8, fees=1) == 8.333333
+    with pytest.raises(ValueError, match="Fees"):
+        break_even_price(3, 8, fees=-1)
+
+
+def test_average_price_grid_matches_scalar() -> None:
+    prices = np.array([1.5, 2.11, 7.0])
+    quantities = np.array([0.5, 2.93867, 10.0, 0.0])
+    grid = average_price_grid(4.37562, 3.602, prices, quantities, precision=6)
+
+    assert grid.shape == (3, 4)
+    assert np.isnan(grid[:, 3]).all()
+    for i, price in enumerate(prices):
+        for j, quantity in enumerate(quantities[:3]):
+            expected = calculate_average_price(4.37562, 3.602, quantity, price)[0]
+            assert grid[i, j] == expected
+
+
+def test_required_quantity_grid() -> None:
+    grid = required_quantity_grid(100, 10, [4, 20], [8, 12])
+    assert grid[0, 0] == pytest.approx(50)
+    assert grid[1, 1] == pytest.approx(25)
+    assert np.isnan(grid[0, 1])
+    assert np.isnan(grid[1, 0])
@@ -0,0 +1,118 @@
+"""Tests for the SQLite adapter."""
+
+from pathlib import Path
+import sqlite3
+from typing import Any
+
+import pytest
+from typer.testing import CliRunner
+
+from average_price_calculator.aggregate import group_by_average
+from average_price_calculator.batch import BatchOptions
+from average_price_calculator.calculator import calculate_average_price
+from average_price_calculator.cli import app
+from average_price_calculator.corporate_actions import SplitTable
+from average_price_calculator.storage import aggregate_fills, connect, recalculate
+
+ROWS = [
+    (1, 100, 10, 100, 20),
+    (2, 0, 10, 1, 1),
+    (3, 4.37562, 3.602, 2.93867, 2.11),
+    (4, None, 1, 1, 1),
+    (5, 1000, 5, 500, "abc"),
+]
+
+
+FILLS = [("AAA", 100, 10, 1), ("BBB", 5, 2.5, 2), ("AAA", 50, 13.1, 3)]
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    path = tmp_path / "positions.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE positions (id INTEGER PRIMARY KEY, initial_quantity REAL, "
+            "initial_price REAL, new_quantity REAL, new_price REAL)"
+        )
+        connection.executemany("INSERT INTO positions VALUES (?, ?, ?, ?, ?)", ROWS)
+        connection.execute(
+            "CREATE TABLE fills (symbol TEXT, quantity REAL, price REAL, timestamp INTEGER)"
+        )
+        connection.executemany("INSERT INTO fills VALUES (?, ?, ?, ?)", FILLS)
+    connection.close()
+    return path
+
+
+def _results(path: Path) -> dict[int, tuple[Any, ...]]:
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(
+            "SELECT id, average_price, total_quantity, total_investment FROM positions"
+        ).fetchall()
+    connection.close()
+    return {row[0]: row[1:] for row in rows}
+
+
+def test_recalculate_writes_results(database: Path) -> None:
+    stats = recalculate(database, options=BatchOptions(chunk_size=2, exact=True))
+
+    assert (stats.rows, stats.rejected, stats.last_id) == (5, 3, 5)
+    assert stats.rows_per_second > 0
+    results = _results(database)
+    assert results[1] == (15.0, 200.0, 3000.0)
+    assert results[3] == calculate_average_price(4.37562, 3.602, 2.93867, 2.11)
+    assert results[2] == results[4] == results[5] == (None, None, None)
+
+
+def test_incremental_run(database: Path) -> None:
+    first = recalculate(database)
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "INSERT INTO positions (id, initial_quantity, initial_price, "
+            "new_quantity, new_price) VALUES (6, 1, 1, 1, 3)"
+        )
+        # Rows at or below last_id are not touched again
+        connection.execute("UPDATE positions SET average_price = -1 WHERE id = 1")
+    connection.close()
+
+    second = recalculate(database, after_id=first.last_id)
+
+    assert (second.rows, second.last_id) == (1, 6)
+    results = _results(database)
+    assert results[6] == (2.0, 2.0, 4.0)
+    assert results[1][0] == -1
+    assert recalculate(database, after_id=6).last_id == 6
+
+
+def test_wal_mode_and_identifier_validation(database: Path) -> None:
+    connection = connect(database)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    connection.close()
+
+    with pytest.raises(ValueError, match="Invalid SQL identifier"):
+        recalculate(database, table="positions; DROP TABLE positions")
+    with pytest.raises(ValueError, match="No table"):
+        recalculate(database, table="missing")
+
+
+def test_aggregate_fills(database: Path) -> None:
+    groups = aggregate_fills(database)
+    assert groups[("AAA",)].result() == (11.033333, 150.0, 1655.0)
+    assert groups[("BBB",)].count == 1
+
+
+def test_aggregate_fills_with_splits(database: Path) -> None:
+    splits = SplitTable([("AAA", 2, 2)])
+    groups = aggregate_fills(database, splits=splits)
+    trades = [
+        dict(zip(("symbol", "quantity", "price", "timestamp"), fill, strict=True)) for fill in FILLS
+    ]
+    assert groups == group_by_average(trades, splits=splits)
+    assert groups[("AAA",)].result() == (6.62, 250.0, 1655.0)
+
+
+def test_sqlite_command(database: Path) -> None:
+    result = CliRunner().invoke(app, ["sqlite", str(database), "--after-id", "2"])
+
+    assert result.exit_code == 0
+    assert "Processed: 3" in result.output
+    assert "Last id: 5" in result.output
@@ -0,0 +1,120 @@
+"""Tests for chunked CSV/JSONL processing and the batch command."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from typer.testing import CliRunner
+
+from average_price_calculator.batch import BatchOptions
+from average_price_calculator.cli import app
+from average_price_calculator.streaming import infer_format, process_stream, read_chunks
+
+CSV_INPUT = """id,initial_quantity,initial_price,new_quantity,new_price
+1,100,10,100,20
+2,0,10,1,1
+3,abc,1,1,1
+4,1000,5,500,10
+"""
+
+
+def test_csv_stream() -> None:
+    sink = io.StringIO()
+    stats = process_stream(io.StringIO(CSV_INPUT), sink, BatchOptions(precision=2, chunk_size=2))
+
+    lines = sink.getvalue().splitlines()
+    assert lines[0] == (
+        "id,initial_quantity,initial_price,new_quantity,new_price,"
+        "average_price,total_quantity,total_investment"
+    )
+    assert lines[1:] == [
+        "1,100,10,100,20,15.00,200.00,3000.00",
+        "4,1000,5,500,10,6.67,1500.00,10000.00",
+    ]
+    assert (stats.rows, stats.rejected) == (4, 2)
+
+
+def test_jsonl_stream() -> None:
+    source = io.StringIO(
+        '{"initial_quantity": 1, "initial_price": 2, "new_quantity": 3, "new_price": 4}\n'
+        "\n"
+        "not json\n"
+        '{"initial_quantity": 1}\n'
+    )
+    sink = io.StringIO()
+    stats = process_stream(source, sink, input_format="jsonl")
+
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert records == [
+        {
+            "initial_quantity": 1,
+            "initial_price": 2,
+            "new_quantity": 3,
+            "new_price": 4,
+            "average_price": 3.5,
+            "total_quantity": 4.0,
+            "total_investment": 14.0,
+        }
+    ]
+    assert (stats.rows, stats.rejected) == (3, 2)
+
+
+def test_read_chunks_sizes() -> None:
+    chunks = list(read_chunks(io.StringIO(CSV_INPUT), "csv", 3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+
+
+def test_read_chunks_unknown_format() -> None:
+    with pytest.raises(ValueError, match="Unknown format"):
+        list(read_chunks(io.StringIO(""), "xml", 3))
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [("a.csv", "csv"), ("a.JSONL", "jsonl"), ("a.ndjson", "jsonl"), (None, "csv")],
+)
+def test_infer_format(path: str | None, expected: str) -> None:
+    assert infer_format(path) == expected
+
+
+def test_batch_command(tmp_path: Path) -> None:
+    input_path = tmp_path / "positions.csv"
+    output_path = tmp_path / "results.csv"
+    input_path.write_text(CSV_INPUT)
+
+    result = CliRunner().invoke(
+        app, ["batch", str(input_path), "-o", str(output_path), "--chunk-size", "1"]
+    )
+
+    assert result.exit_code == 0
+    assert "Processed: 4" in result.output
+    assert "Rejected: 2" in result.output
+    assert len(output_path.read_text().splitlines()) == 3
+
+
+def test_parallel_stream_keeps_order() -> None:
+    rows = "".join(f"{i},{i},10,{i},20\n" for i in range(1, 101))
+    source = "id,initial_quantity,initial_price,new_quantity,new_price\n" + rows
+    sink = io.StringIO()
+
+    # The first 30 rows (5 chunks) are computed in-process, the rest in the pool
+    options = BatchOptions(chunk_size=7, workers=2, min_parallel_rows=30)
+    stats = process_stream(io.StringIO(source), sink, options)
+
+    ids = [line.split(",")[0] for line in sink.getvalue().splitlines()[1:]]
+    assert ids == [str(i) for i in range(1, 101)]
+    assert stats.rows == 100
+
+
+def test_small_stream_runs_in_process(mocker: MockerFixture) -> None:
+    pool = mocker.patch("average_price_calculator.streaming.ProcessPoolExecutor")
+    source = "initial_quantity,initial_price,new_quantity,new_price\n" + "1,10,1,20\n" * 50
+
+    stats = process_stream(
+        io.StringIO(source), io.StringIO(), BatchOptions(chunk_size=7, workers=4)
+    )
+
+    pool.assert_not_called()
+    assert stats.rows == 50
@@ -0,0 +1,200 @@
+"""Tests for the bulk column writers."""
+
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from average_price_calculator.batch import BatchOptions, calculate_average_price_batch
+from average_price_calculator.cli import app
+from average_price_calculator.streaming import (
+    INPUT_FIELDS,
+    RESULT_FIELDS,
+    RecordWriter,
+    process_stream,
+)
+from average_price_calculator.writers import ColumnWriter, open_writer, result_columns
+
+CSV_INPUT = """initial_quantity,initial_price,new_quantity,new_price
+100,10,100,20
+0,10,1,1
+1000,5,500,10
+"""
+
+COLUMNS = {
+    "symbol": np.array([b"AAA", b'B,"B', "É".encode()]),
+    "rate%": np.array([1.5, 0.1, 3.0]),
+    "id": np.array([1, 2, 3]),
+    "average_price": np.array([15.0, 1 / 3, 7.5]),
+    "total_quantity": np.array([200.0, 3.0, 1500.0]),
+    "total_investment": np.array([3000.0, 1.0, 11250.0]),
+}
+
+
+def _records() -> list[dict[str, object]]:
+    names = [name for name in COLUMNS if not name.startswith(("average", "total"))]
+    values = [
+        np.char.decode(COLUMNS[name]).tolist() if name == "symbol" else COLUMNS[name].tolist()
+        for name in names
+    ]
+    return [dict(zip(names, row, strict=True)) for row in zip(*values, strict=True)]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_text_writers_match_record_writer(fmt: str) -> None:
+    expected = io.StringIO()
+    record_writer = RecordWriter(expected, fmt, 4)
+    results = zip(
+        COLUMNS["average_price"].tolist(),
+        COLUMNS["total_quantity"].tolist(),
+        COLUMNS["total_investment"].tolist(),
+        strict=True,
+    )
+    for record, result in zip(_records(), results, strict=True):
+        record_writer.write(record, result)
+
+    sink = io.StringIO()
+    with open_writer(sink, fmt, 4) as writer:
+        writer.write({name: column[:2] for name, column in COLUMNS.items()})
+        writer.write({name: column[2:] for name, column in COLUMNS.items()})
+    assert sink.getvalue() == expected.getvalue()
+    assert writer.rows == 3
+
+
+def test_jsonl_non_finite_values() -> None:
+    sink = io.StringIO()
+    open_writer(sink, "jsonl").write(
+        {"x": np.array([np.nan, 1.0]), "flag": np.array([True, False])}
+    )
+    assert [json.loads(line) for line in sink.getvalue().splitlines()][1] == {
+        "x": 1.0,
+        "flag": False,
+    }
+    assert sink.getvalue().startswith('{"x": NaN, "flag": true}')
+
+
+def test_npy_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "results.npy"
+    with path.open("wb") as stream, open_writer(stream, "npy") as writer:
+        for start in range(3):
+            writer.write({name: column[start : start + 1] for name, column in COLUMNS.items()})
+
+    array = np.load(path)
+    assert array.shape == (3,)
+    assert array.dtype.names == tuple(COLUMNS)
+    for name, column in COLUMNS.items():
+        assert array[name].tolist() == column.tolist()
+
+
+def test_npy_errors() -> None:
+    class Unseekable(io.BytesIO):
+        def seekable(self) -> bool:
+            return False
+
+    with pytest.raises(ValueError, match="seekable"):
+        open_writer(Unseekable(), "npy").write({"x": np.array([1.0])})
+
+    writer = open_writer(io.BytesIO(), "npy")
+    writer.write({"symbol": np.array([b"A"])})
+    with pytest.raises(ValueError, match="wider"):
+        writer.write({"symbol": np.array([b"AAA"])})
+    with pytest.raises(ValueError, match="Expected columns"):
+        writer.write({"other": np.array([b"A"])})
+    with pytest.raises(ValueError, match="Unknown output format"):
+        open_writer(io.BytesIO(), "parquet")
+
+
+def test_empty_npy_has_a_header() -> None:
+    sink = io.BytesIO()
+    with open_writer(sink, "npy"):
+        pass
+    array = np.load(io.BytesIO(sink.getvalue()))
+    assert array.shape == (0,)
+    assert array.dtype.names == ("average_price", "total_quantity", "total_investment")
+
+    sink = io.BytesIO()
+    stats = process_stream(
+        io.StringIO(CSV_INPUT.splitlines(keepends=True)[0]), sink, output_format="npy"
+    )
+    assert stats.rows == 0
+    array = np.load(io.BytesIO(sink.getvalue()))
+    assert array.shape == (0,)
+    assert array.dtype.names == (*INPUT_FIELDS, *RESULT_FIELDS)
+
+
+def test_empty_arrow_has_a_schema() -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    sink = io.BytesIO()
+    with open_writer(sink, "arrow", schema={"symbol": "S4", "price": np.float64}):
+        pass
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+    assert table.num_rows == 0
+    assert table.schema.names == ["symbol", "price"]
+    assert table.schema.field("price").type == pa.float64()
+
+
+def test_arrow_round_trip() -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    sink = io.BytesIO()
+    with open_writer(sink, "arrow") as writer:
+        writer.write({name: column[:2] for name, column in COLUMNS.items()})
+        writer.write({name: column[2:] for name, column in COLUMNS.items()})
+
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+    assert table.column_names == list(COLUMNS)
+    assert table.column("symbol").to_pylist() == ["AAA", 'B,"B', "É"]
+    assert table.column("average_price").to_pylist() == COLUMNS["average_price"].tolist()
+
+
+def test_column_writer_is_abstract() -> None:
+    with pytest.raises(TypeError, match="abstract"):
+        ColumnWriter(io.StringIO())  # type: ignore[abstract]
+
+
+def test_result_columns_drop_invalid_rows() -> None:
+    inputs = [np.array([100.0, 0.0, 1000.0]), np.array([10.0, 10.0, 5.0])] * 2
+    result = calculate_average_price_batch(*inputs)
+    columns = result_columns(result, {"id": np.array([1, 2, 3])})
+    assert list(columns) == ["id", "average_price", "total_quantity", "total_investment"]
+    assert columns["id"].tolist() == [1, 3]
+
+
+def test_process_stream_binary_output() -> None:
+    sink = io.BytesIO()
+    stats = process_stream(
+        io.StringIO(CSV_INPUT), sink, BatchOptions(chunk_size=2), output_format="npy"
+    )
+    assert (stats.rows, stats.rejected) == (3, 1)
+
+    array = np.load(io.BytesIO(sink.getvalue()))
+    assert array["initial_quantity"].tolist() == [100.0, 1000.0]
+    assert array["average_price"].tolist() == [15.0, 6.666667]
+
+
+def test_batch_command_output_formats(tmp_path: Path) -> None:
+    input_path = tmp_path / "positions.csv"
+    input_path.write_text(CSV_INPUT)
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["batch", str(input_path), "-o", str(tmp_path / "out.npy")])
+    assert result.exit_code == 0, result.output
+    assert np.load(tmp_path / "out.npy")["total_quantity"].tolist() == [200.0, 1500.0]
+
+    output = tmp_path / "out.txt"
+    result = runner.invoke(
+        app, ["batch", str(input_path), "-o", str(output), "--output-format", "jsonl"]
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(output.read_text().splitlines()[0])["average_price"] == 15.0
+
+    result = runner.invoke(app, ["batch", str(input_path), "--output-format", "npy"])
+    assert result.exit_code != 0
+    result = runner.invoke(app, ["batch", str(input_path), "--output-format", "xml"])
+    assert result.exit_code != 0